@@ -11,26 +11,24 @@ Includes:
 5. Bayesian credible intervals
 """
 
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy import stats
-from scipy.stats import beta
 import warnings
 warnings.filterwarnings('ignore')
 
-# Data from Statistics Finland (2017-2024)
-data = {
-    'Year': [2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
-    'Marriages_Opposite': [25988, 23412, 21920, 21687, 19204, 21519, 20320, 20995],
-    'Divorces_Opposite': [13483, 13116, 13311, 13390, 12081, 11264, 11341, 11751],
-    'Marriages_Male': [181, 145, 113, 123, 110, 132, 119, 134],
-    'Marriages_Female': [373, 242, 263, 272, 265, 291, 254, 291],
-    'Divorces_Male': [1, 6, 12, 25, 17, 26, 28, 29],
-    'Divorces_Female': [1, 23, 42, 63, 68, 80, 106, 89],
-}
-
-df = pd.DataFrame(data)
+from mariye.bayes import load_comparison
+from mariye.cohort import cohort_table
+from mariye.core import load_analysis
+from mariye.hierarchical import load_fit
+from mariye.power import exact_power, sample_size
+from mariye.pxweb import load_dataset
+from mariye.report import OUTPUT_DIR, build
+from mariye.significance import adjust, fisher_test, pairwise, tables_from_counts
+
+# Data from Statistics Finland (2017-2024) and the shared statistics
+# (Wilson intervals, Fisher/chi-square tests, Beta posteriors, Cohen's h)
+data = load_dataset()
+analysis = load_analysis(data)
+df = analysis.df
+groups = [analysis.groups[key] for key in ('Female', 'Male', 'Opposite')]
 
 print("="*80)
 print("ADVANCED STATISTICAL ANALYSIS")
@@ -43,45 +41,11 @@ print("="*80)
 print("\n1. LUOTTAMUSVÄLIT (95% Confidence Intervals)")
 print("-"*80)
 
-def wilson_score_interval(successes, trials, confidence=0.95):
-    """
-    Wilson score interval - better for proportions than normal approximation
-    Especially for small samples or extreme proportions
-    """
-    if trials == 0:
-        return 0, 0, 0
-    
-    p = successes / trials
-    z = stats.norm.ppf((1 + confidence) / 2)
-    
-    denominator = 1 + z**2 / trials
-    center = (p + z**2 / (2 * trials)) / denominator
-    margin = z * np.sqrt((p * (1 - p) / trials + z**2 / (4 * trials**2))) / denominator
-    
-    return p, max(0, center - margin), min(1, center + margin)
-
-# Calculate for each group
-groups = [
-    ('Naisparit', df['Marriages_Female'].sum(), df['Divorces_Female'].sum()),
-    ('Miesparit', df['Marriages_Male'].sum(), df['Divorces_Male'].sum()),
-    ('Eri sukupuolta', df['Marriages_Opposite'].sum(), df['Divorces_Opposite'].sum())
-]
-
-ci_results = []
-for name, marriages, divorces in groups:
-    rate, ci_lower, ci_upper = wilson_score_interval(divorces, marriages)
-    ci_results.append({
-        'Group': name,
-        'Rate': rate * 100,
-        'CI_Lower': ci_lower * 100,
-        'CI_Upper': ci_upper * 100,
-        'Marriages': marriages,
-        'Divorces': divorces
-    })
-    print(f"{name:20s}: {rate*100:5.2f}% [{ci_lower*100:5.2f}% - {ci_upper*100:5.2f}%]")
-    print(f"{'':20s}  (n_marriages={marriages:,}, n_divorces={divorces:,})")
-
-ci_df = pd.DataFrame(ci_results)
+# Wilson score interval - better for proportions than normal approximation
+# Especially for small samples or extreme proportions
+for group in groups:
+    print(f"{group.label:20s}: {group.rate*100:5.2f}% [{group.ci_lower*100:5.2f}% - {group.ci_upper*100:5.2f}%]")
+    print(f"{'':20s}  (n_marriages={group.marriages:,}, n_divorces={group.divorces:,})")
 
 # ============================================================================
 # 2. STATISTICAL SIGNIFICANCE TESTS
@@ -90,17 +54,12 @@ print("\n2. TILASTOLLINEN MERKITSEVYYS (Statistical Significance)")
 print("-"*80)
 
 # Chi-square test: Male vs Female same-sex couples
-male_marriages = df['Marriages_Male'].sum()
-male_divorces = df['Divorces_Male'].sum()
-female_marriages = df['Marriages_Female'].sum()
-female_divorces = df['Divorces_Female'].sum()
-
-contingency_table = np.array([
-    [male_divorces, male_marriages - male_divorces],
-    [female_divorces, female_marriages - female_divorces]
-])
+male_marriages = analysis.groups['Male'].marriages
+male_divorces = analysis.groups['Male'].divorces
+female_marriages = analysis.groups['Female'].marriages
+female_divorces = analysis.groups['Female'].divorces
 
-chi2, p_value, dof, expected = stats.chi2_contingency(contingency_table)
+chi2, p_value = analysis.chi2, analysis.p_value_chi2
 
 print(f"\nNaisparit vs Miesparit (Chi-square test):")
 print(f"  Naisparit: {female_divorces}/{female_marriages} = {female_divorces/female_marriages*100:.2f}%")
@@ -113,7 +72,7 @@ else:
     print(f"  ✗ Ero ei ole tilastollisesti merkitsevä (p ≥ 0.05)")
 
 # Fisher's exact test (more appropriate for smaller samples)
-odds_ratio, p_value_fisher = stats.fisher_exact(contingency_table)
+odds_ratio, p_value_fisher = analysis.odds_ratio, analysis.p_value_fisher
 print(f"\nFisher's Exact Test (parempi pienille otoksille):")
 print(f"  Odds Ratio: {odds_ratio:.4f}")
 print(f"  P-value: {p_value_fisher:.4f}")
@@ -123,6 +82,22 @@ if p_value_fisher < 0.05:
 else:
     print(f"  ✗ Ero ei ole tilastollisesti merkitsevä")
 
+# Many comparisons at once: p-values corrected for the number of tests (Holm)
+print(f"\nKaikki ryhmäparit (Fisher, Holm-korjattu):")
+keys = ['Female', 'Male', 'Opposite']
+pairs = pairwise([analysis.groups[k].divorces for k in keys],
+                 [analysis.groups[k].marriages for k in keys],
+                 [analysis.groups[k].label for k in keys])
+for row in pairs.itertuples():
+    print(f"  {row.Group_A} vs {row.Group_B}: {row.Rate_A:.2f}% vs {row.Rate_B:.2f}%, "
+          f"p = {row.P_Value:.2e}, korjattu p = {row.P_Adjusted:.2e}")
+
+print(f"\nNaisparit vs Miesparit vuosittain (vuoden avioerot / vuoden avioliitot):")
+_, yearly_p = fisher_test(tables_from_counts(df['Divorces_Female'], df['Marriages_Female'],
+                                             df['Divorces_Male'], df['Marriages_Male']))
+for year, p, p_holm in zip(df['Year'], yearly_p, adjust(yearly_p, 'holm')):
+    print(f"  {year}: p = {p:.4f}, Holm-korjattu p = {p_holm:.4f}{' ✓' if p_holm < 0.05 else ''}")
+
 # ============================================================================
 # 3. BAYESIAN CREDIBLE INTERVALS
 # ============================================================================
@@ -130,25 +105,26 @@ print("\n3. BAYESILAINEN ANALYYSI (Bayesian Credible Intervals)")
 print("-"*80)
 print("Huomioi pienempien otosten epävarmuuden paremmin\n")
 
-def bayesian_estimate(successes, trials, prior_alpha=1, prior_beta=1):
-    """
-    Bayesian estimate with Beta prior
-    Returns: posterior mean, 95% credible interval
-    """
-    posterior_alpha = prior_alpha + successes
-    posterior_beta = prior_beta + (trials - successes)
-    
-    mean = posterior_alpha / (posterior_alpha + posterior_beta)
-    ci_lower = beta.ppf(0.025, posterior_alpha, posterior_beta)
-    ci_upper = beta.ppf(0.975, posterior_alpha, posterior_beta)
-    
-    return mean, ci_lower, ci_upper
-
-for name, marriages, divorces in groups:
-    mean, ci_lower, ci_upper = bayesian_estimate(divorces, marriages)
-    print(f"{name:20s}: {mean*100:5.2f}% [{ci_lower*100:5.2f}% - {ci_upper*100:5.2f}%]")
+# Bayesian estimate with Beta(1, 1) prior: posterior mean, 95% credible interval
+for group in groups:
+    print(f"{group.label:20s}: {group.posterior_mean*100:5.2f}% [{group.cred_lower*100:5.2f}% - {group.cred_upper*100:5.2f}%]")
     print(f"{'':20s}  (Bayesian 95% Credible Interval)")
 
+# Posterior comparison: exact P(p_female > p_male) and the risk-ratio posterior
+female_vs_male = load_comparison(analysis).pair('Female', 'Male')
+print(f"\nP(naisparien eroaste > miesparien): {female_vs_male['Prob_Greater']:.7f}")
+print(f"Riskisuhde naiset/miehet: {female_vs_male['RR_Median']:.2f} "
+      f"[{female_vs_male['RR_Lower']:.2f} - {female_vs_male['RR_Upper']:.2f}] (95% Credible Interval)")
+
+# Yearly ratios under a hierarchical beta-binomial prior fitted to all years of each group
+fit = load_fit(analysis)
+print("\nHierarkkinen malli:")
+for key in ('Male', 'Female'):
+    print(f"  {analysis.groups[key].label} (priorin paino {fit.concentration[key]:.0f} avioliittoa):")
+    for row in fit.group(key).itertuples():
+        print(f"    {row.Year}: {row.Divorces:3d}/{row.Marriages:<4d} = {row.Rate:5.2f}% "
+              f"-> {row.EB_Rate:5.2f}% [{row.Cred_Lower:5.2f}% - {row.Cred_Upper:5.2f}%]")
+
 # ============================================================================
 # 4. COHORT ANALYSIS - Simplified
 # ============================================================================
@@ -157,22 +133,12 @@ print("-"*80)
 print("Seurataan samana vuonna solmittuja avioliittoja\n")
 
 # Note: We don't have individual marriage-level data, so this is approximate
-# We can estimate yearly divorce rates
-for year in [2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024]:
-    year_data = df[df['Year'] == year]
-    same_sex_mar = year_data['Marriages_Male'].values[0] + year_data['Marriages_Female'].values[0]
-    same_sex_div = year_data['Divorces_Male'].values[0] + year_data['Divorces_Female'].values[0]
-    opp_sex_mar = year_data['Marriages_Opposite'].values[0]
-    opp_sex_div = year_data['Divorces_Opposite'].values[0]
-    
-    if same_sex_mar > 0:
-        same_sex_rate = same_sex_div / same_sex_mar * 100
-    else:
-        same_sex_rate = 0
-    
-    opp_sex_rate = opp_sex_div / opp_sex_mar * 100
-    
-    print(f"{year}: Samaa sukupuolta {same_sex_rate:5.1f}% | Eri sukupuolta {opp_sex_rate:5.1f}%")
+# We can estimate yearly divorce rates (all years and groups in one table)
+cohorts = cohort_table(df, groups=['SameSex', 'Opposite']).pivot(
+    index='Year', columns='Group', values='Rate'
+)
+for year, row in cohorts.iterrows():
+    print(f"{year}: Samaa sukupuolta {row['SameSex']:5.1f}% | Eri sukupuolta {row['Opposite']:5.1f}%")
 
 print("\nHUOM: Tämä on yksinkertaistettu - oikea cohort-analyysi vaatisi")
 print("      yksilötason dataa (milloin avioliitto solmittu + milloin ero)")
@@ -184,17 +150,12 @@ print("\n5. EFEKTIKOKO (Effect Size - Cohen's h)")
 print("-"*80)
 print("Mittaa eron suuruuden (ei vain sen merkitsevyyden)\n")
 
-def cohens_h(p1, p2):
-    """
-    Cohen's h for comparing two proportions
-    Small: 0.2, Medium: 0.5, Large: 0.8
-    """
-    return 2 * (np.arcsin(np.sqrt(p1)) - np.arcsin(np.sqrt(p2)))
-
-p_female = female_divorces / female_marriages
-p_male = male_divorces / male_marriages
+# Cohen's h for comparing two proportions
+# Small: 0.2, Medium: 0.5, Large: 0.8
+p_female = analysis.groups['Female'].rate
+p_male = analysis.groups['Male'].rate
 
-h = cohens_h(p_female, p_male)
+h = analysis.cohens_h
 print(f"Cohen's h (Naisparit vs Miesparit): {h:.4f}")
 if abs(h) < 0.2:
     print("  → Pieni efekti")
@@ -210,19 +171,10 @@ print("\n6. TEHOANALYYSI (Statistical Power)")
 print("-"*80)
 print("Riittääkö otoskoko luotettavaan vertailuun?\n")
 
-# Simplified power calculation
-# For comparing two proportions with our sample sizes
-def approximate_power(n1, n2, p1, p2, alpha=0.05):
-    """Approximate power for two-proportion test"""
-    p_pooled = (p1*n1 + p2*n2) / (n1 + n2)
-    se = np.sqrt(p_pooled * (1 - p_pooled) * (1/n1 + 1/n2))
-    z_alpha = stats.norm.ppf(1 - alpha/2)
-    z_beta = (abs(p1 - p2) - z_alpha * se) / se
-    power = stats.norm.cdf(z_beta)
-    return max(0, min(1, power))
-
-power = approximate_power(male_marriages, female_marriages, p_male, p_female)
-print(f"Estimoitu tilastollinen teho: {power*100:.1f}%")
+# Exact power of the Fisher test at our sample sizes (full enumeration of
+# the outcomes, not a normal approximation), and the size needed for 80%
+power = exact_power(male_marriages, female_marriages, p_male, p_female)
+print(f"Tilastollinen teho (Fisherin tarkka testi): {power*100:.1f}%")
 if power > 0.8:
     print("  ✓ Hyvä teho (>80%) - otoskoko riittävä")
 elif power > 0.5:
@@ -230,6 +182,11 @@ elif power > 0.5:
 else:
     print("  ✗ Heikko teho (<50%) - otoskoko liian pieni luotettavaan vertailuun")
 
+ratio = female_marriages / male_marriages
+needed = sample_size(p_male, p_female, ratio=ratio)
+if needed is not None:
+    print(f"80% teho saavutettaisiin: {needed} miesparin ja {round(needed*ratio)} naisparin avioliitolla")
+
 # ============================================================================
 # 7. RECOMMENDATIONS FOR BETTER ANALYSIS
 # ============================================================================
@@ -294,88 +251,10 @@ print("\n" + "="*80)
 print("Luodaan kehittyneitä visualisointeja...")
 print("="*80)
 
-fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-fig.suptitle('Kehittynyt Tilastollinen Analyysi - Avioerot Suomessa', 
-             fontsize=16, fontweight='bold')
-
-# Plot 1: Confidence Intervals
-ax1 = axes[0, 0]
-groups_names = ci_df['Group'].values
-rates = ci_df['Rate'].values
-ci_lower = ci_df['CI_Lower'].values
-ci_upper = ci_df['CI_Upper'].values
-errors = np.array([rates - ci_lower, ci_upper - rates])
-
-colors = ['#e74c3c', '#3498db', '#2ecc71']
-bars = ax1.barh(groups_names, rates, color=colors, alpha=0.7, edgecolor='black', linewidth=2)
-ax1.errorbar(rates, groups_names, xerr=errors, fmt='none', color='black', 
-             capsize=5, capthick=2, linewidth=2)
-
-ax1.set_xlabel('Eroaste (%) ± 95% Luottamusväli', fontweight='bold')
-ax1.set_title('Eroasteet Luottamusvälein\n(Wilson Score Interval)', fontweight='bold')
-ax1.grid(True, alpha=0.3, axis='x')
-
-for i, (bar, rate, lower, upper) in enumerate(zip(bars, rates, ci_lower, ci_upper)):
-    ax1.text(rate + 2, i, f'{rate:.1f}%\n[{lower:.1f}%-{upper:.1f}%]', 
-             va='center', fontweight='bold')
-
-# Plot 2: Bayesian Posterior Distributions
-ax2 = axes[0, 1]
-x = np.linspace(0, 0.3, 1000)
-
-for name, marriages, divorces in groups[:2]:  # Just same-sex couples
-    alpha_post = 1 + divorces
-    beta_post = 1 + (marriages - divorces)
-    y = beta.pdf(x, alpha_post, beta_post)
-    ax2.plot(x, y, linewidth=2, label=name)
-    ax2.fill_between(x, 0, y, alpha=0.3)
-
-ax2.set_xlabel('Eroaste', fontweight='bold')
-ax2.set_ylabel('Todennäköisyystiheys', fontweight='bold')
-ax2.set_title('Bayesilainen Posteriorijakauma\n(Samaa sukupuolta olevat parit)', fontweight='bold')
-ax2.legend()
-ax2.grid(True, alpha=0.3)
-ax2.set_xlim(0, 0.3)
-
-# Plot 3: Yearly divorce-to-marriage ratios
-ax3 = axes[1, 0]
-df['SameSex_Ratio'] = (df['Divorces_Male'] + df['Divorces_Female']) / (df['Marriages_Male'] + df['Marriages_Female']) * 100
-df['Opposite_Ratio'] = df['Divorces_Opposite'] / df['Marriages_Opposite'] * 100
-
-ax3.plot(df['Year'], df['SameSex_Ratio'], marker='o', linewidth=2, markersize=8,
-         label='Samaa sukupuolta', color='#9b59b6')
-ax3.plot(df['Year'], df['Opposite_Ratio'], marker='s', linewidth=2, markersize=8,
-         label='Eri sukupuolta', color='#2ecc71')
-
-ax3.set_xlabel('Vuosi', fontweight='bold')
-ax3.set_ylabel('Saman vuoden erojen ja avioliittojen suhde (%)', fontweight='bold')
-ax3.set_title('Vuosittainen Ero/Avioliitto -suhde\n(HUOM: Ei true divorce rate)', fontweight='bold')
-ax3.legend()
-ax3.grid(True, alpha=0.3)
-
-# Plot 4: Sample size visualization
-ax4 = axes[1, 1]
-sample_sizes = [male_marriages, female_marriages, df['Marriages_Opposite'].sum()]
-labels = ['Miesparit\n(n=1,057)', 'Naisparit\n(n=2,251)', 'Eri sukupuolta\n(n=175,045)']
-colors_bar = ['#3498db', '#e74c3c', '#2ecc71']
-
-bars = ax4.bar(range(3), sample_sizes, color=colors_bar, alpha=0.7, edgecolor='black', linewidth=2)
-ax4.set_ylabel('Avioliittojen määrä (log-skaala)', fontweight='bold')
-ax4.set_title('Otoskoot (2017-2024)\nSuurempi otos = Luotettavampi estimaatti', fontweight='bold')
-ax4.set_xticks(range(3))
-ax4.set_xticklabels(labels)
-ax4.set_yscale('log')
-ax4.grid(True, alpha=0.3, axis='y')
-
-for bar, size in zip(bars, sample_sizes):
-    height = bar.get_height()
-    ax4.text(bar.get_x() + bar.get_width()/2., height,
-             f'{size:,}', ha='center', va='bottom', fontweight='bold', fontsize=10)
-
-plt.tight_layout()
-plt.savefig('/Users/konstantinosfotiou/Documents/mariye/advanced_statistical_analysis.png', 
-            dpi=300, bbox_inches='tight')
-print("\n✓ Visualisoinnit tallennettu: advanced_statistical_analysis.png")
+# Confidence intervals, posteriors, yearly ratios and sample sizes in one
+# figure, rendered by the report builder (python -m mariye.report)
+build(['advanced_statistical_analysis'], data=data, jobs=1)
+print(f"\n✓ Visualisoinnit tallennettu: {OUTPUT_DIR / 'advanced_statistical_analysis.png'}")
 
 print("\n" + "="*80)
 print("YHTEENVETO TILASTOTIETEILIJÄLLE")
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Streamlit Web App: Finnish Marriage and Divorce Statistics (2017-2024)
+Streamlit Web App: Finnish Marriage and Divorce Statistics (2017 onwards)
 Author: Analysis for Marios's article
 
 Deploy to: streamlit.io (free)
@@ -8,72 +8,49 @@ Deploy to: streamlit.io (free)
 
 import streamlit as st
 import pandas as pd
-import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-from scipy import stats
-from scipy.stats import beta
 
-# Page config
+from mariye import text
+from mariye.cache import (
+    load_bootstrap, load_comparison, load_hierarchical, load_region_breakdown, load_results, load_trends
+)
+from mariye.core import GROUP_LABELS
+from mariye.export import FORMATS, available_formats, export_bytes, filename
+from mariye.figures import figure_spec, regional_rates, yearly_shrinkage
+from mariye.power import exact_power, power_curve, sample_size
+from mariye.pxweb import PxWebError
+
+# Derived frame and statistics, computed once per dataset version (see mariye/core.py)
+analysis = load_results()
+df = analysis.df
+groups = analysis.groups
+
+male_marriages = groups['Male'].marriages
+male_divorces = groups['Male'].divorces
+female_marriages = groups['Female'].marriages
+female_divorces = groups['Female'].divorces
+opposite_marriages = groups['Opposite'].marriages
+opposite_divorces = groups['Opposite'].divorces
+
+p_male = groups['Male'].rate
+p_female = groups['Female'].rate
+p_same = analysis.p_same
+
+p_value_fisher = analysis.p_value_fisher
+odds_ratio_female_vs_male = analysis.odds_ratio_female_vs_male
+risk_ratio_female_vs_male = analysis.risk_ratio_female_vs_male
+
+period = text.span(analysis)
+first_year, last_year = text.years(analysis)
+
+# Page config (the cached loaders above write no elements, so this is still the first command)
 st.set_page_config(
-    page_title="Avioerot Suomessa 2017-2024",
+    page_title=text.title(analysis),
     page_icon="💍",
     layout="wide"
 )
 
-# Data
-data = {
-    'Year': [2017, 2018, 2019, 2020, 2021, 2022, 2023, 2024],
-    'Marriages_Opposite': [25988, 23412, 21920, 21687, 19204, 21519, 20320, 20995],
-    'Divorces_Opposite': [13483, 13116, 13311, 13390, 12081, 11264, 11341, 11751],
-    'Marriages_Male': [181, 145, 113, 123, 110, 132, 119, 134],
-    'Marriages_Female': [373, 242, 263, 272, 265, 291, 254, 291],
-    'Divorces_Male': [1, 6, 12, 25, 17, 26, 28, 29],
-    'Divorces_Female': [1, 23, 42, 63, 68, 80, 106, 89],
-}
-
-df = pd.DataFrame(data)
-
-# Calculate totals and rates
-df['Marriages_SameSex'] = df['Marriages_Male'] + df['Marriages_Female']
-df['Divorces_SameSex'] = df['Divorces_Male'] + df['Divorces_Female']
-
-df['Cum_Mar_Opposite'] = df['Marriages_Opposite'].cumsum()
-df['Cum_Div_Opposite'] = df['Divorces_Opposite'].cumsum()
-df['Cum_Mar_Male'] = df['Marriages_Male'].cumsum()
-df['Cum_Div_Male'] = df['Divorces_Male'].cumsum()
-df['Cum_Mar_Female'] = df['Marriages_Female'].cumsum()
-df['Cum_Div_Female'] = df['Divorces_Female'].cumsum()
-df['Cum_Mar_SameSex'] = df['Marriages_SameSex'].cumsum()
-df['Cum_Div_SameSex'] = df['Divorces_SameSex'].cumsum()
-
-df['Rate_Opposite'] = (df['Cum_Div_Opposite'] / df['Cum_Mar_Opposite'] * 100)
-df['Rate_Male'] = (df['Cum_Div_Male'] / df['Cum_Mar_Male'] * 100)
-df['Rate_Female'] = (df['Cum_Div_Female'] / df['Cum_Mar_Female'] * 100)
-df['Rate_SameSex'] = (df['Cum_Div_SameSex'] / df['Cum_Mar_SameSex'] * 100)
-
-# Precompute group totals and core stats for reuse
-male_marriages = df['Marriages_Male'].sum()
-male_divorces = df['Divorces_Male'].sum()
-female_marriages = df['Marriages_Female'].sum()
-female_divorces = df['Divorces_Female'].sum()
-opposite_marriages = df['Marriages_Opposite'].sum()
-opposite_divorces = df['Divorces_Opposite'].sum()
-
-p_male = male_divorces / male_marriages if male_marriages else 0
-p_female = female_divorces / female_marriages if female_marriages else 0
-p_same = (male_divorces + female_divorces) / (male_marriages + female_marriages)
-
-contingency_table = np.array([
-    [male_divorces, male_marriages - male_divorces],
-    [female_divorces, female_marriages - female_divorces]
-])
-odds_ratio_tmp, p_value_fisher = stats.fisher_exact(contingency_table)
-odds_ratio_female_vs_male = 1/odds_ratio_tmp if odds_ratio_tmp != 0 else np.inf
-risk_ratio_female_vs_male = (p_female / p_male) if p_male > 0 else np.inf
-
 # Header
-st.title("💍 Avioerot Suomessa 2017-2024")
+st.title(f"💍 {text.title(analysis)}")
 st.markdown("### Vertailu: Samaa sukupuolta vs. eri sukupuolta olevat parit")
 
 # ============================================================================
@@ -84,53 +61,19 @@ st.subheader("🧩 Mitä tarkoittaa 'eroaste'?")
 
 col_a, col_b = st.columns([1, 1])
 
-with col_a:
-    st.markdown("""
-    **💬 Puhekielessä:**
-
-    "Puolet avioliitoista päättyy eroon"
-
-    → Tämä tarkoittaa: *Kaikista koskaan solmituista avioliitoista, noin 50% päättyy lopulta eroon*
-    (elinaikainen todennäköisyys).
+colloquial, ours = text.rate_meanings(analysis)
 
-    **Esimerkki:**
-    - Jos 100 paria menee naimisiin
-    - Seurataan heitä 30 vuotta
-    - ~50 parista erotaan jossakin vaiheessa
-    """)
+with col_a:
+    st.markdown(colloquial)
 
 with col_b:
-    st.markdown("""
-    **📊 Tässä analyysissa:**
-
-    "21% (naisparit) ja 14% (miesparit)"
+    st.markdown(ours)
 
-    → Tämä tarkoittaa: *Vuosina 2017-2024 solmituista avioliitoista, näin moni on JO eronnut*
-    (kumulatiivinen osuus, ei lopullinen).
-
-    **Esimerkki:**
-    - 2,251 naisparia meni naimisiin 2017-2024
-    - 472 heistä on jo eronnut (lokakuuhun 2024)
-    - = 21% tähän mennessä (ei lopullinen luku!)
-    """)
-
-st.warning("""
-⚠️ **Tärkeä ero:**
-
-- **Puhekielen "puolet eroaa"** = Elinaikainen ennuste (vaatii 30+ vuoden seurannan)
-- **Tämän analyysin "21%"** = Kuinka moni on JO eronnut 7-8 vuoden aikana (luku kasvaa vielä)
-
-**Analogia:** Jos istutamme omenapuita vuonna 2017 ja laskemme tippuneita omenoita vuonna 2024,
-emme voi sanoa "näin monta omenaa tippuu lopulta" - puut ovat vasta nuoria!
-""")
+st.warning(text.important_difference(analysis))
 
 st.markdown("---")
 
-st.info("""
-**⏰ Aikajänne-huomio:** Samaa sukupuolta olevien avioliitot laillistettiin Suomessa maaliskuussa 2017.
-Siksi datamme kattaa vain 7-8 vuotta. Eri sukupuolta olevien parien avioerot voivat tulla
-avioliitoista jotka solmittiin 1990-luvulla tai aikaisemmin.
-""")
+st.info(text.timespan_note(analysis))
 
 # ============================================================================
 # JOURNALIST QUICK GUIDE - Direct answer for Marios
@@ -138,96 +81,28 @@ avioliitoista jotka solmittiin 1990-luvulla tai aikaisemmin.
 st.markdown("---")
 st.subheader("📰 Toimittajan Pikaopas")
 
-st.success("""
-**❓ Miksi naisparit eroavat useammin kuin miesparit?**
-
-✅ **Vastaus:** Vuosina 2017-2024 solmituista avioliitoista naisparien eroaste on **21%** ja miesparien **14%**.
-
-**Tämä tarkoittaa:**
-- 21% naisparien avioliitoista on jo päättynyt (472 eroa / 2,251 avioliittoa)
-- 14% miesparien avioliitoista on jo päättynyt (144 eroa / 1,057 avioliittoa)
-- Ero on tilastollisesti merkitsevä (ei sattumaa)
-- Naisparilla on noin **1.5 kertaa** suurempi todennäköisyys erota
-""")
+st.success(text.quick_answer(analysis))
 
 st.markdown("**📋 Kopioi artikkeliisi (YKSINKERTAINEN VERSIO):**")
 
-simple_copy = f"""
-Vuosina 2017–2024 naisparien eroaste oli 21 prosenttia ja miesparien 14 prosenttia.
-Naisparien avioliitoista on siis eronnut noin puolitoista kertaa useammin kuin miesparien.
-
-Ero on tilastollisesti merkitsevä, eli se ei johdu sattumasta.
-
-Huomioitavaa on, että nämä luvut eivät kerro lopullista eroastetta - monet avioliitot
-ovat vasta muutaman vuoden ikäisiä, ja eroaste kasvaa todennäköisesti ajan myötä.
-"""
-
-st.code(simple_copy.strip(), language="markdown")
+st.code(text.simple_copy(analysis), language="markdown")
 
 st.markdown("**📊 Kaaviot artikkeliisi:**")
 st.caption("Scrollaa alemmas nähdäksesi vertailukuvaajia. Erityisesti osio '📊 Yksinkertainen vertailu' sopii hyvin artikkeli-käyttöön.")
 
 st.markdown("---")
 
-st.warning("""
-⚠️ **TÄRKEÄ VAROITUS:**
-
-**ÄLÄ** vertaa lukua 21% lukuun **57%** (eri sukupuolta olevien parien "eroaste").
-
-**Miksi?** Ne mittaavat eri asioita:
-- 21% = 2017-2024 solmittujen avioliittojen eroaste (kaikki avioerot tulevat 2017-2024 avioliitoista)
-- 57% = 2017-2024 avioerot ÷ 2017-2024 solmitut (mutta avioerot tulevat myös 1990-2016 avioliitoista!)
-
-**Katso tarkempi selitys alla** osiossa "Miksi 57% on harhaanjohtava?"
-""")
+st.warning(text.comparison_warning(analysis))
 
 # ============================================================================
 # SIMPLE COMPARISON CHART - For article use
 # ============================================================================
 st.markdown("### 📊 Yksinkertainen vertailu")
 
-# Create simple horizontal bar chart
-fig_simple = go.Figure()
-
-fig_simple.add_trace(go.Bar(
-    x=[p_female*100, p_male*100],
-    y=['Naisparit', 'Miesparit'],
-    orientation='h',
-    marker=dict(color=['#e74c3c', '#3498db']),
-    text=[f'{p_female*100:.1f}%', f'{p_male*100:.1f}%'],
-    textposition='outside',
-    textfont=dict(size=20, color='black', family='Arial Black'),
-    hovertemplate='<b>%{y}</b><br>Eroaste: %{x:.1f}%<br><extra></extra>'
-))
-
-fig_simple.update_layout(
-    title=dict(
-        text="Samaa sukupuolta olevien parien avioerot 2017-2024",
-        font=dict(size=18, family='Arial', color='black')
-    ),
-    xaxis=dict(
-        title="Eroaste (%)",
-        range=[0, 30],
-        tickfont=dict(size=14),
-        titlefont=dict(size=16)
-    ),
-    yaxis=dict(
-        tickfont=dict(size=16, family='Arial Black'),
-        categoryorder='total ascending'
-    ),
-    height=300,
-    showlegend=False,
-    plot_bgcolor='white',
-    paper_bgcolor='white',
-    margin=dict(l=100, r=100, t=60, b=60)
-)
-
-st.plotly_chart(fig_simple, use_container_width=True)
+# Simple horizontal bar chart (built once per dataset version, see mariye/figures.py)
+st.plotly_chart(figure_spec('fig_simple', analysis), use_container_width=True)
 
-st.caption("""
-**Tulkinta:** Naisparien eroaste (21%) on noin 1.5-kertainen miespareihin (14%) verrattuna.
-Tämä kuvaaja sopii hyvin artikkelikäyttöön.
-""")
+st.caption(text.simple_chart_caption(analysis))
 
 st.markdown("---")
 
@@ -243,7 +118,7 @@ with st.expander("🧭 Lisäapu: Millaista lukua haet?"):
         "Valitse kysymyksesi:",
         (
             "📅 Kuinka moni tänä vuonna erosi? (vuosittainen rytmi)",
-            "📊 Kuinka monesta 2017-2024 solmitusta avioliitosta on jo tullut ero? (SUOSITUS)",
+            f"📊 Kuinka monesta {period} solmitusta avioliitosta on jo tullut ero? (SUOSITUS)",
             "🔮 Kuinka moni lopulta eroaa koskaan? (vaatii erikoisanalyysin, ei saatavilla)"
         ),
         index=1
@@ -262,9 +137,9 @@ with st.expander("🧭 Lisäapu: Millaista lukua haet?"):
         st.metric("Naisparit", f"{row['Divorces_Female']/row['Marriages_Female']*100:.1f}%")
         st.metric("Miesparit", f"{row['Divorces_Male']/row['Marriages_Male']*100:.1f}%")
         st.metric("Eri sukupuolta", f"{row['Divorces_Opposite']/row['Marriages_Opposite']*100:.1f}%")
-    elif "2017-2024 solmitusta" in choice:
-        st.success("""
-        **Mitä tämä mittaa:** Kuinka moni vuosina 2017-2024 solmituista avioliitoista on JO päättynyt eroon.
+    elif "solmitusta avioliitosta" in choice:
+        st.success(f"""
+        **Mitä tämä mittaa:** Kuinka moni vuosina {period} solmituista avioliitoista on JO päättynyt eroon.
 
         **Käyttötarkoitus:** Vertailla samaa sukupuolta olevien pareja keskenään (nais- vs miesparit).
 
@@ -312,7 +187,7 @@ with st.expander("🧭 Lisäapu: Millaista lukua haet?"):
 
         st.markdown("**📋 Kopioi artikkeliisi (tekninen versio):**")
         st.code(
-            f"Vuosina 2017–2024 naisparien eroaste oli {p_female*100:.1f}% ja miesparien {p_male*100:.1f}%. "
+            f"Vuosina {first_year}–{last_year} naisparien eroaste oli {p_female*100:.1f}% ja miesparien {p_male*100:.1f}%. "
             f"Ero on tilastollisesti merkitsevä (Fisher-testi p={p_value_fisher:.2e}), ja "
             f"naispareilla riski erota oli noin {risk_ratio_female_vs_male:.2f}-kertainen miespareihin verrattuna.",
             language="markdown"
@@ -329,9 +204,9 @@ with st.expander("🧭 Lisäapu: Millaista lukua haet?"):
 
         st.markdown("**📋 Mitä VOIT sanoa:**")
         st.code(
-            f"Vuosina 2017–2024 solmituista samaa sukupuolta olevien avioliitoista {p_same*100:.1f}% on jo päättynyt eroon. "
+            f"Vuosina {first_year}–{last_year} solmituista samaa sukupuolta olevien avioliitoista {p_same*100:.1f}% on jo päättynyt eroon. "
             "Tämä luku tulee todennäköisesti kasvamaan, kun avioliitot vanhenevat. "
-            "Lopullista eroastetta ei voi vielä arvioida luotettavasti, koska seuranta-aika on vasta 7-8 vuotta.",
+            f"Lopullista eroastetta ei voi vielä arvioida luotettavasti, koska seuranta-aika on vasta {last_year - first_year + 1} vuotta.",
             language="markdown"
         )
     else:
@@ -357,59 +232,37 @@ with st.expander("🧭 Lisäapu: Millaista lukua haet?"):
 st.markdown("### 📊 Avainluvut")
 
 show_hetero_indicator = st.toggle(
-    "Näytä heteroparien 2017–2024 'indikaattori' ⚠️ (VAROITUS: ei vertailukelpoinen!)",
+    f"Näytä heteroparien {first_year}–{last_year} 'indikaattori' ⚠️ (VAROITUS: ei vertailukelpoinen!)",
     value=True,
     help=(
-        "Luku = 2017–2024 avioerojen määrä / 2017–2024 solmittujen avioliittojen määrä. "
-        "Se EI ole elinaikainen todennäköisyys, koska 2017–2024 avioeroihin sisältyy paljon "
+        f"Luku = {first_year}–{last_year} avioerojen määrä / {first_year}–{last_year} solmittujen avioliittojen määrä. "
+        f"Se EI ole elinaikainen todennäköisyys, koska {first_year}–{last_year} avioeroihin sisältyy paljon "
         "vanhoja avioliittoja. Siksi luku ei ole vertailukelpoinen samaa sukupuolta olevien kanssa."
     )
 )
 
-col1, col2, col3, col4 = st.columns(4)
-
-with col1:
-    st.metric(
-        "Naisparien eroaste",
-        f"{df['Rate_Female'].iloc[-1]:.1f}%",
-        help="Avioerojen osuus kaikista 2017-2024 solmituista naisparien avioliitoista"
-    )
+*rate_columns, col4 = st.columns(4)
+*rate_figures, indicator = text.key_figures(analysis)
 
-with col2:
-    st.metric(
-        "Miesparien eroaste",
-        f"{df['Rate_Male'].iloc[-1]:.1f}%",
-        help="Avioerojen osuus kaikista 2017-2024 solmituista miesparien avioliitoista"
-    )
-
-with col3:
-    st.metric(
-        "Samaa sukupuolta yhteensä",
-        f"{df['Rate_SameSex'].iloc[-1]:.1f}%",
-        help="Avioerojen osuus kaikista 2017-2024 solmituista samaa sukupuolta olevien avioliitoista"
-    )
+for col, (label, value, help_text) in zip(rate_columns, rate_figures):
+    with col:
+        st.metric(label, value, help=help_text)
 
 with col4:
     if show_hetero_indicator:
-        st.metric(
-            "Eri sukupuolta (indikaattori)",
-            f"{df['Rate_Opposite'].iloc[-1]:.1f}%",
-            help=(
-                "2017–2024 avioerot / 2017–2024 solmitut heteroavioliitot. "
-                "Ei vertailukelpoinen samaa sukupuolta olevien kanssa ajoitusvinouman vuoksi."
-            )
-        )
+        label, value, help_text = indicator
+        st.metric(label, value, help=help_text)
     else:
         st.metric(
             "Eri sukupuolta",
             "—",
             help=(
-                "Heteroparien '57 %' ei ole vertailukelpoinen indikaattori. "
-                "Avaa alta selitys: 'Mikä on 57 %?'."
+                f"Heteroparien '{text.percent(groups['Opposite'].rate, 0)}' ei ole vertailukelpoinen indikaattori. "
+                f"Avaa alta selitys: '{text.misleading_title(analysis)}'."
             )
         )
 
-with st.expander("⚠️ Miksi 57% on harhaanjohtava? (TÄRKEÄ - lue tämä!)", expanded=True):
+with st.expander(f"⚠️ {text.misleading_title(analysis)} (TÄRKEÄ - lue tämä!)", expanded=True):
     st.markdown("""
     ### 🍎 Hedelmäpuutarha-analogia
 
@@ -418,149 +271,71 @@ with st.expander("⚠️ Miksi 57% on harhaanjohtava? (TÄRKEÄ - lue tämä!)",
 
     col_orchard1, col_orchard2 = st.columns(2)
 
-    with col_orchard1:
-        st.markdown("""
-        **🌳 Puutarha A: Samaa sukupuolta olevat parit**
-
-        - Istutettu: 2017-2024 (kaikki puut)
-        - Tippuneet omenat: 2017-2024
-        - Laskemme: Tippuneet / Istutetut = **21%**
+    orchard_a, orchard_b = text.orchards(analysis)
 
-        → Oikeudenmukainen laskutapa! ✅
-        """)
+    with col_orchard1:
+        st.markdown(orchard_a)
 
     with col_orchard2:
-        st.markdown("""
-        **🌳 Puutarha B: Eri sukupuolta olevat parit**
-
-        - Istutettu: 1950-2024 (monet vanhat puut!)
-        - Tippuneet omenat: 2017-2024
-        - Laskemme: Tippuneet / **VAIN 2017-2024 istutetut** = **57%**
-
-        → Epäreilu laskutapa! ❌
-        """)
+        st.markdown(orchard_b)
 
-    st.error("""
-    **❌ Ongelma:**
+    st.error(text.orchard_problem(analysis))
 
-    Puutarhan B omenat tulevat **kaikista** vuosina 1950-2024 istutetuista puista,
-    mutta laskemme vain vuosina 2017-2024 istutetut puut!
+    st.markdown("### 📊 Mitä tämä tarkoittaa numeroilla?")
+    st.markdown(text.misleading_numbers(analysis))
 
-    Tämä saa 57%:n näyttämään suurelta, mutta se ei kerro totuutta.
-    """)
-
-    st.markdown("""
-    ### 📊 Mitä tämä tarkoittaa numeroilla?
-
-    **Heteroparien 57%:**
-    - **Osoittaja** (erot 2017-2024): ~90,000 eroa
-      - Näihin sisältyy eroja 1990-, 2000-, 2010-luvulla solmituista avioliitoista
-    - **Nimittäjä** (avioliitot 2017-2024): ~155,000 avioliittoa
-      - Vain viimeisen 7-8 vuoden avioliitot
-    - **Tulos**: 90,000 / 155,000 ≈ 57%
-
-    **Samaa sukupuolta olevien 21%:**
-    - **Osoittaja** (erot 2017-2024): ~615 eroa
-      - Kaikki erot tulevat 2017-2024 solmituista avioliitoista
-    - **Nimittäjä** (avioliitot 2017-2024): ~3,300 avioliittoa
-      - Kaikki avioliitot
-    - **Tulos**: 615 / 3,300 ≈ 19%
-
-    **Siksi**: 57% ja 21% eivät ole vertailukelpoisia!
-    """)
-
-    st.success("""
-    **✅ Mitä voit sanoa turvallisesti:**
-
-    - "Naisparit eroavat useammin kuin miesparit (21% vs 14%)" ✅
-    - "Samaa sukupuolta olevien parien eroaste on 19%" ✅
-    - "Heteroparien '57%' ei ole vertailukelpoinen luku" ✅
-
-    **❌ Mitä et voi sanoa:**
-
-    - "Samaa sukupuolta olevat eroavat harvemmin kuin heteroparit" ❌
-    - "57% heteropareista eroaa" (ei pidä paikkaansa!) ❌
-    """)
+    st.success(text.safe_claims(analysis))
 
 st.divider()
 
 # Main chart: Cumulative divorce rates
 st.subheader("📈 Kumulatiivinen eroaste vuosittain")
 
-fig1 = go.Figure()
-
-fig1.add_trace(go.Scatter(
-    x=df['Year'], y=df['Rate_Male'],
-    name='Miesparit',
-    mode='lines+markers',
-    line=dict(color='#3498db', width=3),
-    marker=dict(size=8)
-))
-
-fig1.add_trace(go.Scatter(
-    x=df['Year'], y=df['Rate_Female'],
-    name='Naisparit',
-    mode='lines+markers',
-    line=dict(color='#e74c3c', width=3),
-    marker=dict(size=8)
-))
-
-fig1.add_trace(go.Scatter(
-    x=df['Year'], y=df['Rate_SameSex'],
-    name='Samaa sukupuolta yhteensä',
-    mode='lines+markers',
-    line=dict(color='#9b59b6', width=3, dash='dash'),
-    marker=dict(size=8)
-))
-
-fig1.add_trace(go.Scatter(
-    x=df['Year'], y=df['Rate_Opposite'],
-    name='Eri sukupuolta',
-    mode='lines+markers',
-    line=dict(color='#2ecc71', width=3, dash='dot'),
-    marker=dict(size=8)
-))
-
-fig1.update_layout(
-    xaxis_title="Vuosi",
-    yaxis_title="Kumulatiivinen eroaste (%)",
-    hovermode='x unified',
-    height=500,
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+show_trend = st.toggle(
+    "Näytä mallinnettu trendi ja 95 % luottamusväli",
+    value=False,
+    help=(
+        "Poisson-regressio vuosittaisista avioeroista (altisteena saman vuoden avioliitot, "
+        "vuoden toisen asteen polynomi, oma malli kullekin parityypille). Katkoviiva on mallin "
+        "kumulatiivinen eroaste, varjostus sen 95 % luottamusväli."
+    )
 )
 
-st.plotly_chart(fig1, use_container_width=True)
-
-st.caption("""
-**Kumulatiivinen eroaste** = (Avioerojen kokonaismäärä 2017-lähtien) / (Avioliittojen kokonaismäärä 2017-lähtien) × 100%  
-Kaavio näyttää, miten eroaste kehittyy ajan myötä kun avioliitot vanhenevat.
-""")
+st.plotly_chart(figure_spec('fig1_trend' if show_trend else 'fig1', analysis), use_container_width=True)
+
+st.caption(text.cumulative_caption(analysis))
+
+if show_trend:
+    trends = load_trends(analysis)
+    slopes = trends.coefficients[trends.coefficients['Term'] == 'Year']
+    st.dataframe(
+        pd.DataFrame({
+            'Parityyppi': [GROUP_LABELS[g] for g in slopes['Group']],
+            'Vuosimuutos (%)': (slopes['Rate_Ratio'] - 1) * 100,
+            '95 % LV alaraja (%)': (slopes['Lower'] - 1) * 100,
+            '95 % LV yläraja (%)': (slopes['Upper'] - 1) * 100,
+            'p-arvo': slopes['P_Value'],
+            'Ylihajonta': slopes['Dispersion'],
+        }).round(3),
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.caption(
+        f"Vuosimuutos = saman vuoden avioerojen suhteen (erot / avioliitot) muutos vuodessa "
+        f"jakson keskivaiheilla ({trends.table['Year'].min()}–{trends.table['Year'].max()}). "
+        "Luottamusvälit on levennetty ylihajonnalla (Pearson), koska vuosittaiset luvut "
+        "vaihtelevat enemmän kuin Poisson-malli olettaa."
+    )
 
 st.divider()
 
 # Simple takeaways for non-experts
 st.subheader("🧠 Kolme tärkeintä asiaa (selkokieli)")
-st.success(
-    """
-    - Naisparit eroavat tässä datassa useammin kuin miesparit.
-    - Heterolukua ("57 %") ei pidä verrata samaa sukupuolta oleviin – se mittaa eri asiaa.
-    - Jos haluat sanoa "kuinka moni päätyy joskus eroon", tarvitset keston (eloonjäämisanalyysi).
-    """
-)
+st.success(text.takeaways(analysis))
 
 # Copy-ready blurb
-copy_blurb = (
-    f"Vuosina 2017–2024 naisparien eroaste oli {p_female*100:.1f}% "
-    f"({female_divorces}/{female_marriages}) ja miesparien {p_male*100:.1f}% "
-    f"({male_divorces}/{male_marriages}). Ero on hyvin epätodennäköisesti sattumaa "
-    f"(Fisher p≈{p_value_fisher:.1e}). Naispareilla ero oli noin "
-    f"{risk_ratio_female_vs_male:.2f}-kertainen verrattuna miespareihin. "
-    f"Samaa sukupuolta olevien ja heteroparien suoraa vertailua ei voi tehdä reilusti, "
-    f"koska samaa sukupuolta olevien avioliitot alkavat vasta vuodesta 2017."
-)
-
 st.markdown("**Kopioi juttuun:**")
-st.code(copy_blurb, language="markdown")
+st.code(text.copy_blurb(analysis), language="markdown")
 
 st.caption("💡 **Vinkki:** Sanasto-termit löytyvät sivupalkin yläosasta!")
 
@@ -572,118 +347,26 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("💑 Solmitut avioliitot vuosittain")
     
-    fig2 = go.Figure()
-    
-    fig2.add_trace(go.Bar(
-        x=df['Year'],
-        y=df['Marriages_Male'],
-        name='Miesparit',
-        marker_color='#3498db'
-    ))
-    
-    fig2.add_trace(go.Bar(
-        x=df['Year'],
-        y=df['Marriages_Female'],
-        name='Naisparit',
-        marker_color='#e74c3c'
-    ))
-    
-    fig2.update_layout(
-        xaxis_title="Vuosi",
-        yaxis_title="Avioliittojen määrä",
-        barmode='group',
-        height=400
-    )
-    
-    st.plotly_chart(fig2, use_container_width=True)
+    st.plotly_chart(figure_spec('fig2', analysis), use_container_width=True)
 
 with col2:
     st.subheader("💔 Avioerot vuosittain")
     
-    fig3 = go.Figure()
-    
-    fig3.add_trace(go.Bar(
-        x=df['Year'],
-        y=df['Divorces_Male'],
-        name='Miesparit',
-        marker_color='#3498db'
-    ))
-    
-    fig3.add_trace(go.Bar(
-        x=df['Year'],
-        y=df['Divorces_Female'],
-        name='Naisparit',
-        marker_color='#e74c3c'
-    ))
-    
-    fig3.update_layout(
-        xaxis_title="Vuosi",
-        yaxis_title="Avioerojen määrä",
-        barmode='group',
-        height=400
-    )
-    
-    st.plotly_chart(fig3, use_container_width=True)
+    st.plotly_chart(figure_spec('fig3', analysis), use_container_width=True)
 
 st.divider()
 
 # Summary statistics
-st.subheader("📊 Yhteenvetotaulukko (2017-2024)")
-
-summary = pd.DataFrame({
-    'Parityyppi': ['Miesparit', 'Naisparit', 'Samaa sukupuolta yhteensä', 'Eri sukupuolta'],
-    'Avioliitot': [
-        df['Marriages_Male'].sum(),
-        df['Marriages_Female'].sum(),
-        df['Marriages_SameSex'].sum(),
-        df['Marriages_Opposite'].sum()
-    ],
-    'Avioerot': [
-        df['Divorces_Male'].sum(),
-        df['Divorces_Female'].sum(),
-        df['Divorces_SameSex'].sum(),
-        df['Divorces_Opposite'].sum()
-    ],
-    'Eroaste (%)': [
-        df['Rate_Male'].iloc[-1],
-        df['Rate_Female'].iloc[-1],
-        df['Rate_SameSex'].iloc[-1],
-        df['Rate_Opposite'].iloc[-1]
-    ]
-})
-
-# Format numbers
-summary['Avioliitot'] = summary['Avioliitot'].apply(lambda x: f"{x:,}".replace(',', ' '))
-summary['Avioerot'] = summary['Avioerot'].apply(lambda x: f"{x:,}".replace(',', ' '))
-summary['Eroaste (%)'] = summary['Eroaste (%)'].apply(lambda x: f"{x:.1f}%")
-
-st.dataframe(summary, use_container_width=True, hide_index=True)
+st.subheader(f"📊 Yhteenvetotaulukko ({period})")
+
+st.dataframe(text.summary_table(analysis), use_container_width=True, hide_index=True)
 
 st.divider()
 
 # Important notes
 st.subheader("⚠️ Tärkeät huomiot")
 
-st.warning("""
-**Tilastollinen rajoitus:**
-
-1. **Samaa sukupuolta olevien avioliitot** laillistettiin Suomessa maaliskuussa 2017
-   - Data kattaa vain 7-8 vuoden ajanjakson
-   - Kaikki avioerot tulevat maksimissaan 8 vuotta vanhoista avioliitoista
-
-2. **Eri sukupuolta olevien parien avioerot** voivat tulla avioliitoista, jotka on solmittu 1990-luvulla tai aikaisemmin
-   - Data kattaa vuosikymmeniä
-   - Mukana paljon vanhempia avioliittoja
-
-3. **Avioeron todennäköisyys kasvaa avioliiton keston myötä**
-   - Tämä tekee suorasta vertailusta ongelmallisen
-   - 57% vs 19% -lukuja ei voi suoraan verrata
-
-**Mitä voimme sanoa:**
-- ✅ Naisparit eroavat useammin kuin miesparit (21% vs 14%)
-- ✅ Samaa sukupuolta olevien parien eroaste on kasvussa (odotetusti)
-- ❌ Emme voi sanoa, että "samaa sukupuolta olevat eroavat harvemmin" - data on liian uutta
-""")
+st.warning(text.limitations(analysis))
 
 with st.expander("Kysymyksiä ja vastauksia (journalistille)"):
     st.markdown(
@@ -701,12 +384,7 @@ with st.expander("Kysymyksiä ja vastauksia (journalistille)"):
 
 # Data source
 st.divider()
-st.caption("""
-**Lähde:** Tilastokeskus, Siviilisäädyn muutokset  
-https://pxdata.stat.fi/PxWeb/pxweb/fi/StatFin/StatFin__ssaaty/statfin_ssaaty_pxt_121e.px/
-
-**Viimeksi päivitetty:** 24.4.2025
-""")
+st.caption(text.SOURCE_NOTE + "\n**Viimeksi päivitetty:** 24.4.2025")
 
 # ============================================================================
 # ADVANCED STATISTICAL SECTION
@@ -723,95 +401,31 @@ st.info("""
 Perustilastot yllä ovat oikein, mutta tässä osiossa näytämme kehittyneempiä menetelmiä.
 """)
 
-# Tabs for different statistical topics
-tab1, tab2, tab3, tab4 = st.tabs([
-    "📊 Luottamusvälit & Merkitsevyys",
-    "🎓 Bayesilainen Analyysi", 
-    "📚 Akateeminen vs. Journalistinen",
-    "💾 Puuttuvan Datan Hankkiminen"
-])
+# Topics of the statistician corner. Each topic is a render function and only
+# the selected one runs (see render_statistics_corner below); st.tabs would
+# execute every tab, including the tests and figures of hidden tabs, on each rerun.
 
 # ============================================================================
 # TAB 1: Confidence Intervals & Significance
 # ============================================================================
-with tab1:
+def render_confidence_tab():
     st.subheader("Luottamusvälit ja Tilastollinen Merkitsevyys")
     
-    st.markdown("""
+    st.markdown(f"""
     **Miksi tämä on tärkeää?**
     
-    Pelkkä prosenttiluku (esim. "21%") ei kerro:
+    Pelkkä prosenttiluku (esim. "{text.percent(p_female, 0)}") ei kerro:
     - Kuinka varma voimme olla luvusta
     - Onko ero ryhmien välillä todellinen vai sattumaa
     
     Tilastollinen analyysi vastaa näihin kysymyksiin.
     """)
     
-    # Calculate confidence intervals using Wilson score method
-    def wilson_score_interval(successes, trials, confidence=0.95):
-        if trials == 0:
-            return 0, 0, 0
-        p = successes / trials
-        z = stats.norm.ppf((1 + confidence) / 2)
-        denominator = 1 + z**2 / trials
-        center = (p + z**2 / (2 * trials)) / denominator
-        margin = z * np.sqrt((p * (1 - p) / trials + z**2 / (4 * trials**2))) / denominator
-        return p, max(0, center - margin), min(1, center + margin)
-    
-    # Calculate for each group
-    male_marriages = df['Marriages_Male'].sum()
-    male_divorces = df['Divorces_Male'].sum()
-    female_marriages = df['Marriages_Female'].sum()
-    female_divorces = df['Divorces_Female'].sum()
-    opposite_marriages = df['Marriages_Opposite'].sum()
-    opposite_divorces = df['Divorces_Opposite'].sum()
-    
-    groups_data = [
-        ('Naisparit', female_marriages, female_divorces, '#e74c3c'),
-        ('Miesparit', male_marriages, male_divorces, '#3498db'),
-        ('Eri sukupuolta', opposite_marriages, opposite_divorces, '#2ecc71')
-    ]
-    
-    ci_results = []
-    for name, marriages, divorces, color in groups_data:
-        rate, ci_lower, ci_upper = wilson_score_interval(divorces, marriages)
-        ci_results.append({
-            'Group': name,
-            'Rate': rate * 100,
-            'CI_Lower': ci_lower * 100,
-            'CI_Upper': ci_upper * 100,
-            'Color': color
-        })
+    # Wilson score intervals for each group (precomputed in mariye.core)
+    ci_results = analysis.ci_frame().to_dict('records')
     
     # Visualization: Confidence Intervals
-    fig_ci = go.Figure()
-    
-    for i, result in enumerate(ci_results):
-        fig_ci.add_trace(go.Bar(
-            y=[result['Group']],
-            x=[result['Rate']],
-            orientation='h',
-            name=result['Group'],
-            marker_color=result['Color'],
-            error_x=dict(
-                type='data',
-                symmetric=False,
-                array=[result['CI_Upper'] - result['Rate']],
-                arrayminus=[result['Rate'] - result['CI_Lower']],
-                thickness=2,
-                width=10
-            ),
-            showlegend=False
-        ))
-    
-    fig_ci.update_layout(
-        title="Eroasteet 95% Luottamusvälein",
-        xaxis_title="Eroaste (%) ± 95% Luottamusväli",
-        yaxis_title="",
-        height=300
-    )
-    
-    st.plotly_chart(fig_ci, use_container_width=True)
+    st.plotly_chart(figure_spec('fig_ci', analysis), use_container_width=True)
     
     # Display numerical results
     st.markdown("### 📊 Numeeriset Tulokset")
@@ -823,7 +437,7 @@ with tab1:
             "Naisparit",
             f"{ci_results[0]['Rate']:.2f}%",
             delta=f"±{(ci_results[0]['CI_Upper'] - ci_results[0]['CI_Lower'])/2:.2f}%",
-            help=f"95% Luottamusväli: [{ci_results[0]['CI_Lower']:.2f}% - {ci_results[0]['CI_Upper']:.2f}%]"
+            help=f"95% Luottamusväli: {text.interval(ci_results[0]['CI_Lower'], ci_results[0]['CI_Upper'], unit='%')}"
         )
     
     with col2:
@@ -831,7 +445,7 @@ with tab1:
             "Miesparit",
             f"{ci_results[1]['Rate']:.2f}%",
             delta=f"±{(ci_results[1]['CI_Upper'] - ci_results[1]['CI_Lower'])/2:.2f}%",
-            help=f"95% Luottamusväli: [{ci_results[1]['CI_Lower']:.2f}% - {ci_results[1]['CI_Upper']:.2f}%]"
+            help=f"95% Luottamusväli: {text.interval(ci_results[1]['CI_Lower'], ci_results[1]['CI_Upper'], unit='%')}"
         )
     
     with col3:
@@ -839,7 +453,7 @@ with tab1:
             "Eri sukupuolta",
             f"{ci_results[2]['Rate']:.2f}%",
             delta=f"±{(ci_results[2]['CI_Upper'] - ci_results[2]['CI_Lower'])/2:.2f}%",
-            help=f"95% Luottamusväli: [{ci_results[2]['CI_Lower']:.2f}% - {ci_results[2]['CI_Upper']:.2f}%]"
+            help=f"95% Luottamusväli: {text.interval(ci_results[2]['CI_Lower'], ci_results[2]['CI_Upper'], unit='%')}"
         )
     
     st.markdown("---")
@@ -847,20 +461,22 @@ with tab1:
     # Statistical significance test
     st.markdown("### 🧪 Tilastollinen merkitsevyys: Naisparit vs. miesparit")
     
-    st.markdown("""
-    **Kysymys:** Onko naisparien korkeampi eroaste (21% vs 14%) todellinen ero, 
+    st.markdown(f"""
+    **Kysymys:** Onko naisparien korkeampi eroaste ({text.percent(p_female, 0)} vs {text.percent(p_male, 0)}) todellinen ero, 
     vai voisiko se johtua sattumasta?
     
     **Testit:**
     """)
     
     # Fisher's exact test
-    contingency_table = np.array([
-        [male_divorces, male_marriages - male_divorces],
-        [female_divorces, female_marriages - female_divorces]
-    ])
+    odds_ratio = analysis.odds_ratio
+    
+    # Parametric bootstrap (BCa) intervals for OR, RR and h (mariye.bootstrap, cached per dataset)
+    boot = load_bootstrap(analysis)
     
-    odds_ratio, p_value_fisher = stats.fisher_exact(contingency_table)
+    def bootstrap_caption(statistic, digits=2):
+        lower, upper = boot.interval(statistic)
+        st.caption(f"95% bootstrap-luottamusväli (BCa): [{lower:.{digits}f} – {upper:.{digits}f}]")
     
     col1, col2 = st.columns(2)
     
@@ -879,34 +495,22 @@ with tab1:
                 "Odds‑suhde ei ole sama kuin riskisuhde, mutta pienillä prosenteilla ne ovat lähekkäin."
             )
         )
+        bootstrap_caption('Odds_Ratio')
     
-    if p_value_fisher < 0.05:
-        st.success(f"""
-        ✅ **ERO ON TILASTOLLISESTI MERKITSEVÄ** (p = {p_value_fisher:.6f} < 0.05)
-        
-        Tämä tarkoittaa:
-        - Ero ei johdu sattumasta
-        - Voimme luottavaisin mielin sanoa: "Naisparit eroavat useammin kuin miesparit"
-        - Naisparilla on **{1/odds_ratio:.2f} kertaa** suurempi todennäköisyys erota
-        """)
-    else:
-        st.warning("Ero ei ole tilastollisesti merkitsevä (p ≥ 0.05)")
+    kind, note = text.significance_note(analysis)
+    getattr(st, kind)(note)
     
     # Effect size
     st.markdown("### 📏 Efektikoko (Cohen's h)")
     
-    def cohens_h(p1, p2):
-        return 2 * (np.arcsin(np.sqrt(p1)) - np.arcsin(np.sqrt(p2)))
-    
-    p_female = female_divorces / female_marriages
-    p_male = male_divorces / male_marriages
-    h = cohens_h(p_female, p_male)
-    risk_ratio = (p_female / p_male) if p_male > 0 else float('inf')
+    h = analysis.cohens_h
+    risk_ratio = risk_ratio_female_vs_male
     
     col1, col2 = st.columns([1, 2])
     
     with col1:
         st.metric("Cohen's h", f"{h:.3f}")
+        bootstrap_caption('Cohens_H', digits=3)
 
     with col2:
         st.metric(
@@ -914,12 +518,9 @@ with tab1:
             f"{risk_ratio:.2f}x",
             help="Todennäköisyyksien suhde: p(ero | naispari) / p(ero | miespari)"
         )
-        if abs(h) < 0.2:
-            st.info("📊 **Pieni efekti** - Ero on olemassa, mutta ei valtava")
-        elif abs(h) < 0.5:
-            st.warning("📊 **Keskikokoinen efekti** - Merkittävä ero")
-        else:
-            st.error("📊 **Suuri efekti** - Hyvin suuri ero")
+        bootstrap_caption('Risk_Ratio')
+        kind, note = text.effect_note(h)
+        getattr(st, kind)(note)
     
     st.markdown("""
     **Tulkinta:**
@@ -927,14 +528,61 @@ with tab1:
     - Pieni: < 0.2, Keskikokoinen: 0.2-0.5, Suuri: > 0.5
     - Meidän tapauksessamme: Ero ON merkitsevä, mutta efekti on pieni
     """)
+    st.caption(
+        f"Luottamusvälit: {boot.resamples:,} parametrista bootstrap-otosta (binomijakaumasta, "
+        f"siemen {boot.seed}), BCa-korjattu. Kun välin alaraja on yli 1 (OR, RR) tai yli 0 (h), "
+        "ero on samaan suuntaan koko välillä."
+    )
+
+    # Power planning: exact power of the Fisher test (mariye.power)
+    st.markdown("### 🔋 Tilastollinen teho ja otoskoko")
+
+    st.markdown("""
+    **Kysymys:** Kuinka todennäköisesti Fisherin testi havaitsee eron, jos se on todellinen?
+    Teho lasketaan tarkasti käymällä läpi kaikki mahdolliset tulokset; otoskoon haussa yli 6 000
+    avioliiton otoksille käytetään normaaliapproksimaatiota, joka on silloin lähes sama.
+    """)
+
+    male, female = analysis.groups['Male'], analysis.groups['Female']
+    ratio = female.marriages / male.marriages
+    # Range timed in benchmarks/bench_power.py: under a second per move, cold
+    assumed_rr = st.slider(
+        "Oletettu todellinen riskisuhde (naisparit / miesparit)",
+        min_value=1.1, max_value=2.0, step=0.05,
+        value=min(2.0, max(1.1, round(risk_ratio_female_vs_male * 20) / 20)),
+        help=f"Miesparien eroaste pidetään havaitussa arvossa ({male.rate*100:.2f}%)"
+    )
+    p_female_assumed = min(male.rate * assumed_rr, 0.99)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        observed_power = exact_power(male.marriages, female.marriages, male.rate, p_female_assumed)
+        st.metric(
+            "Teho nykyisellä otoksella",
+            f"{observed_power*100:.1f}%",
+            help=f"{male.marriages} miesparin ja {female.marriages} naisparin avioliittoa, α = 0.05"
+        )
+
+    with col2:
+        needed = sample_size(male.rate, p_female_assumed, ratio=ratio)
+        st.metric(
+            "Otoskoko 80% teholle",
+            f"{needed} + {round(needed * ratio)}" if needed is not None else "> 10 000",
+            help="Miesparien + naisparien avioliittoja samassa suhteessa kuin nyt"
+        )
+
+    curve = power_curve(range(100, 1501, 200), male.rate, p_female_assumed, ratio=ratio)
+    curve['Teho (%)'] = curve['Power'] * 100
+    st.line_chart(curve.set_index('n1')['Teho (%)'], x_label="Miesparien avioliittoja", y_label="Teho (%)")
 
 # ============================================================================
 # TAB 2: Bayesian Analysis
 # ============================================================================
-with tab2:
+def render_bayes_tab():
     st.subheader("Bayesilainen Lähestymistapa")
     
-    st.markdown("""
+    st.markdown(f"""
     **Mikä on Bayesilainen analyysi?**
     
     Perinteinen (frekventistinen) tilastotiede:
@@ -944,93 +592,101 @@ with tab2:
     Bayesilainen analyysi:
     - "Todennäköisyysjakauma sille, mikä TODELLINEN eroaste on"
     - Helpompi tulkita
-    - Erityisen hyvä pienille otoksille (kuten miesparit, n=1,057)
+    - Erityisen hyvä pienille otoksille (kuten miesparit, n={text.thousands(male_marriages)})
     """)
     
-    # Bayesian analysis
-    def bayesian_estimate(successes, trials, prior_alpha=1, prior_beta=1):
-        posterior_alpha = prior_alpha + successes
-        posterior_beta = prior_beta + (trials - successes)
-        mean = posterior_alpha / (posterior_alpha + posterior_beta)
-        ci_lower = beta.ppf(0.025, posterior_alpha, posterior_beta)
-        ci_upper = beta.ppf(0.975, posterior_alpha, posterior_beta)
-        return mean, ci_lower, ci_upper, posterior_alpha, posterior_beta
-    
-    # Calculate for same-sex couples only
-    mean_male, ci_lower_male, ci_upper_male, alpha_male, beta_male = bayesian_estimate(
-        male_divorces, male_marriages
-    )
-    mean_female, ci_lower_female, ci_upper_female, alpha_female, beta_female = bayesian_estimate(
-        female_divorces, female_marriages
-    )
-    
     # Visualize posterior distributions
-    x = np.linspace(0, 0.35, 1000)
-    y_male = beta.pdf(x, alpha_male, beta_male)
-    y_female = beta.pdf(x, alpha_female, beta_female)
-    
-    fig_bayes = go.Figure()
-    
-    fig_bayes.add_trace(go.Scatter(
-        x=x*100, y=y_male,
-        mode='lines',
-        name='Miesparit',
-        fill='tozeroy',
-        line=dict(color='#3498db', width=2),
-        opacity=0.7
-    ))
-    
-    fig_bayes.add_trace(go.Scatter(
-        x=x*100, y=y_female,
-        mode='lines',
-        name='Naisparit',
-        fill='tozeroy',
-        line=dict(color='#e74c3c', width=2),
-        opacity=0.7
-    ))
-    
-    fig_bayes.update_layout(
-        title="Bayesilainen Posteriorijakauma<br><sub>Todennäköisyysjakauma sille, mikä todellinen eroaste on</sub>",
-        xaxis_title="Eroaste (%)",
-        yaxis_title="Todennäköisyystiheys",
-        height=400,
-        hovermode='x unified'
-    )
+    st.plotly_chart(figure_spec('fig_bayes', analysis), use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    
+    # Posterior means and credible intervals (precomputed in mariye.core)
+    with col1:
+        st.markdown(text.posterior_summary(groups['Male']))
+    
+    with col2:
+        st.markdown(text.posterior_summary(groups['Female']))
     
-    st.plotly_chart(fig_bayes, use_container_width=True)
+    # P(p_female > p_male) and the risk-ratio posterior (mariye.bayes, cached per dataset)
+    comparison = load_comparison(analysis)
+    female_vs_male = comparison.pair('Female', 'Male')
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("**Miesparit:**")
-        st.write(f"• Estimaatti: {mean_male*100:.2f}%")
-        st.write(f"• 95% Credible Interval: [{ci_lower_male*100:.2f}% - {ci_upper_male*100:.2f}%]")
-        st.write(f"• Otoskoko: n={male_marriages:,}")
+        st.metric(
+            "P(naisparien eroaste > miesparien)",
+            text.probability(female_vs_male['Prob_Greater']),
+            help="Posteriorijakaumista laskettu todennäköisyys sille, että naisparien todellinen eroaste on suurempi"
+        )
     
     with col2:
-        st.markdown("**Naisparit:**")
-        st.write(f"• Estimaatti: {mean_female*100:.2f}%")
-        st.write(f"• 95% Credible Interval: [{ci_lower_female*100:.2f}% - {ci_upper_female*100:.2f}%]")
-        st.write(f"• Otoskoko: n={female_marriages:,}")
+        st.metric(
+            "Riskisuhde (naisparit / miesparit)",
+            f"{female_vs_male['RR_Median']:.2f}x",
+            help="Riskisuhteen posteriorijakauman mediaani"
+        )
+        st.write(f"• 95% Credible Interval: {text.interval(female_vs_male['RR_Lower'], female_vs_male['RR_Upper'])}")
+    
+    with st.expander("Kaikki ryhmäparit"):
+        st.dataframe(text.pairs_table(analysis, comparison), use_container_width=True, hide_index=True)
+        st.caption(text.pairs_caption(comparison))
     
     st.markdown("---")
     
-    st.markdown("""
+    st.markdown(f"""
     **Mitä jakauma kertoo?**
     
     - **Korkeampi huippu** = Varmempi estimaatti (naisparilla korkeampi, koska suurempi otos)
     - **Leveämpi jakauma** = Epävarmempi estimaatti (miesparilla leveämpi, koska pienempi otos)
-    - **Ei päällekkäisyyttä** = Selvä ero ryhmien välillä
+    - **Päällekkäisyys** = Todennäköisyys sille, että naisparien eroaste on suurempi, on 
+      {text.probability(female_vs_male['Prob_Greater'])}
+    """)
     
-    **Johtopäätös:**
-    Vaikka miesparien otoskoko on pienempi, ero naispareihin on niin selvä, että 
-    voimme luottavaisin mielin sanoa että todellinen ero on olemassa.
+    if female_vs_male['Prob_Greater'] > 0.95:
+        st.markdown("""
+        **Johtopäätös:**
+        Vaikka miesparien otoskoko on pienempi, ero naispareihin on niin selvä, että 
+        voimme luottavaisin mielin sanoa että todellinen ero on olemassa.
+        """)
+    else:
+        st.markdown("""
+        **Johtopäätös:**
+        Jakaumat menevät osittain päällekkäin, joten datan perusteella ei voi 
+        luottavaisin mielin sanoa, kumman ryhmän todellinen eroaste on suurempi.
+        """)
+
+    st.markdown("---")
+
+    # Hierarchical model of the yearly ratios (mariye.hierarchical)
+    st.markdown("### 📅 Vuosittaiset arviot: hierarkkinen malli")
+
+    fit = load_hierarchical(analysis)
+    male_2017 = fit.group('Male').iloc[0]
+
+    st.markdown(f"""
+    Yksittäisen vuoden luvut ovat pieniä (esim. miesparit {int(male_2017['Year'])}:
+    {int(male_2017['Divorces'])} avioero {int(male_2017['Marriages'])} avioliitosta).
+    Hierarkkinen malli arvioi kunkin ryhmän kaikista vuosista, kuinka paljon vuodet
+    tyypillisesti eroavat toisistaan, ja vetää epävarmoja vuosia sen verran kohti
+    ryhmän keskitasoa.
+
+    - Ryhmien keskitasot: miesparit {fit.mean['Male']*100:.1f}%, naisparit {fit.mean['Female']*100:.1f}%
+    - Priorin paino vastaa miesparien **{fit.concentration['Male']:.0f}** ja naisparien
+      **{fit.concentration['Female']:.0f} avioliittoa**: vuoden oma data painaa sitä enemmän,
+      mitä useampi avioliitto vuonna solmittiin
     """)
 
+    st.plotly_chart(yearly_shrinkage(fit), use_container_width=True)
+    st.caption(
+        "Luvut ovat vuoden avioerot / vuoden avioliitot (eri vuosien avioliitoista), "
+        "eivät kumulatiivisia eroasteita."
+    )
+
 # ============================================================================
 # TAB 3: Academic vs Journalistic
 # ============================================================================
-with tab3:
+def render_academic_tab():
     st.subheader("Akateeminen Julkaisu vs. Journalistinen Artikkeli")
     
     st.markdown("""
@@ -1063,7 +719,7 @@ with tab3:
             '✅ Kyllä (tässä versiossa)',
             '❌ Ei',
             '❌ Ei',
-            '⚠️ 7-8 vuotta (rajoite)',
+            f'⚠️ {last_year - first_year + 1} vuotta (rajoite)',
             '❌ Ei tarvita',
             '✅ Kyllä, selkeästi',
             '✅ Yksinkertainen',
@@ -1131,11 +787,11 @@ with tab3:
         """)
     
     with col2:
-        st.markdown("""
+        st.markdown(f"""
         **3. Pidempi Seuranta-aika**
         
         *Ongelma nyt:*
-        - Vain 7-8 vuotta dataa samaa sukupuolta olevista
+        - Vain {last_year - first_year + 1} vuotta dataa samaa sukupuolta olevista
         - Monet avioerot tapahtuvat 10-20 vuoden aikana
         
         *Ratkaisu:*
@@ -1144,7 +800,7 @@ with tab3:
         
         *Miksi tärkeää?*
         - Eroaste kasvaa ajan myötä
-        - Nykyinen 19% tulee varmasti kasvamaan
+        - Nykyinen {text.percent(p_same, 0)} tulee varmasti kasvamaan
         """)
         
         st.markdown("""
@@ -1169,7 +825,7 @@ with tab3:
     # What IS valid
     st.markdown("### ✅ Mitä Nykyinen Analyysi ON ja VOIDAAN sanoa")
     
-    st.success("""
+    st.success(f"""
     **Tämä analyysi on:**
     
     1. **Metodologisesti pätevä perustasolla**
@@ -1194,21 +850,21 @@ with tab3:
        - Opettaa tilastollista ajattelua
     
     **Voimme luottavaisin mielin sanoa:**
-    - ✅ "Naisparit eroavat useammin kuin miesparit (21% vs 14%, p<0.001)"
+    - ✅ "Naisparit eroavat useammin kuin miesparit ({text.percent(p_female, 0)} vs {text.percent(p_male, 0)}, p={p_value_fisher:.1e})"
     - ✅ "Ero on tilastollisesti merkitsevä"
-    - ✅ "Vuosina 2017-2024 solmituista samaa sukupuolta olevien avioliitoista 18.6% on päättynyt eroon"
+    - ✅ "Vuosina {period} solmituista samaa sukupuolta olevien avioliitoista {text.percent(p_same)} on päättynyt eroon"
     - ✅ "Eroaste on kasvussa ajan myötä (odotettu)"
     
     **Emme voi sanoa:**
     - ❌ "Samaa sukupuolta olevat eroavat harvemmin kuin heteroparit" (aika-ongelma!)
     - ❌ "Ero johtuu sukupuolesta" (ei kontrolloitu muita tekijöitä)
-    - ❌ "Lopullinen eroaste tulee olemaan 19%" (vielä liian aikaista)
+    - ❌ "Lopullinen eroaste tulee olemaan {text.percent(p_same, 0)}" (vielä liian aikaista)
     """)
 
 # ============================================================================
 # TAB 4: Data Availability
 # ============================================================================
-with tab4:
+def render_data_tab():
     st.subheader("Puuttuvan Datan Hankkiminen")
     
     st.markdown("""
@@ -1223,13 +879,7 @@ with tab4:
     
     st.markdown("### 🗄️ Datan Saatavuus")
     
-    tab_a, tab_b, tab_c = st.tabs([
-        "📋 Tilastokeskuksen Mikrodata",
-        "🌍 Pohjoismaiset Rekisterit",
-        "💡 Käytännön Neuvot"
-    ])
-    
-    with tab_a:
+    def render_microdata():
         st.markdown("""
         #### Tilastokeskuksen Tutkijakäyttö
         
@@ -1287,7 +937,7 @@ with tab4:
         - **Yhteensä projekti: 40,000-100,000 € (2-3 vuotta)**
         """)
     
-    with tab_b:
+    def render_nordic_registers():
         st.markdown("""
         #### Pohjoismaiset Väestörekisterit
         
@@ -1355,7 +1005,7 @@ with tab4:
            - Vuosi 3: Kirjoittaminen ja julkaisu
         """)
     
-    with tab_c:
+    def render_practical_advice():
         st.markdown("""
         #### Käytännön Neuvot
 
@@ -1446,6 +1096,20 @@ with tab4:
         - 0 €
         """)
     
+    data_topics = {
+        "📋 Tilastokeskuksen Mikrodata": render_microdata,
+        "🌍 Pohjoismaiset Rekisterit": render_nordic_registers,
+        "💡 Käytännön Neuvot": render_practical_advice,
+    }
+    data_topic = st.segmented_control(
+        "Datan saatavuus",
+        list(data_topics),
+        default="📋 Tilastokeskuksen Mikrodata",
+        key="data_topic",
+        label_visibility="collapsed"
+    )
+    data_topics[data_topic or "📋 Tilastokeskuksen Mikrodata"]()
+    
     st.markdown("---")
     
     st.markdown("### 📊 Yhteenveto: Datan Saatavuus")
@@ -1505,16 +1169,149 @@ with tab4:
     - Se on rehellinen, pätevä, ja selittää rajoitukset
     """)
 
+# ============================================================================
+# TAB 5: Regional breakdown
+# ============================================================================
+def render_regions_tab():
+    st.subheader("Eroasteet alueittain")
+
+    try:
+        breakdown = load_region_breakdown()
+    except PxWebError as exc:
+        st.info(f"""
+        Alueittaista taulukkoa ei ole saatavilla ({exc}).
+
+        Tilastokeskus julkaisee avioliitot ja avioerot myös alueittain. Kun taulukon
+        tunnus on asetettu (MARIYE_REGION_TABLE), tämä näkymä näyttää eroasteet
+        jokaiselle alueelle.
+        """)
+        return
+
+    if not breakdown.years:
+        st.info("Alueittaisessa taulukossa ei ole yhtään riviä, joten eroasteita ei voi näyttää.")
+        return
+
+    st.markdown(f"""
+    **Ongelma:** Pienillä alueilla on vain muutama samaa sukupuolta olevien parien
+    avioliitto. Yksi avioero kolmesta avioliitosta antaa eroasteeksi 33%, mikä on
+    lähinnä sattumaa.
+
+    **Ratkaisu: empiirinen Bayes.** Jokaisen ryhmän kaikista alueista estimoidaan
+    yhteinen jakauma, ja pienten alueiden arviot vedetään kohti sitä. Suurten alueiden
+    arviot pysyvät lähes havaitun suuruisina. Ajanjakso: {breakdown.years[0]}-{breakdown.years[-1]}.
+    """)
+
+    labels = {GROUP_LABELS[key]: key for key in ('Female', 'Male', 'SameSex', 'Opposite')}
+    label = st.selectbox("Ryhmä", list(labels), key="region_group")
+    key = labels[label]
+    rows = breakdown.group(key)
+
+    prior = breakdown.priors.set_index('Group').loc[key]
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Alueita", f"{(rows['Marriages'] > 0).sum()}")
+    with col2:
+        st.metric("Yhteinen eroaste (priori)", f"{prior['Prior_Rate']:.1f}%")
+    with col3:
+        st.metric(
+            "Priorin paino",
+            f"{prior['Concentration']:.0f} avioliittoa",
+            help="Alue, jolla on näin monta avioliittoa, vedetään puoliväliin kohti yhteistä eroastetta"
+        )
+
+    limit = st.slider("Näytettäviä alueita", 10, 100, 30, step=10, key="region_limit")
+    st.plotly_chart(regional_rates(breakdown, key, limit), use_container_width=True)
+
+    st.dataframe(
+        rows[['Region_Label', 'Marriages', 'Divorces', 'Rate', 'CI_Lower', 'CI_Upper',
+              'EB_Rate', 'Cred_Lower', 'Cred_Upper']].rename(columns={
+            'Region_Label': 'Alue', 'Marriages': 'Avioliitot', 'Divorces': 'Avioerot',
+            'Rate': 'Eroaste (%)', 'CI_Lower': 'LV alaraja', 'CI_Upper': 'LV yläraja',
+            'EB_Rate': 'Tasoitettu (%)', 'Cred_Lower': 'UV alaraja', 'Cred_Upper': 'UV yläraja',
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption("LV = 95% Wilson-luottamusväli havaitulle eroasteelle, "
+               "UV = 95% uskottavuusväli tasoitetulle (empiirinen Bayes) eroasteelle.")
+
+    with st.expander("Naisparit vs. miesparit alueittain (Fisherin tarkka testi)"):
+        st.dataframe(
+            breakdown.tests.dropna(subset=['P_Value']).sort_values('P_Value').rename(columns={
+                'Region_Label': 'Alue', 'Rate_Female': 'Naisparit (%)', 'Rate_Male': 'Miesparit (%)',
+                'Odds_Ratio': 'Odds-suhde', 'P_Value': 'p-arvo', 'P_Adjusted': 'Korjattu p-arvo',
+            }).drop(columns='Region'),
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption("Testejä on yksi jokaista aluetta kohti, joten osa pienistä p-arvoista "
+                   "on odotettavasti sattumaa. Korjattu p-arvo (Benjamini-Hochberg) ottaa "
+                   "testien määrän huomioon: alle 0.05 tarkoittaa, että enintään 5% "
+                   "löydöksistä on odotettavasti vääriä. Odds-suhde on ehdollinen "
+                   "suurimman uskottavuuden estimaatti (kuten R:n fisher.test).")
+
+    with st.expander("Lataa alueittaiset taulukot"):
+        render_downloads(breakdown, {
+            'regions': 'Eroasteet alueittain',
+            'region_tests': 'Naisparit vs. miesparit alueittain',
+        }, key="region_download")
+
+
+STATISTICS_TABS = {
+    "📊 Luottamusvälit & Merkitsevyys": render_confidence_tab,
+    "🎓 Bayesilainen Analyysi": render_bayes_tab,
+    "🗺️ Alueittain": render_regions_tab,
+    "📚 Akateeminen vs. Journalistinen": render_academic_tab,
+    "💾 Puuttuvan Datan Hankkiminen": render_data_tab,
+}
+
+
+FORMAT_LABELS = {'csv': 'CSV', 'parquet': 'Parquet', 'json-stat': 'JSON-stat', 'xlsx': 'Excel'}
+
+
+@st.fragment
+def render_downloads(source, tables, key):
+    """Table and format pickers; the file is only generated when asked for"""
+    table = st.selectbox("Taulukko", list(tables), format_func=tables.get, key=f"{key}_table")
+    fmt = st.selectbox("Muoto", available_formats(), format_func=FORMAT_LABELS.get,
+                       key=f"{key}_format")
+    if st.button("Valmistele tiedosto", key=f"{key}_prepare"):
+        st.session_state[f"{key}_prepared"] = (table, fmt)
+    if st.session_state.get(f"{key}_prepared") == (table, fmt):
+        st.download_button(
+            label=f"Lataa {filename(table, fmt)}",
+            data=export_bytes(table, source, fmt),
+            file_name=filename(table, fmt),
+            mime=FORMATS[fmt].mime,
+            key=f"{key}_file",
+        )
+
+
+@st.fragment
+def render_statistics_corner():
+    """Render only the selected topic; switching topics reruns just this fragment"""
+    topic = st.segmented_control(
+        "Aihe",
+        list(STATISTICS_TABS),
+        default="📊 Luottamusvälit & Merkitsevyys",
+        key="statistics_topic",
+        label_visibility="collapsed"
+    )
+    STATISTICS_TABS[topic or "📊 Luottamusvälit & Merkitsevyys"]()
+
+
+render_statistics_corner()
+
 # Sidebar
 with st.sidebar:
     st.header("Tietoja")
 
-    st.markdown("""
+    st.markdown(f"""
     ### 📚 Sanasto (selkokieli)
 
     **Tärkeimmät termit ymmärrettävästi:**
 
-    - **Eroaste**: Kuinka monesta 2017–2024 solmitusta avioliitosta on jo tullut ero.
+    - **Eroaste**: Kuinka monesta {first_year}–{last_year} solmitusta avioliitosta on jo tullut ero.
 
     - **Kumulatiivinen**: "Kasautunyt" - lasketaan yhteen kaikki tapahtumat vuodesta 2017 alkaen.
 
@@ -1529,20 +1326,20 @@ with st.sidebar:
 
     st.divider()
 
-    st.markdown("""
+    st.markdown(f"""
     ### 📌 Projektin tarkoitus
     Tämä analyysi on tehty artikkelikäyttöön vertailemaan samaa sukupuolta
     ja eri sukupuolta olevien parien avioeroja Suomessa.
     
     ### 📅 Ajanjakso
-    2017-2024 (samaa sukupuolta olevien avioliitot laillistettiin 3/2017)
+    {period} (samaa sukupuolta olevien avioliitot laillistettiin 3/2017)
     
     ### 🔍 Metodologia
     - Kumulatiivinen eroaste = Avioerojen kokonaismäärä / Avioliittojen kokonaismäärä
     - Kaikki luvut laskettu vuodesta 2017 alkaen
     
     ### ⚠️ Rajoitukset
-    - Samaa sukupuolta: vain 7-8 vuoden data
+    - Samaa sukupuolta: vain {last_year - first_year + 1} vuoden data
     - Eri sukupuolta: mukana vuosikymmeniä vanhoja avioliittoja
     - Suora vertailu ei ole täysin oikeudenmukainen
     """)
@@ -1553,11 +1350,9 @@ with st.sidebar:
     ### 📊 Lataa data
     """)
     
-    # Download data
-    csv = df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="Lataa CSV",
-        data=csv,
-        file_name="avioerot_2017_2024.csv",
-        mime="text/csv",
-    )
+    # Files are generated on demand, once per dataset version
+    render_downloads(analysis, {
+        'yearly': 'Vuosittaiset luvut',
+        'groups': 'Eroasteet ryhmittäin',
+        'datawrapper': 'Datawrapper-taulukko',
+    }, key="download")
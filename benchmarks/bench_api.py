@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: JSON API throughput on a single core
+
+Usage: python3 benchmarks/bench_api.py [requests] [connections]
+Starts `python -m mariye.api --builtin` on the bundled data in a subprocess
+pinned to one CPU (where the platform allows), then drives it from
+`connections` concurrent keep-alive connections (default 32) with
+`requests` requests per phase (default 20,000):
+
+- full:         GET /v1/summary, served from the per-version response cache
+- revalidated:  the same with If-None-Match, answered 304 without a body
+- mixed:        rotating over summary, groups, yearly and comparison
+
+and prints requests per second with median and 99th percentile latency.
+The ASGI application is also timed in-process (no sockets) as the ceiling.
+On a one-core machine the load generator shares the core with the server.
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from mariye.api import Api
+
+MIXED = ['/v1/summary', '/v1/groups/Female', '/v1/groups/Male', '/v1/yearly', '/v1/comparison']
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def fetch(reader, writer, path, etag=None):
+    request = f'GET {path} HTTP/1.1\r\nHost: localhost\r\n'
+    if etag:
+        request += f'If-None-Match: {etag}\r\n'
+    writer.write((request + '\r\n').encode('latin-1'))
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()).strip():
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('etag')
+
+
+async def load(port, paths, total, connections, revalidate=False):
+    latencies = []
+    counter = iter(range(total))
+
+    async def client():
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        etags = {}
+        for i in counter:
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            status, tag = await fetch(reader, writer, path, etags.get(path) if revalidate else None)
+            latencies.append(time.perf_counter() - start)
+            assert status == (304 if revalidate and path in etags else 200), status
+            etags[path] = tag
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    return total / elapsed, np.percentile(latencies, [50, 99]) * 1000
+
+
+async def in_process(total):
+    application = Api('bundled', offline=True)
+    scope = {'type': 'http', 'method': 'GET', 'path': '/v1/summary', 'headers': []}
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await application(scope, receive, send)  # warm up: load and render
+    start = time.perf_counter()
+    for _ in range(total):
+        await application(scope, receive, send)
+    return total / (time.perf_counter() - start)
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    port = free_port()
+
+    command = [sys.executable, '-m', 'mariye.api', '--builtin', '--source', 'bundled',
+               '--offline', '--port', str(port)]
+    server = subprocess.Popen(command, cwd=ROOT, stderr=subprocess.DEVNULL,
+                              preexec_fn=(lambda: os.sched_setaffinity(0, {0}))
+                              if hasattr(os, 'sched_setaffinity') else None)
+    try:
+        for _ in range(200):
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        # Warm up: load the dataset and render every route once
+        for path in MIXED:
+            await fetch(reader, writer, path)
+        writer.close()
+
+        print(f"requests:     {total:,} per phase over {connections} connections")
+        for name, paths, revalidate in [('full', ['/v1/summary'], False),
+                                        ('revalidated', ['/v1/summary'], True),
+                                        ('mixed', MIXED, False)]:
+            rate, (p50, p99) = await load(port, paths, total, connections, revalidate)
+            print(f"{name + ':':13s} {rate:9,.0f} req/s  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms")
+    finally:
+        server.terminate()
+        server.wait()
+    print(f"in-process:   {await in_process(total):9,.0f} req/s  (ASGI app without sockets)")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
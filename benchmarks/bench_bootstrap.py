@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark: parametric bootstrap of the female vs male comparison
+
+Usage: python3 benchmarks/bench_bootstrap.py [resamples] [loop_resamples]
+Times mariye.bootstrap.bootstrap_pair (all resamples as one array, six
+statistics, percentile + BCa intervals) for `resamples` (default 10^6) with
+one thread and with all CPUs, and a per-resample Python loop for
+`loop_resamples` (default 20,000), in resamples per second. Checks that the
+seeded result does not depend on the number of threads.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.bootstrap import bootstrap_pair, resample_counts
+from mariye.core import cohens_h, load_analysis
+from mariye.data import DATA
+
+
+def loop_bootstrap(x, n, resamples, seed=2017):
+    # One resample at a time, the way a scalar implementation would do it
+    rng = np.random.default_rng(seed)
+    values = []
+    for _ in range(resamples):
+        p_a = rng.binomial(n[0], x[0] / n[0]) / n[0]
+        p_b = rng.binomial(n[1], x[1] / n[1]) / n[1]
+        values.append((p_a / p_b, (p_a / (1 - p_a)) / (p_b / (1 - p_b)), cohens_h(p_a, p_b)))
+    return np.quantile(np.array(values), [0.025, 0.975], axis=0)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    resamples = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    loop_resamples = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    analysis = load_analysis(DATA)
+    x = [analysis.groups[k].divorces for k in ('Female', 'Male')]
+    n = [analysis.groups[k].marriages for k in ('Female', 'Male')]
+
+    assert np.array_equal(resample_counts(x, n, 200_000, workers=1),
+                          resample_counts(x, n, 200_000, workers=4))
+
+    _, loop_time = timed(loop_bootstrap, x, n, loop_resamples)
+    single, single_time = timed(bootstrap_pair, analysis, resamples=resamples, workers=1)
+    cpus = os.cpu_count()
+    _, multi_time = timed(bootstrap_pair, analysis, resamples=resamples, workers=cpus)
+
+    print(f"{'loop:':16s} {loop_time:8.3f} s  {loop_resamples / loop_time:12,.0f} resamples/s")
+    print(f"{'batch, 1 thread:':16s} {single_time:8.3f} s  {resamples / single_time:12,.0f} resamples/s")
+    print(f"{f'batch, {cpus} CPUs:':16s} {multi_time:8.3f} s  {resamples / multi_time:12,.0f} resamples/s")
+    print()
+    print(single.table.round(4).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PNG chart rendering for the report builder
+
+Usage: python3 benchmarks/bench_charts.py [jobs]
+Per chart (mariye.charts): building its template from scratch vs copying the
+cached one, and drawing + saving the PNG at the report's DPI. Then a forced
+rebuild of all chart targets into a temporary directory, serially and with a
+pool of `jobs` processes (default: CPU count), with the per-target times the
+report CLI prints. The pool only helps with more than one CPU.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye import charts, report
+from mariye.core import load_analysis
+from mariye.data import DATA
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    analysis = load_analysis(DATA)
+    charts.prime()
+
+    print(f"{'chart':28s} {'template':>9s} {'copy':>7s} {'draw':>7s} {'save':>7s}  (ms, {report.DPI} dpi)")
+    for name, make in charts.TEMPLATES.items():
+        _, fresh = timed(make)
+        _, copied = timed(charts.template, name)
+        fig, draw = timed(getattr(charts, name), analysis)
+        _, save = timed(fig.savefig, io.BytesIO(), format='png', dpi=report.DPI, bbox_inches='tight')
+        print(f"{name:28s} {fresh * 1000:9.1f} {copied * 1000:7.1f} {draw * 1000:7.1f} {save * 1000:7.0f}")
+
+    targets = [t.name for t in report.TARGETS.values() if t.filename.endswith('.png')]
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, n in [('serial', 1), (f'{jobs} jobs', jobs)]:
+            results, seconds = timed(report.build, targets, tmp, DATA, jobs=n, force=True)
+            print(f"\n{label}:")
+            print(report.format_results(results, seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory footprint of a full-size PxWeb cube
+
+Usage: python3 benchmarks/bench_cube.py [regions] [ages] [durations]
+Generates a json-stat2 payload shaped like a whole StatFin table of marriages
+and divorces: `regions` regions (default 330: municipalities, maakunta and the
+whole country) x 1990-2024 x `ages` age groups (default 10) x `durations`
+marriage durations (default 30) x 6 series, with municipal-size counts and a
+few missing cells. Parses it with the flat long-frame parser used before
+mariye.cube, with mariye.pxweb.parse_json_stat2 (compact long frame) and
+mariye.pxweb.parse_cube, and prints the memory each result holds and the
+peak allocated while building it (tracemalloc), then times the wide
+conversions and sums the analysis needs from the Cube.
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.pxweb import parse_cube, parse_json_stat2
+
+SERIES = {
+    'vihit_eri': 'Vihityt, eri sukupuolta olevat', 'vihit_m': 'Vihityt, miesparit',
+    'vihit_n': 'Vihityt, naisparit', 'ero_eri': 'Avioerot, eri sukupuolta olevat',
+    'ero_m': 'Avioerot, miesparit', 'ero_n': 'Avioerot, naisparit',
+}
+
+
+def payload(regions, ages, durations, seed=2017):
+    rng = np.random.default_rng(seed)
+    codes = {
+        'Alue': ['SSS'] + [f'KU{i:03d}' for i in range(regions - 1)],
+        'Vuosi': [str(y) for y in range(1990, 2025)],
+        'Ikä': [f'{15 + 5 * i}-{19 + 5 * i}' for i in range(ages)],
+        'Kesto': [str(d) for d in range(durations)],
+        'Tiedot': list(SERIES),
+    }
+    shape = [len(c) for c in codes.values()]
+    size = rng.lognormal(1, 1.2, shape[0])[:, None, None, None, None]
+    values = rng.poisson(np.broadcast_to(size * np.array([60, 0.3, 0.6, 30, 0.1, 0.2]), shape)).astype(float)
+    values[rng.random(values.shape) < 0.001] = np.nan
+    value_list = [None if np.isnan(v) else int(v) for v in values.ravel().tolist()]
+    dimension = {dim: {'category': {'index': c, 'label': SERIES if dim == 'Tiedot' else {k: k for k in c}}}
+                 for dim, c in codes.items()}
+    return {'id': list(codes), 'size': shape, 'dimension': dimension, 'value': value_list}
+
+
+def flat_parse(payload):
+    # The parser before mariye.cube: code strings per dimension, float64 values
+    dims = payload['id']
+    codes = [payload['dimension'][dim]['category']['index'] for dim in dims]
+    index = pd.MultiIndex.from_product(codes, names=dims)
+    frame = index.to_frame(index=False)
+    frame['value'] = pd.to_numeric(pd.Series(payload['value'], dtype='object'), errors='coerce')
+    return frame
+
+
+def frame_bytes(frame):
+    # Column buffers; string objects are shared per category and not counted
+    return int(frame.memory_usage(index=False, deep=False).sum())
+
+
+def measured(build, *args):
+    # Wall time untraced, then the peak allocation under tracemalloc
+    start = time.perf_counter()
+    result = build(*args)
+    seconds = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = build(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def main():
+    regions = int(sys.argv[1]) if len(sys.argv) > 1 else 330
+    ages = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    durations = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+    data = payload(regions, ages, durations)
+    cells = len(data['value'])
+    print(f"cube:        {' x '.join(map(str, data['size']))} = {cells:,} cells")
+    print(f"{'layout':22s} {'holds MB':>9s} {'peak MB':>9s} {'parse s':>8s}")
+
+    frame, seconds, peak = measured(flat_parse, data)
+    print(f"{'flat long frame':22s} {frame_bytes(frame) / 1e6:9.1f} {peak / 1e6:9.1f} {seconds:8.2f}")
+    del frame
+
+    (frame, _), seconds, peak = measured(parse_json_stat2, data)
+    print(f"{'compact long frame':22s} {frame_bytes(frame) / 1e6:9.1f} {peak / 1e6:9.1f} {seconds:8.2f}"
+          f"  value {frame['value'].dtype}")
+    del frame
+
+    cube, seconds, peak = measured(parse_cube, data)
+    print(f"{'Cube':22s} {cube.nbytes / 1e6:9.1f} {peak / 1e6:9.1f} {seconds:8.2f}"
+          f"  value {cube.values.dtype}")
+
+    start = time.perf_counter()
+    national = cube.sum(['Ikä', 'Kesto']).take('Alue', ['SSS']).to_wide(['Vuosi'])
+    middle = time.perf_counter()
+    regional = cube.drop('Alue', ['SSS']).sum(['Ikä', 'Kesto']).to_wide(['Alue', 'Vuosi'])
+    end = time.perf_counter()
+    print()
+    print(f"national wide frame:   {(middle - start) * 1000:8.1f} ms  {national.shape}")
+    print(f"regional wide frame:   {(end - middle) * 1000:8.1f} ms  {regional.shape}")
+
+
+if __name__ == '__main__':
+    main()
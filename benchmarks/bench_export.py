@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark: on-demand exports of a large regional table
+
+Usage: python3 benchmarks/bench_export.py [regions] [chunk_rows]
+Builds the regional breakdown of generated counts for `regions` regions
+(default 20,000, i.e. 80,000 region x couple type rows) and times, per
+format, the first export (rendered while streaming, chunk_rows rows per
+chunk, default 10,000) and a repeated one (served from the per-version
+cache), with the largest chunk as a share of the whole file. The app used to
+pay the first-export cost for the yearly CSV on every rerun.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye import export
+from mariye.regions import breakdown
+from bench_regions import regional_counts
+
+
+def timed_stream(*args, **kwargs):
+    start = time.perf_counter()
+    chunks = list(export.stream(*args, **kwargs))
+    return chunks, time.perf_counter() - start
+
+
+def main():
+    regions = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    chunk_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    source = breakdown(regional_counts(regions))
+
+    print(f"rows:        {len(source.rates):,} (chunks of {chunk_rows:,})")
+    for fmt in export.available_formats():
+        chunks, first = timed_stream('regions', source, fmt, chunk_rows=chunk_rows)
+        _, cached = timed_stream('regions', source, fmt, chunk_rows=chunk_rows)
+        size = sum(len(c) for c in chunks)
+        largest = max(len(c) for c in chunks) / size
+        print(f"{fmt + ':':12s} {first:7.3f} s first, {cached * 1000:7.3f} ms cached  "
+              f"{size / 1e6:6.2f} MB in {len(chunks)} chunks (largest {largest:.0%})")
+
+
+if __name__ == '__main__':
+    main()
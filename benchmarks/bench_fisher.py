@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batched Fisher exact test vs a loop over scipy.stats.fisher_exact
+
+Usage: python3 benchmarks/bench_fisher.py [tables] [loop_tables]
+Runs mariye.significance.fisher_test (p-values, sample and conditional odds
+ratios) on `tables` generated 2x2 tables (default 10^5, group sizes up to
+3000) and on the bundled group totals, whose opposite-sex margins run to
+175k marriages, and times a Python loop of scipy.stats.fisher_exact and
+scipy.stats.contingency.odds_ratio over the first `loop_tables` (default
+2000) for the per-table rate. Every table of the loop is checked against
+the batch result.
+"""
+
+import sys
+import time
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+from scipy import stats
+from scipy.stats.contingency import odds_ratio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.core import GROUPS, analyze
+from mariye.data import DATA
+from mariye.significance import conditional_odds_ratio, fisher_test, tables_from_counts
+from bench_significance import generated_tables
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def scipy_loop(tables):
+    p_value = np.array([stats.fisher_exact(t)[1] for t in tables])
+    conditional = np.array([odds_ratio(t, kind='conditional').statistic for t in tables])
+    return p_value, conditional
+
+
+def check(tables, p_value, conditional, expected_p, expected_conditional):
+    assert np.allclose(p_value, expected_p, rtol=1e-9, atol=0)
+    assert np.array_equal(np.isfinite(conditional), np.isfinite(expected_conditional))
+    finite = np.isfinite(expected_conditional)
+    assert np.allclose(conditional[finite], expected_conditional[finite], rtol=1e-8, atol=0)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10**5
+    loop_count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    tables = generated_tables(count)
+
+    # All pairs of the bundled group totals, opposite-sex included
+    analysis = analyze(DATA)
+    marriages = np.array([analysis.groups[g].marriages for g in GROUPS])
+    divorces = np.array([analysis.groups[g].divorces for g in GROUPS])
+    i, j = (np.array(x) for x in zip(*combinations(range(len(GROUPS)), 2)))
+    totals = tables_from_counts(divorces[i], marriages[i], divorces[j], marriages[j])
+
+    (_, p_value), batch = timed(fisher_test, tables)
+    conditional, conditional_time = timed(conditional_odds_ratio, tables)
+    (expected_p, expected_conditional), loop = timed(scipy_loop, tables[:loop_count])
+    check(tables[:loop_count], p_value[:loop_count], conditional[:loop_count],
+          expected_p, expected_conditional)
+
+    (_, totals_p), totals_batch = timed(fisher_test, totals, True)
+    (expected_p, expected_conditional), totals_loop = timed(scipy_loop, totals)
+    check(totals, totals_p, conditional_odds_ratio(totals), expected_p, expected_conditional)
+
+    loop_rate = loop_count / loop
+    print(f"tables:          {count:,} (loop over {loop_count:,})")
+    print(f"p-values:        {batch:8.3f} s  {count / batch:12,.0f} tables/s")
+    print(f"conditional OR:  {conditional_time:8.3f} s  {count / conditional_time:12,.0f} tables/s")
+    print(f"scipy loop:      {loop:8.3f} s  {loop_rate:12,.0f} tables/s "
+          f"(batch {count / (batch + conditional_time) / loop_rate:.0f}x faster)")
+    print(f"group totals:    {totals_batch * 1000:8.2f} ms batch, {totals_loop * 1000:.2f} ms loop "
+          f"({len(totals)} pairs, up to {marriages.max():,} marriages)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hierarchical beta-binomial fit against an interactive latency budget
+
+Usage: python3 benchmarks/bench_hierarchical.py [budget_seconds]
+Times mariye.hierarchical.fit_yearly on the bundled data (it runs inside the
+app's cached layer on every new dataset version) and fit_hyperparameters on
+a generated 50 x 300 array, and exits with status 1 when the bundled fit
+exceeds the budget (default 0.05 s). The median fitted concentration of the
+generated groups is checked against the value they were drawn with.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.core import analyze
+from mariye.data import DATA
+from mariye.hierarchical import fit_hyperparameters, fit_yearly
+
+
+def best_of(fn, *args, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+    analysis = analyze(DATA)
+    fit_yearly(analysis)  # warm up
+
+    fit, bundled = best_of(fit_yearly, analysis)
+
+    rng = np.random.default_rng(2017)
+    mean = rng.uniform(0.05, 0.5, 300)
+    trials = rng.integers(20, 2000, size=(50, 300))
+    successes = rng.binomial(trials, rng.beta(mean * 40, (1 - mean) * 40, size=(50, 300)))
+    (_, concentration, _), generated = best_of(fit_hyperparameters, successes, trials, repeat=3)
+    concentration = np.median(concentration)
+    assert abs(np.log(concentration / 40)) < 0.1
+
+    print(f"bundled:      {bundled * 1000:8.2f} ms  ({len(fit.table)} cells, budget {budget * 1000:.0f} ms)")
+    print(f"generated:    {generated * 1000:8.2f} ms  (15,000 cells, median concentration {concentration:.1f} vs 40)")
+    if bundled > budget:
+        print("OVER BUDGET")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
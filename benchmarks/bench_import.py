@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import time of the mariye entry points, against a budget
+
+Usage: python3 benchmarks/bench_import.py [repeats] [scale]
+Imports each module in a fresh interpreter with `python -X importtime`
+(best of `repeats`, default 3) and checks its cumulative import time against
+BUDGETS (milliseconds, multiplied by `scale`, default 1, for slower
+machines), and that none of the heavy modules it does not need (matplotlib,
+scipy.stats, plotly.express, ...) were loaded. Also times `--list` of the
+report and site CLIs end to end. Exits with status 1 if a budget is broken.
+"""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy modules that no entry point below needs at import time
+HEAVY = ('matplotlib', 'scipy.stats', 'scipy.optimize', 'plotly.express', 'plotly.offline', 'IPython')
+
+# module: (budget in ms, heavy modules it may import)
+BUDGETS = {
+    'mariye.figures': (50, ()),
+    'mariye.core': (900, ()),
+    'mariye.report': (900, ()),
+    'mariye.update': (1000, ()),
+    'mariye.api': (1100, ()),
+    'mariye.export': (1200, ()),
+    'mariye.site': (1200, ()),
+    'mariye.cache': (1700, ()),
+    'mariye.charts': (1500, ('matplotlib',)),
+}
+
+CLI = [
+    ['-m', 'mariye.report', '--list'],
+    ['-m', 'mariye.site', '--list'],
+]
+
+
+def import_profile(module):
+    """(cumulative ms of `module`, names of all modules it imported) from -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    total = None
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        loaded.add(name.strip())
+        if name == f' {module}':
+            total = int(cumulative) / 1000
+    return total, loaded
+
+
+def heavy_imports(loaded, allowed):
+    return sorted(h for h in HEAVY if h not in allowed
+                  and any(n == h or n.startswith(h + '.') for n in loaded))
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    scale = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    failed = False
+
+    print(f"{'module':16s} {'import ms':>10s} {'budget':>8s}  heavy modules")
+    for module, (budget, allowed) in BUDGETS.items():
+        profiles = [import_profile(module) for _ in range(repeats)]
+        best = min(total for total, _ in profiles)
+        heavy = heavy_imports(profiles[0][1], allowed)
+        over = best > budget * scale
+        failed = failed or over or bool(heavy)
+        flag = '  OVER BUDGET' if over else ''
+        print(f"{module:16s} {best:10.0f} {budget * scale:8.0f}  {', '.join(heavy) or '-'}{flag}")
+
+    for args in CLI:
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, check=True)
+            times.append(time.perf_counter() - start)
+        print(f"{' '.join(args[1:]):28s} {min(times) * 1000:8.0f} ms wall")
+
+    if failed:
+        print('import budget exceeded')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
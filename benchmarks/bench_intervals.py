@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized Wilson/Beta intervals vs the old per-group scalar loop
+
+Usage: python3 benchmarks/bench_intervals.py [n_cells]
+The scalar loop is timed on a 10 000 cell subsample and extrapolated.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import stats
+from scipy.stats import beta
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.intervals import bayesian_estimate, wilson_score_interval
+
+
+def scalar_wilson(successes, trials, confidence=0.95):
+    # The per-group implementation previously copied into app.py
+    if trials == 0:
+        return 0, 0, 0
+    p = successes / trials
+    z = stats.norm.ppf((1 + confidence) / 2)
+    denominator = 1 + z**2 / trials
+    center = (p + z**2 / (2 * trials)) / denominator
+    margin = z * np.sqrt((p * (1 - p) / trials + z**2 / (4 * trials**2))) / denominator
+    return p, max(0, center - margin), min(1, center + margin)
+
+
+def scalar_bayes(successes, trials, prior_alpha=1, prior_beta=1):
+    posterior_alpha = prior_alpha + successes
+    posterior_beta = prior_beta + (trials - successes)
+    mean = posterior_alpha / (posterior_alpha + posterior_beta)
+    return (mean, beta.ppf(0.025, posterior_alpha, posterior_beta),
+            beta.ppf(0.975, posterior_alpha, posterior_beta))
+
+
+def main():
+    n_cells = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+    rng = np.random.default_rng(2017)
+    trials = rng.integers(0, 500, size=n_cells)
+    successes = rng.binomial(trials, 0.2)
+
+    start = time.perf_counter()
+    _, w_lower, w_upper = wilson_score_interval(successes, trials)
+    _, b_lower, b_upper, _, _ = bayesian_estimate(successes, trials)
+    vector_time = time.perf_counter() - start
+
+    sample = min(n_cells, 10_000)
+    start = time.perf_counter()
+    loop = [(scalar_wilson(s, n), scalar_bayes(s, n))
+            for s, n in zip(successes[:sample].tolist(), trials[:sample].tolist())]
+    loop_time = (time.perf_counter() - start) * n_cells / sample
+
+    # Same numbers as the loop
+    assert np.allclose([w[1] for w, _ in loop], w_lower[:sample])
+    assert np.allclose([w[2] for w, _ in loop], w_upper[:sample])
+    assert np.allclose([b[1] for _, b in loop], b_lower[:sample])
+    assert np.allclose([b[2] for _, b in loop], b_upper[:sample])
+
+    print(f"cells:      {n_cells:,}")
+    print(f"vectorized: {vector_time:8.3f} s  ({n_cells / vector_time:,.0f} cells/s)")
+    print(f"loop (est): {loop_time:8.3f} s  ({n_cells / loop_time:,.0f} cells/s)")
+    print(f"speedup:    {loop_time / vector_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: opening a full-size cached cube, Parquet vs memory-mapped .npy
+
+Usage: python3 benchmarks/bench_mmap.py [workers] [regions]
+Caches a generated table of `regions` regions (default 330) x 1990-2024 x 10
+age groups x 30 durations x 6 series (about 21M cells) in a temporary
+directory twice: as the compact long Parquet frame and as the .npy cube that
+mariye.pxweb writes for json-stat2 tables. Then `workers` processes (default
+4, like Streamlit workers plus the report CLI) open it at the same time and
+build the regional year table. Prints per process the open and pivot times
+and the memory it holds privately (RssAnon) vs mapped from the page cache
+(RssFile, one copy shared by all of them).
+"""
+
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from mariye import pxweb
+from mariye.cube import Cube
+
+WORKER = '''
+import sys, time
+start = time.perf_counter()
+from mariye import pxweb
+from mariye.cube import from_long
+import pandas as pd
+mode, cache_dir = sys.argv[1], sys.argv[2]
+imported = time.perf_counter()
+if mode == 'parquet':
+    frame = pd.read_parquet(cache_dir + '/long.parquet')
+    meta = pxweb._read_meta(pxweb.Path(cache_dir) / 'long.json')
+    cube = from_long(frame, meta['labels'])
+else:
+    cube, meta = pxweb.load_cube(offline=True, cache_dir=cache_dir)
+opened = time.perf_counter()
+wide = cube.drop('Alue', ['SSS']).sum(['Ikä', 'Kesto']).to_wide(['Alue', 'Vuosi'])
+done = time.perf_counter()
+status = dict(line.split(':', 1) for line in open('/proc/self/status'))
+kb = lambda key: int(status.get(key, '0 kB').split()[0]) / 1000
+print(opened - imported, done - opened, kb('RssAnon'), kb('RssFile'))
+'''
+
+
+def generated_cube(regions, seed=2017):
+    rng = np.random.default_rng(seed)
+    codes = {
+        'Alue': ('SSS',) + tuple(f'KU{i:03d}' for i in range(regions - 1)),
+        'Vuosi': tuple(str(y) for y in range(1990, 2025)),
+        'Ikä': tuple(f'{15 + 5 * i}-{19 + 5 * i}' for i in range(10)),
+        'Kesto': tuple(str(d) for d in range(30)),
+        'Tiedot': ('vihit_eri', 'vihit_m', 'vihit_n', 'ero_eri', 'ero_m', 'ero_n'),
+    }
+    shape = tuple(len(c) for c in codes.values())
+    size = rng.lognormal(1, 1.2, shape[0])[:, None, None, None, None]
+    rates = np.array([60, 0.3, 0.6, 30, 0.1, 0.2])
+    values = rng.poisson(np.broadcast_to(size * rates, shape)).astype(np.uint16)
+    labels = {dim: {code: code for code in c} for dim, c in codes.items()}
+    return Cube(tuple(codes), codes, labels, values)
+
+
+def cache(cube, cache_dir):
+    # The files pxweb.load_table writes for a json-stat2 table, and the
+    # Parquet frame it used to write
+    data_path, meta_path = pxweb._cache_paths(pxweb.TABLE, None, cache_dir)
+    meta = {'labels': cube.labels, 'checked_at': time.time(), 'content_hash': '0' * 64,
+            'cube': pxweb._write_cube(cube, data_path, '0' * 64)}
+    pxweb._write_meta(meta_path, meta)
+    cube.to_long().to_parquet(cache_dir / 'long.parquet', index=False)
+    (cache_dir / 'long.json').write_text(json.dumps({'labels': cube.labels}), encoding='utf-8')
+
+
+def run_workers(mode, cache_dir, workers):
+    procs = [subprocess.Popen([sys.executable, '-c', WORKER, mode, str(cache_dir)], cwd=ROOT,
+                              stdout=subprocess.PIPE, text=True) for _ in range(workers)]
+    return [tuple(map(float, p.communicate()[0].split())) for p in procs]
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    regions = int(sys.argv[2]) if len(sys.argv) > 2 else 330
+    cube = generated_cube(regions)
+    print(f"cube:    {' x '.join(map(str, cube.shape))} = {cube.values.size:,} cells, "
+          f"{cube.nbytes / 1e6:.1f} MB")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        cache(cube, cache_dir)
+        for path in sorted(cache_dir.iterdir()):
+            print(f"         {path.name:54s} {path.stat().st_size / 1e6:8.1f} MB")
+        print()
+        print(f"{'format':8s} {'open ms':>9s} {'pivot ms':>9s} {'RssAnon MB':>11s} {'RssFile MB':>11s}"
+              f"   (mean of {workers} concurrent workers)")
+        for mode in ('parquet', 'npy'):
+            run_workers(mode, cache_dir, 1)  # warm the page cache
+            results = np.array(run_workers(mode, cache_dir, workers))
+            opened, pivot, anon, mapped = results.mean(axis=0)
+            print(f"{mode:8s} {opened * 1000:9.1f} {pivot * 1000:9.1f} {anon:11.1f} {mapped:11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pairwise posterior comparison against an interactive latency budget
+
+Usage: python3 benchmarks/bench_posterior.py [draws] [budget_seconds]
+(draws default to mariye.bayes.DEFAULT_DRAWS)
+Times mariye.bayes.compare_groups on the bundled data (cold, i.e. without the
+per-version memo) and exits with status 1 when it exceeds the budget
+(default 0.5 s, the time a Streamlit rerun may spend on it).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.bayes import DEFAULT_DRAWS, compare_groups, prob_greater
+from mariye.core import analyze
+from mariye.data import DATA
+
+
+def main():
+    draws = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DRAWS
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    analysis = analyze(DATA)
+    compare_groups(analysis, draws=1000)  # warm up imports and quadrature nodes
+
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        comparison = compare_groups(analysis, draws=draws)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+
+    # Exact probabilities for many comparisons in one call
+    rng = np.random.default_rng(2017)
+    params = rng.integers(1, 5000, size=(4, 10_000))
+    start = time.perf_counter()
+    prob_greater(*params)
+    exact_time = time.perf_counter() - start
+
+    # Monte Carlo agrees with the exact integral
+    table = comparison.table
+    assert np.allclose(table['Prob_Greater'], table['Prob_Greater_MC'], atol=5 / np.sqrt(draws))
+
+    print(f"draws:        {draws:,}")
+    print(f"pairs:        {len(table):,} (ordered)")
+    print(f"compare:      {best:8.3f} s  (budget {budget:.3f} s)")
+    print(f"exact P(>):   {exact_time / 10_000 * 1e6:8.1f} us per comparison")
+    if best > budget:
+        print("OVER BUDGET")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: exact Fisher power against an interactive latency budget
+
+Usage: python3 benchmarks/bench_power.py [budget_seconds]
+Times mariye.power at the bundled sample sizes: the acceptance intervals
+(cold), a power query on cached intervals (what a slider move costs), a
+100 x 100 power grid and the app's power curve. Then walks the app's risk
+ratio slider (1.1 to 2.0) with everything the power section computes per
+move, caches cleared, and reports the slowest step and the peak RSS.
+Exits with status 1 when a query exceeds the budget (default 0.05 s) or a
+slider move exceeds 20 times it. The rejection region is checked cell by
+cell against scipy.stats.fisher_exact on a small table first.
+"""
+
+import resource
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye import power
+from mariye.core import analyze
+from mariye.data import DATA
+
+# The app's slider range for the assumed risk ratio
+SLIDER_RR = np.round(np.arange(1.1, 2.0001, 0.05), 2)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def slider_move(male, female, ratio, rr):
+    p2 = male.rate * rr
+    power.exact_power(male.marriages, female.marriages, male.rate, p2)
+    needed = power.sample_size(male.rate, p2, ratio=ratio)
+    power.power_curve(range(100, 1501, 200), male.rate, p2, ratio=ratio)
+    return needed
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else 0.05
+
+    # Same decisions as scipy's two-sided Fisher test
+    n1, n2 = 23, 37
+    region = power.rejection_region(n1, n2)
+    expected = np.array([[stats.fisher_exact([[x1, n1 - x1], [x2, n2 - x2]])[1] <= 0.05
+                          for x2 in range(n2 + 1)] for x1 in range(n1 + 1)])
+    assert (region == expected).all()
+
+    analysis = analyze(DATA)
+    male, female = analysis.groups['Male'], analysis.groups['Female']
+    ratio = female.marriages / male.marriages
+    power.exact_power(10, 10, 0.1, 0.2)  # warm up scipy
+
+    _, cold = timed(power._acceptance, male.marriages, female.marriages, 0.05)
+    _, query = timed(power.exact_power, male.marriages, female.marriages, male.rate, female.rate)
+    grid_p = np.linspace(0.05, 0.35, 100)
+    _, grid = timed(power.power_grid, male.marriages, female.marriages, grid_p, grid_p)
+    _, curve = timed(power.power_curve, range(100, 1501, 200), male.rate, female.rate, ratio=ratio)
+    needed, search = timed(power.sample_size, male.rate, female.rate, ratio=ratio)
+
+    print(f"sizes:        {male.marriages} vs {female.marriages}")
+    print(f"intervals:    {cold:8.3f} s  (cold)")
+    print(f"query:        {query:8.3f} s  (cached intervals, budget {budget:.3f} s)")
+    print(f"grid 100x100: {grid:8.3f} s")
+    print(f"curve (8 n):  {curve:8.3f} s  (cold)")
+    print(f"sample size:  {search:8.3f} s  (n1 = {needed} for 80%)")
+
+    slowest = (0.0, None, None)
+    for rr in SLIDER_RR:
+        power._acceptance.cache_clear()
+        power._power_curve.cache_clear()
+        needed, seconds = timed(slider_move, male, female, ratio, rr)
+        slowest = max(slowest, (seconds, rr, needed))
+    seconds, rr, needed = slowest
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"slider:       {seconds:8.3f} s  (slowest cold move, RR {rr}: n1 = {needed}; "
+          f"{SLIDER_RR[0]}-{SLIDER_RR[-1]})")
+    print(f"peak RSS:     {peak:8.0f} MB")
+    if query > budget or seconds > 20 * budget:
+        print("OVER BUDGET")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: regional breakdown against an interactive latency budget
+
+Usage: python3 benchmarks/bench_regions.py [regions] [budget_seconds]
+Times mariye.regions.breakdown on generated counts for `regions` regions
+(default 310, about the number of Finnish municipalities) over 2017-2024,
+with heavy-tailed region sizes (most same-sex cells are tiny) and regional
+rates varying around the national ones. Exits with status 1 when it exceeds
+the budget (default 1 s).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.core import COUNT_COLUMNS
+from mariye.regions import breakdown
+
+
+def regional_counts(regions, seed=2017):
+    rng = np.random.default_rng(seed)
+    years = np.arange(2017, 2025)
+    size = np.repeat(rng.lognormal(3, 1.5, regions), len(years))
+    n = len(size)
+    frame = pd.DataFrame({
+        'Region': np.repeat([f'KU{i:04d}' for i in range(regions)], len(years)),
+        'Region_Label': np.repeat([f'Alue {i}' for i in range(regions)], len(years)),
+        'Year': np.tile(years, regions),
+        'Marriages_Opposite': rng.poisson(size * 10, n),
+        'Marriages_Male': rng.poisson(size * 0.06, n),
+        'Marriages_Female': rng.poisson(size * 0.13, n),
+    })
+    # Regional rates vary around the national ones
+    for group, rate in [('Opposite', 0.5), ('Male', 0.14), ('Female', 0.21)]:
+        p = np.repeat(rng.beta(rate * 50, (1 - rate) * 50, regions), len(years))
+        frame[f'Divorces_{group}'] = rng.binomial(frame[f'Marriages_{group}'], p)
+    return frame[['Region', 'Region_Label', 'Year', *COUNT_COLUMNS]]
+
+
+def main():
+    regions = int(sys.argv[1]) if len(sys.argv) > 1 else 310
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    frame = regional_counts(regions)
+    breakdown(regional_counts(10))  # warm up
+
+    start = time.perf_counter()
+    result = breakdown(frame)
+    elapsed = time.perf_counter() - start
+
+    male = result.group('Male')
+    tiny = male[male['Marriages'] < 10]
+    print(f"regions:      {regions:,} ({len(result.rates):,} cells)")
+    print(f"tiny cells:   {len(tiny):,} male-couple regions with < 10 marriages")
+    print(f"shrinkage:    raw rate sd {tiny['Rate'].std():.1f} pp -> EB sd {tiny['EB_Rate'].std():.1f} pp")
+    print(f"breakdown:    {elapsed:8.3f} s  (budget {budget:.3f} s)")
+    if elapsed > budget:
+        print("OVER BUDGET")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch significance tests and multiple-testing correction
+
+Usage: python3 benchmarks/bench_significance.py [tables] [fisher_tables]
+Runs the Fisher exact, chi-square and z tests and the Holm /
+Benjamini-Hochberg corrections on `tables` generated 2x2 tables (default
+10^5, group sizes up to 3000), Fisher on the first `fisher_tables` of them
+(default: all), printing throughput in tables per second. A sample of each
+batch is checked against scipy.stats first; benchmarks/bench_fisher.py
+compares Fisher with a loop over scipy.stats.fisher_exact.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.significance import adjust, chi2_test, fisher_test, tables_from_counts, z_test
+
+
+def generated_tables(count, seed=2017):
+    rng = np.random.default_rng(seed)
+    marriages = rng.integers(1, 3000, size=(2, count))
+    rates = rng.uniform(0.05, 0.4, size=(2, count))
+    divorces = rng.binomial(marriages, rates)
+    return tables_from_counts(divorces[0], marriages[0], divorces[1], marriages[1])
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10**5
+    fisher_count = int(sys.argv[2]) if len(sys.argv) > 2 else count
+    tables = generated_tables(count)
+
+    # Same results as scipy on a sample
+    sample = tables[:200]
+    _, p_fisher = fisher_test(sample)
+    _, p_chi2 = chi2_test(sample)
+    assert np.allclose(p_fisher, [stats.fisher_exact(t)[1] for t in sample], rtol=1e-9, atol=0)
+    assert np.allclose(p_chi2, [stats.chi2_contingency(t)[1] for t in sample], rtol=1e-9, atol=0)
+
+    (_, p_chi2), chi2_time = timed(chi2_test, tables)
+    _, z_time = timed(z_test, tables)
+    _, fisher_time = timed(fisher_test, tables[:fisher_count])
+    _, holm_time = timed(adjust, p_chi2, 'holm')
+    _, bh_time = timed(adjust, p_chi2, 'bh')
+
+    print(f"tables:       {count:,}")
+    for name, n, seconds in [('chi-square', count, chi2_time), ('z test', count, z_time),
+                             ('fisher', fisher_count, fisher_time),
+                             ('holm', count, holm_time), ('bh', count, bh_time)]:
+        print(f"{name + ':':13s} {seconds:8.3f} s  {n / seconds:12,.0f} tables/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark: incremental static site builds
+
+Usage: python3 benchmarks/bench_site.py [repeats]
+Builds the static site (mariye.site) into a temporary directory from the
+bundled counts without their last year (cold: analysis, figures and every
+file), again unchanged (only input hashes are compared), then from the full
+counts as when a yearly release arrives (pages and CSV files are rebuilt,
+plotly.js is kept). Prints the best of `repeats` (default 3) wall times per
+step and the bundle size; serving the bundle needs no Python at all.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye import bayes, core, export, figures, site
+from mariye.data import DATA
+
+
+def timed_build(data, out_dir):
+    start = time.perf_counter()
+    results = site.build(out_dir=out_dir, data=data)
+    return results, time.perf_counter() - start
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    previous = {column: values[:-1] for column, values in DATA.items()}
+    steps = {'cold build': [], 'unchanged': [], 'new year': []}
+
+    for _ in range(repeats):
+        figures.clear()
+        export.clear()
+        core.clear()
+        bayes.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            for step, data in [('cold build', previous), ('unchanged', previous), ('new year', DATA)]:
+                results, seconds = timed_build(data, out_dir)
+                built = sum(r.status == 'built' for r in results)
+                steps[step].append((seconds, built, len(results)))
+            size = sum(p.stat().st_size for p in out_dir.iterdir())
+
+    for step, runs in steps.items():
+        seconds, built, total = min(runs)
+        print(f"{step + ':':12s} {seconds * 1000:9.1f} ms  {built}/{total} files built")
+    print(f"bundle:      {size / 1e6:9.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
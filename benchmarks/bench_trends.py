@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batched IRLS trend models against an interactive latency budget
+
+Usage: python3 benchmarks/bench_trends.py [series] [budget_seconds]
+Fits mariye.trends.fit_glm (Poisson with log-marriages offset, quadratic in
+year) to `series` generated yearly series (default 1240: about 310 regions x
+4 couple types) over 2017-2024 and over 1990-2024, once as one batch and
+once model by model, and times fit_trends for the app's fig1 series. Exits
+with status 1 when the batch over 1990-2024 exceeds the budget (default
+0.25 s).
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.core import load_analysis
+from mariye.data import DATA
+from mariye.trends import design_matrix, fit_glm, fit_trends
+
+
+def series_counts(series, years, seed=2017):
+    # Heavy-tailed exposures (most regional same-sex series are tiny) and
+    # smooth log-quadratic ratios with extra-Poisson noise
+    rng = np.random.default_rng(seed)
+    t = np.linspace(-1, 1, len(years))
+    marriages = rng.poisson(rng.lognormal(3, 1.5, (series, 1)) * np.ones(len(years)))
+    log_ratio = (rng.normal(-1.5, 0.5, (series, 1)) + rng.normal(0.5, 0.3, (series, 1)) * t
+                 - rng.normal(0.3, 0.2, (series, 1)) * t**2)
+    ratio = np.exp(log_ratio) * rng.gamma(20, 1 / 20, (series, len(years)))
+    return rng.poisson(marriages * ratio), marriages
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    series = int(sys.argv[1]) if len(sys.argv) > 1 else 1240
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 0.25
+    fit_glm(design_matrix(range(2017, 2025)), [[1, 2, 3, 4, 5, 6, 7, 8]], [[9] * 8])  # warm up
+
+    print(f"{'years':12s} {'batch s':>9s} {'loop s':>9s} {'iterations':>11s} {'converged':>10s}")
+    for first in (2017, 1990):
+        years = np.arange(first, 2025)
+        divorces, marriages = series_counts(series, years)
+        design = design_matrix(years)
+        fit, batch = timed(fit_glm, design, divorces, marriages)
+        _, loop = timed(lambda: [fit_glm(design, d, m) for d, m in zip(divorces, marriages)])
+        print(f"{f'{first}-2024':12s} {batch:9.3f} {loop:9.3f} {fit.iterations:11d} "
+              f"{fit.converged.sum():>5d}/{series}")
+
+    analysis = load_analysis(DATA)
+    _, app = timed(fit_trends, analysis)
+    print(f"\nfig1 trends (4 series, 2017-2024): {app * 1000:.1f} ms")
+    print(f"budget: {batch:.3f} s for {series:,} series over 1990-2024 (budget {budget:.3f} s)")
+    if batch > budget:
+        print("OVER BUDGET")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
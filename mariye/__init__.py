@@ -0,0 +1,6 @@
+"""
+mariye - shared data and statistics for the Finnish marriage & divorce analysis
+
+The Streamlit app (app.py) and the analysis scripts import their data and
+precomputed statistics from this package instead of rebuilding them.
+"""
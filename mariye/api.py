@@ -0,0 +1,468 @@
+"""
+Headless JSON API: the statistics of the app over HTTP
+
+    python -m mariye.api [--host HOST] [--port PORT] [--source pxweb|bundled|FILE.json]
+
+`app` is a plain ASGI application on top of mariye.core, with no web
+framework: run it under any ASGI server (uvicorn mariye.api:app) or the small
+asyncio HTTP/1.1 server in this module, which the CLI falls back to when
+uvicorn is not installed. The built-in server bounds request bodies
+(MAX_BODY) and headers (MAX_HEADERS), drops clients that send a request
+slower than REQUEST_TIMEOUT or idle longer than IDLE_TIMEOUT, and answers a
+failing route with 500; anything facing the open internet should still run
+under uvicorn behind a reverse proxy. Endpoints (GET or HEAD):
+
+    /v1                      index: dataset version, years and the endpoints
+    /v1/summary              every group (counts, rate, Wilson interval,
+                             Beta posterior) and the female vs male tests
+                             (Fisher, chi-square, odds and risk ratio, Cohen's h)
+    /v1/groups/{key}         one group: Opposite, Male, Female or SameSex
+    /v1/yearly               the derived yearly frame, one object per year
+    /v1/comparison           pairwise posterior comparisons (mariye.bayes)
+    /v1/exports/{table}.{ext} a mariye.export table, streamed (csv, parquet, json)
+
+Rates are proportions (0-1) except in the yearly frame and exports, which
+keep the app's percentages. Responses are rendered once per (path, dataset
+version) and served from memory. Each carries the ETag "<version>-<path
+hash>", so a client revalidating with If-None-Match gets 304 until the
+dataset changes. The dataset is re-read (mariye.pxweb.load_source, cached on
+disk) at most every refresh_seconds.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import sys
+import time
+import traceback
+from dataclasses import asdict
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import unquote
+
+import numpy as np
+
+from mariye import export
+from mariye.bayes import load_comparison
+from mariye.core import load_analysis
+from mariye.pxweb import PxWebError, load_source
+
+REFRESH_SECONDS = 3600
+# Cache-Control max-age for clients; they revalidate with the ETag afterwards
+CLIENT_MAX_AGE = 60
+
+EXPORT_EXTENSIONS = {'csv': 'csv', 'parquet': 'parquet', 'json': 'json-stat'}
+
+# Built-in server limits: request body bytes (no endpoint reads a body),
+# header fields per request, seconds to receive a request once its first
+# line arrived (and for the client to take each response chunk), seconds a
+# kept-alive connection may wait for its next request
+MAX_BODY = 64 * 1024
+MAX_HEADERS = 100
+REQUEST_TIMEOUT = 10
+IDLE_TIMEOUT = 30
+
+
+def _jsonable(value):
+    # numpy scalars and arrays to Python; NaN and infinities to null
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def summary(analysis):
+    """Payload of /v1/summary"""
+    years = analysis.df['Year']
+    return {
+        'version': analysis.version,
+        'years': [int(years.min()), int(years.max())],
+        'groups': {key: asdict(group) for key, group in analysis.groups.items()},
+        'female_vs_male': {
+            'fisher_p': analysis.p_value_fisher,
+            'chi2': analysis.chi2,
+            'chi2_p': analysis.p_value_chi2,
+            'odds_ratio': analysis.odds_ratio_female_vs_male,
+            'risk_ratio': analysis.risk_ratio_female_vs_male,
+            'cohens_h': analysis.cohens_h,
+        },
+    }
+
+
+def yearly(analysis):
+    """Payload of /v1/yearly"""
+    return {'version': analysis.version, 'years': analysis.df.to_dict(orient='records')}
+
+
+def group(analysis, key):
+    """Payload of /v1/groups/{key}"""
+    return {'version': analysis.version, **asdict(analysis.groups[key])}
+
+
+def comparison(analysis):
+    """Payload of /v1/comparison"""
+    result = load_comparison(analysis)
+    return {
+        'version': analysis.version,
+        'draws': result.draws,
+        'level': result.level,
+        'pairs': result.table.reset_index().to_dict(orient='records'),
+    }
+
+
+def index(analysis):
+    """Payload of /v1"""
+    years = analysis.df['Year']
+    return {
+        'version': analysis.version,
+        'years': [int(years.min()), int(years.max())],
+        'endpoints': ['/v1/summary', *[f'/v1/groups/{key}' for key in analysis.groups],
+                      '/v1/yearly', '/v1/comparison',
+                      *[f'/v1/exports/{name}.{ext}' for name, table in export.TABLES.items()
+                        if table.source == 'analysis' for ext in EXPORT_EXTENSIONS]],
+    }
+
+
+ROUTES = {
+    '/v1': index,
+    '/v1/summary': summary,
+    '/v1/yearly': yearly,
+    '/v1/comparison': comparison,
+}
+
+
+def route(path, analysis):
+    """Payload function (analysis -> dict) of `path`, or None"""
+    if path in ROUTES:
+        return ROUTES[path]
+    key = path.removeprefix('/v1/groups/')
+    if key != path and key in analysis.groups:
+        return partial(group, key=key)
+    return None
+
+
+def etag(version, path):
+    """Entity tag of `path` for a dataset version"""
+    return f'"{version}-{hashlib.sha256(path.encode("utf-8")).hexdigest()[:8]}"'
+
+
+def _matches(if_none_match, tag):
+    # If-None-Match holds '*' or a list of (possibly weak) tags
+    tags = [t.strip().removeprefix('W/') for t in if_none_match.split(',')]
+    return '*' in tags or tag in tags
+
+
+class Api:
+    """
+    ASGI application serving the statistics of one dataset source
+    `source` as in mariye.pxweb.load_source; the dataset is re-read at most
+    every refresh_seconds and rendered responses are kept per version.
+    """
+
+    def __init__(self, source='pxweb', refresh_seconds=REFRESH_SECONDS, offline=False):
+        self.source = source
+        self.refresh_seconds = refresh_seconds
+        self.offline = offline
+        self._analysis = None
+        self._loaded_at = -math.inf
+        self._responses = {}  # (version, path) -> (etag, body), current version only
+        self._lock = asyncio.Lock()
+
+    def _load(self):
+        return load_analysis(load_source(self.source, offline=self.offline))
+
+    async def analysis(self):
+        """The current Analysis; loading and analysis run off the event loop"""
+        if time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            async with self._lock:
+                if time.monotonic() - self._loaded_at >= self.refresh_seconds:
+                    analysis = await asyncio.to_thread(self._load)
+                    if self._analysis is None or analysis.version != self._analysis.version:
+                        self._responses.clear()
+                    self._analysis = analysis
+                    self._loaded_at = time.monotonic()
+        return self._analysis
+
+    async def render(self, analysis, path):
+        """(etag, JSON body) of a route, rendered once per version; None if unknown"""
+        key = (analysis.version, path)
+        cached = self._responses.get(key)
+        if cached is not None:
+            return cached
+        build = route(path, analysis)
+        if build is None:
+            return None
+        payload = await asyncio.to_thread(build, analysis)
+        body = json.dumps(_jsonable(payload), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self._responses[key] = (etag(analysis.version, path), body)
+        return self._responses[key]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+        if scope['type'] != 'http':
+            return
+
+        method = scope['method']
+        path = scope['path'].rstrip('/') or '/'
+        headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope['headers']}
+        if method not in ('GET', 'HEAD'):
+            await _send_json(send, 405, {'error': 'only GET and HEAD are supported'}, method,
+                             [('allow', 'GET, HEAD')])
+            return
+        try:
+            analysis = await self.analysis()
+        except PxWebError as exc:
+            await _send_json(send, 503, {'error': str(exc)}, method)
+            return
+
+        if path.startswith('/v1/exports/'):
+            await self.send_export(send, analysis, path, headers, method)
+            return
+        rendered = await self.render(analysis, path)
+        if rendered is None:
+            await _send_json(send, 404, {'error': f'no such endpoint: {path}'}, method)
+            return
+        tag, body = rendered
+        cache_headers = [('etag', tag), ('cache-control', f'public, max-age={CLIENT_MAX_AGE}')]
+        if _matches(headers.get('if-none-match', ''), tag):
+            await _send(send, 304, b'', method, cache_headers)
+            return
+        await _send(send, 200, body, method,
+                    [('content-type', 'application/json; charset=utf-8'), *cache_headers])
+
+    async def send_export(self, send, analysis, path, headers, method):
+        """Stream an export table (see mariye.export) chunk by chunk"""
+        name, _, extension = path[len('/v1/exports/'):].rpartition('.')
+        table = export.TABLES.get(name)
+        fmt = EXPORT_EXTENSIONS.get(extension)
+        if table is None or fmt is None or table.source != 'analysis':
+            await _send_json(send, 404, {'error': f'no such export: {path}'}, method)
+            return
+        if fmt not in export.available_formats():
+            await _send_json(send, 501, {'error': f'{fmt} export is not available'}, method)
+            return
+        tag = etag(analysis.version, path)
+        response_headers = [
+            ('etag', tag),
+            ('cache-control', f'public, max-age={CLIENT_MAX_AGE}'),
+            ('content-type', export.FORMATS[fmt].mime),
+            ('content-disposition', f'attachment; filename="{export.filename(name, fmt)}"'),
+        ]
+        if _matches(headers.get('if-none-match', ''), tag):
+            await _send(send, 304, b'', method, response_headers[:2])
+            return
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(k.encode('latin-1'), v.encode('latin-1')) for k, v in response_headers]})
+        if method == 'GET':
+            for chunk in export.stream(name, analysis, fmt):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+
+async def _send(send, status, body, method, headers=()):
+    headers = [*headers, ('content-length', str(len(body)))] if status != 304 else list(headers)
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(k.encode('latin-1'), v.encode('latin-1')) for k, v in headers]})
+    await send({'type': 'http.response.body', 'body': body if method != 'HEAD' else b''})
+
+
+async def _send_json(send, status, payload, method, headers=()):
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    await _send(send, status, body, method,
+                [('content-type', 'application/json; charset=utf-8'), *headers])
+
+
+app = Api()
+
+
+class _HttpError(Exception):
+    """A request the built-in server rejects itself, with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader, request_line):
+    # (method, target, version, headers, body) of the request starting with
+    # request_line, within the built-in server's limits
+    try:
+        method, target, version = request_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    except ValueError:
+        raise _HttpError(400, 'malformed request line') from None
+    headers = []
+    while (line := await reader.readline()).strip():
+        if len(headers) >= MAX_HEADERS:
+            raise _HttpError(431, f'more than {MAX_HEADERS} header fields')
+        name, _, value = line.decode('latin-1').partition(':')
+        headers.append((name.strip().lower().encode('latin-1'), value.strip().encode('latin-1')))
+    fields = dict(headers)
+    if b'transfer-encoding' in fields:
+        raise _HttpError(411, 'request bodies need a content-length')
+    try:
+        length = int(fields.get(b'content-length', b'0'))
+    except ValueError:
+        raise _HttpError(400, 'malformed content-length') from None
+    if not 0 <= length <= MAX_BODY:
+        raise _HttpError(413, f'request bodies are limited to {MAX_BODY} bytes')
+    body = await reader.readexactly(length) if length else b''
+    return method, target, version, headers, body
+
+
+def _error_response(status, message):
+    # Complete response for errors the server answers itself; it always
+    # closes the connection afterwards
+    body = json.dumps({'error': message}).encode('utf-8')
+    return (f'HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n'
+            f'content-type: application/json; charset=utf-8\r\n'
+            f'content-length: {len(body)}\r\nconnection: close\r\n\r\n').encode('latin-1') + body
+
+
+async def _serve_connection(application, reader, writer):
+    # One HTTP/1.1 connection: keep-alive, bodies without a content-length
+    # are sent with chunked transfer encoding. A request must arrive within
+    # REQUEST_TIMEOUT of its first line (IDLE_TIMEOUT between requests), a
+    # client must take each response chunk within REQUEST_TIMEOUT, and an
+    # application error becomes a 500 when no response was started yet.
+    peer = writer.get_extra_info('peername')
+    server = writer.get_extra_info('sockname')
+    try:
+        while True:
+            try:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+            if not request_line.strip():
+                break
+            try:
+                method, target, version, headers, body = await asyncio.wait_for(
+                    _read_request(reader, request_line), REQUEST_TIMEOUT)
+            except asyncio.TimeoutError:
+                writer.write(_error_response(408, 'request not received in time'))
+                break
+            except _HttpError as exc:
+                writer.write(_error_response(exc.status, str(exc)))
+                break
+            fields = dict(headers)
+            keep_alive = (fields.get(b'connection', b'').lower() != b'close'
+                          and version == 'HTTP/1.1')
+
+            path, _, query = target.partition('?')
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': version[5:],
+                'method': method, 'scheme': 'http', 'path': unquote(path),
+                'raw_path': path.encode('latin-1'), 'query_string': query.encode('latin-1'),
+                'root_path': '', 'headers': headers,
+                'server': server[:2] if server else None, 'client': peer[:2] if peer else None,
+            }
+            chunked = False
+            started = False
+
+            async def receive():
+                return {'type': 'http.request', 'body': body, 'more_body': False}
+
+            async def send(message):
+                nonlocal chunked, started
+                if message['type'] == 'http.response.start':
+                    started = True
+                    status = message['status']
+                    names = {name.lower() for name, _ in message['headers']}
+                    chunked = (b'content-length' not in names and status not in (204, 304)
+                               and method != 'HEAD')
+                    lines = [f'HTTP/1.1 {status} {HTTPStatus(status).phrase}'.encode('latin-1')]
+                    lines += [name + b': ' + value for name, value in message['headers']]
+                    if chunked:
+                        lines.append(b'transfer-encoding: chunked')
+                    if not keep_alive:
+                        lines.append(b'connection: close')
+                    writer.write(b'\r\n'.join(lines) + b'\r\n\r\n')
+                elif message['type'] == 'http.response.body':
+                    data = message.get('body', b'')
+                    if chunked:
+                        if data:
+                            writer.write(b'%x\r\n' % len(data) + data + b'\r\n')
+                        if not message.get('more_body', False):
+                            writer.write(b'0\r\n\r\n')
+                    elif data:
+                        writer.write(data)
+                    await asyncio.wait_for(writer.drain(), REQUEST_TIMEOUT)
+
+            try:
+                await application(scope, receive, send)
+            except (ConnectionError, asyncio.TimeoutError):
+                break
+            except Exception:
+                print(f'Error in {method} {target}:\n{traceback.format_exc()}', file=sys.stderr, flush=True)
+                # Half a response cannot be repaired; otherwise report it
+                if not started:
+                    writer.write(_error_response(500, 'internal server error'))
+                break
+            if not keep_alive:
+                break
+        await asyncio.wait_for(writer.drain(), REQUEST_TIMEOUT)
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(application=app, host='127.0.0.1', port=8000):
+    """Serve an ASGI application with the built-in HTTP/1.1 server until cancelled"""
+    server = await asyncio.start_server(
+        lambda reader, writer: _serve_connection(application, reader, writer), host, port
+    )
+    address = server.sockets[0].getsockname()
+    print(f'Serving on http://{address[0]}:{address[1]}/v1', file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m mariye.api',
+        description='Serve the computed statistics as a JSON API.'
+    )
+    parser.add_argument('--host', default='127.0.0.1', help='address to bind (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8000, help='port (default: %(default)s)')
+    parser.add_argument('-s', '--source', default='pxweb',
+                        help="dataset: 'pxweb' (cached table, default), 'bundled' or a JSON file "
+                             "in the mariye.data.DATA layout")
+    parser.add_argument('--refresh', type=float, default=REFRESH_SECONDS,
+                        help='seconds between dataset re-reads (default: %(default)s)')
+    parser.add_argument('--offline', action='store_true', help='never touch the network')
+    parser.add_argument('--builtin', action='store_true',
+                        help='use the built-in server even if uvicorn is installed')
+    args = parser.parse_args(argv)
+
+    application = Api(args.source, args.refresh, args.offline)
+    if not args.builtin:
+        try:
+            import uvicorn
+        except ImportError:
+            pass
+        else:
+            uvicorn.run(application, host=args.host, port=args.port)
+            return 0
+    try:
+        asyncio.run(serve(application, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Posterior comparisons between couple types (Beta(1, 1) posteriors)
+
+For every pair of groups A, B:
+- P(p_A > p_B), exactly by Gauss-Legendre quadrature of
+  P(X_A > X_B) = integral over u in (0, 1) of F_B(Q_A(u)),
+  and as a Monte Carlo check from the same draws as the risk ratio
+- the posterior of the risk ratio p_A / p_B: median and equal-tailed
+  credible interval from vectorized Beta draws (one rng.beta call for all
+  groups, one quantile call for all pairs)
+
+Results are memoized per dataset version like mariye.core.load_analysis.
+"""
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+# Draws only feed the risk-ratio interval (P(p_A > p_B) is exact); at 100k the
+# quantiles move by less than 0.005 from 1M draws and cost a tenth of the time
+DEFAULT_DRAWS = 100_000
+DEFAULT_SEED = 2017
+QUADRATURE_NODES = 2048
+
+# Groups that contain other groups; their posteriors are not independent, so
+# these pairs are left out of the comparison
+NESTED = {'SameSex': ('Male', 'Female')}
+
+
+@lru_cache(maxsize=None)
+def _legendre(nodes):
+    # Gauss-Legendre nodes and weights mapped from (-1, 1) to (0, 1); SciPy's
+    # asymptotic roots take a tenth of the time of numpy's eigenvalue solve (about 1 s)
+    u, w = special.roots_legendre(nodes)
+    return (u + 1) / 2, w / 2
+
+
+def prob_greater(alpha_a, beta_a, alpha_b, beta_b, nodes=QUADRATURE_NODES):
+    """
+    P(X_A > X_B) for independent X_A ~ Beta(alpha_a, beta_a), X_B ~ Beta(alpha_b, beta_b)
+    Arguments broadcast; each element is one comparison.
+    """
+    u, w = _legendre(nodes)
+    params = np.broadcast_arrays(*(np.asarray(p, dtype=np.float64) for p in (alpha_a, beta_a, alpha_b, beta_b)))
+    alpha_a, beta_a, alpha_b, beta_b = (p[..., None] for p in params)
+    # Quantiles of A at the nodes, then the CDF of B there
+    x = special.betaincinv(alpha_a, beta_a, u)
+    return (special.betainc(alpha_b, beta_b, x) * w).sum(axis=-1)[()]
+
+
+def sample_posteriors(alpha, beta, draws=DEFAULT_DRAWS, seed=DEFAULT_SEED):
+    """(draws, groups) array of Beta posterior draws, all groups in one call"""
+    rng = np.random.default_rng(seed)
+    alpha = np.asarray(alpha, dtype=np.float64)
+    beta = np.asarray(beta, dtype=np.float64)
+    return rng.beta(alpha, beta, size=(draws, alpha.size))
+
+
+@dataclass(frozen=True)
+class PosteriorComparison:
+    """All ordered group pairs: P(p_A > p_B) and the posterior of p_A / p_B"""
+    version: str
+    draws: int
+    level: float
+    table: pd.DataFrame = field(repr=False)
+
+    def pair(self, a, b):
+        """Row for groups a vs b as a dict (Prob_Greater = P(p_a > p_b), RR = p_a / p_b)"""
+        return self.table.loc[(a, b)].to_dict()
+
+
+def compare_groups(analysis, keys=None, draws=DEFAULT_DRAWS, seed=DEFAULT_SEED, level=0.95):
+    """
+    Pairwise posterior comparison of `keys` (default: all groups of the analysis)
+    Table indexed by (Group_A, Group_B) with columns Prob_Greater (exact),
+    Prob_Greater_MC, RR_Median, RR_Lower, RR_Upper. Pairs where one group
+    contains the other (see NESTED) are skipped.
+    """
+    keys = list(keys) if keys is not None else list(analysis.groups)
+    alpha = np.array([analysis.groups[k].alpha for k in keys])
+    beta = np.array([analysis.groups[k].beta for k in keys])
+    pairs = [(i, j) for i, j in combinations(range(len(keys)), 2)
+             if keys[j] not in NESTED.get(keys[i], ()) and keys[i] not in NESTED.get(keys[j], ())]
+    a_idx, b_idx = (np.array(i) for i in zip(*pairs))
+
+    exact = prob_greater(alpha[a_idx], beta[a_idx], alpha[b_idx], beta[b_idx])
+
+    samples = sample_posteriors(alpha, beta, draws, seed)
+    ratio = samples[:, a_idx] / samples[:, b_idx]
+    tail = (1 - level) / 2
+    lower, median, upper = np.quantile(ratio, [tail, 0.5, 1 - tail], axis=0)
+    mc = (ratio > 1).mean(axis=0)
+
+    # Unordered pairs computed once; the reversed pair follows by symmetry
+    forward = pd.DataFrame({
+        'Group_A': np.array(keys)[a_idx], 'Group_B': np.array(keys)[b_idx],
+        'Prob_Greater': exact, 'Prob_Greater_MC': mc,
+        'RR_Median': median, 'RR_Lower': lower, 'RR_Upper': upper,
+    })
+    reverse = pd.DataFrame({
+        'Group_A': forward['Group_B'], 'Group_B': forward['Group_A'],
+        'Prob_Greater': 1 - exact, 'Prob_Greater_MC': 1 - mc,
+        'RR_Median': 1 / median, 'RR_Lower': 1 / upper, 'RR_Upper': 1 / lower,
+    })
+    table = pd.concat([forward, reverse], ignore_index=True).set_index(['Group_A', 'Group_B'])
+    return PosteriorComparison(analysis.version, draws, level, table)
+
+
+_comparisons = {}
+
+
+def load_comparison(analysis, draws=DEFAULT_DRAWS, seed=DEFAULT_SEED, level=0.95):
+    """compare_groups() for all groups, memoized per dataset version and settings"""
+    key = (analysis.version, draws, seed, level)
+    if key not in _comparisons:
+        _comparisons[key] = compare_groups(analysis, draws=draws, seed=seed, level=level)
+    return _comparisons[key]
+
+
+def clear(version=None):
+    """Drop memoized comparisons from memory, for one dataset version or all"""
+    for key in list(_comparisons):
+        if version is None or key[0] == version:
+            del _comparisons[key]
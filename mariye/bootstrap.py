@@ -0,0 +1,210 @@
+"""
+Parametric bootstrap intervals for two-group comparisons
+
+For couple types A and B with divorces x and marriages n, every resample
+draws x* ~ Binomial(n, x / n) for both groups at once: one rng.binomial
+call fills a (resamples x 2) array, and each statistic (rates, difference,
+risk ratio, odds ratio, Cohen's h) is evaluated on whole columns. Intervals:
+
+- percentile: quantiles of the resampled statistic
+- BCa (bias-corrected and accelerated, Efron 1987): the percentile levels
+  are shifted by the bias correction z0 = Phi^-1(share of resamples below
+  the estimate) and the acceleration from the jackknife. Leaving out one
+  marriage only gives four distinct jackknife values (a divorced or
+  non-divorced marriage of A or B), so the jackknife is exact and needs no
+  loop over observations.
+
+Resamples are drawn in fixed-size chunks, each from its own stream of one
+SeedSequence; with a seed the result is reproducible and identical for any
+number of workers. Large resample counts are spread over threads (NumPy's
+generators release the GIL while filling arrays).
+
+Results are memoized per dataset version like mariye.bayes.load_comparison.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from mariye.core import cohens_h
+
+DEFAULT_RESAMPLES = 100_000
+DEFAULT_SEED = 2017
+# Resamples per random stream; also the unit of work of one thread
+CHUNK_RESAMPLES = 50_000
+# Below this many resamples everything is drawn in the calling thread
+PARALLEL_RESAMPLES = 400_000
+
+
+def _odds_ratio(p_a, p_b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (p_a / (1 - p_a)) / (p_b / (1 - p_b))
+
+
+def _risk_ratio(p_a, p_b):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return p_a / p_b
+
+
+# Statistic name -> function of the two rates (broadcasting)
+STATISTICS = {
+    'Rate_A': lambda p_a, p_b: p_a,
+    'Rate_B': lambda p_a, p_b: p_b,
+    'Difference': lambda p_a, p_b: p_a - p_b,
+    'Risk_Ratio': _risk_ratio,
+    'Odds_Ratio': _odds_ratio,
+    'Cohens_H': cohens_h,
+}
+
+
+def _draw(n, p, resamples, seed_sequence):
+    rng = np.random.default_rng(seed_sequence)
+    return rng.binomial(n, p, size=(resamples, len(n)))
+
+
+def resample_counts(successes, trials, resamples=DEFAULT_RESAMPLES, seed=DEFAULT_SEED, workers=None):
+    """
+    (resamples, groups) int64 array of Binomial(trials, successes / trials) draws
+    `seed` None draws fresh entropy. `workers` threads share the chunks
+    (default: one below PARALLEL_RESAMPLES, else the CPU count).
+    """
+    trials = np.asarray(trials, dtype=np.int64)
+    p = np.asarray(successes, dtype=np.float64) / np.where(trials == 0, 1, trials)
+    sizes = [min(CHUNK_RESAMPLES, resamples - start) for start in range(0, resamples, CHUNK_RESAMPLES)]
+    streams = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is None:
+        workers = 1 if resamples < PARALLEL_RESAMPLES else os.cpu_count() or 1
+
+    if workers == 1 or len(sizes) == 1:
+        chunks = [_draw(trials, p, size, stream) for size, stream in zip(sizes, streams)]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            chunks = list(pool.map(lambda args: _draw(trials, p, *args), zip(sizes, streams)))
+    return np.concatenate(chunks) if chunks else np.empty((0, len(trials)), dtype=np.int64)
+
+
+def _jackknife(statistic, x, n):
+    # Leave-one-out values of statistic(p_a, p_b) with their multiplicities:
+    # drop a divorced (x) or non-divorced (n - x) marriage of group A or B
+    with np.errstate(all='ignore'):
+        p = x / n
+        p_minus = [(x - 1) / (n - 1), x / (n - 1)]
+        values = np.array([
+            statistic(p_minus[0][0], p[1]), statistic(p_minus[1][0], p[1]),
+            statistic(p[0], p_minus[0][1]), statistic(p[0], p_minus[1][1]),
+        ], dtype=np.float64)
+    weights = np.array([x[0], n[0] - x[0], x[1], n[1] - x[1]], dtype=np.float64)
+    return values, weights
+
+
+def _acceleration(statistic, x, n):
+    values, weights = _jackknife(statistic, x, n)
+    keep = (weights > 0) & np.isfinite(values)
+    values, weights = values[keep], weights[keep]
+    if weights.sum() == 0:
+        return 0.0
+    d = np.average(values, weights=weights) - values
+    denominator = 6 * (weights @ d**2) ** 1.5
+    return float(weights @ d**3 / denominator) if denominator > 0 else 0.0
+
+
+def bca_levels(samples, estimate, acceleration, level=0.95):
+    """Percentile levels (lower, upper) of the BCa interval for one statistic"""
+    finite = samples[~np.isnan(samples)]
+    if not len(finite):
+        return np.full(2, np.nan)
+    below = (finite < estimate).mean() + 0.5 * (finite == estimate).mean()
+    z0 = special.ndtri(np.clip(below, 1e-12, 1 - 1e-12))
+    z = special.ndtri(np.array([(1 - level) / 2, (1 + level) / 2]))
+    return special.ndtr(z0 + (z0 + z) / (1 - acceleration * (z0 + z)))
+
+
+def _quantiles(samples, levels):
+    # Undefined (NaN) resamples left out; order statistics instead of
+    # interpolation when a zero denominator made some resamples infinite,
+    # where interpolating would give inf - inf
+    samples = samples[~np.isnan(samples)]
+    levels = np.asarray(levels, dtype=np.float64)
+    if not len(samples) or np.isnan(levels).any():
+        return np.full(len(levels), np.nan)
+    method = 'linear' if np.isfinite(samples).all() else 'inverted_cdf'
+    return np.quantile(samples, levels, method=method)
+
+
+@dataclass(frozen=True)
+class BootstrapResult:
+    """Bootstrap intervals of the two-group statistics (A vs B)"""
+    version: str
+    group_a: str
+    group_b: str
+    resamples: int
+    seed: object
+    level: float
+    # Indexed by statistic: Estimate, SE, Bias, Lower, Upper (percentile),
+    # BCa_Lower, BCa_Upper
+    table: pd.DataFrame = field(repr=False)
+
+    def interval(self, statistic, method='bca'):
+        """(lower, upper) of `statistic` by 'bca' or 'percentile'"""
+        row = self.table.loc[statistic]
+        if method == 'bca':
+            return row['BCa_Lower'], row['BCa_Upper']
+        return row['Lower'], row['Upper']
+
+
+def bootstrap_pair(analysis, a='Female', b='Male', resamples=DEFAULT_RESAMPLES, seed=DEFAULT_SEED,
+                   level=0.95, workers=None):
+    """
+    Parametric bootstrap of rates, difference, risk ratio, odds ratio and
+    Cohen's h of group `a` vs `b` (see STATISTICS); rates are proportions
+    Resamples where a statistic is undefined (0/0) are left out of its
+    interval; one that is undefined in every resample (no divorces in either
+    group) gets NaN bounds.
+    """
+    x = np.array([analysis.groups[a].divorces, analysis.groups[b].divorces], dtype=np.float64)
+    n = np.array([analysis.groups[a].marriages, analysis.groups[b].marriages], dtype=np.float64)
+    counts = resample_counts(x, n, resamples, seed, workers)
+    rates = counts / n
+    tail = (1 - level) / 2
+
+    rows = []
+    for name, statistic in STATISTICS.items():
+        estimate = float(statistic(x[0] / n[0], x[1] / n[1]))
+        samples = statistic(rates[:, 0], rates[:, 1])
+        levels = bca_levels(samples, estimate, _acceleration(statistic, x, n), level)
+        lower, upper = _quantiles(samples, [tail, 1 - tail])
+        bca_lower, bca_upper = _quantiles(samples, levels)
+        finite = samples[np.isfinite(samples)]
+        rows.append({
+            'Statistic': name, 'Estimate': estimate,
+            'SE': finite.std(ddof=1) if len(finite) > 1 else np.nan,
+            'Bias': finite.mean() - estimate if len(finite) and np.isfinite(estimate) else np.nan,
+            'Lower': lower, 'Upper': upper, 'BCa_Lower': bca_lower, 'BCa_Upper': bca_upper,
+        })
+    table = pd.DataFrame(rows).set_index('Statistic')
+    return BootstrapResult(analysis.version, a, b, resamples, seed, level, table)
+
+
+_results = {}
+
+
+def load_bootstrap(analysis, a='Female', b='Male', resamples=DEFAULT_RESAMPLES, seed=DEFAULT_SEED,
+                   level=0.95):
+    """bootstrap_pair(), memoized per dataset version and settings (seeded runs only)"""
+    if seed is None:
+        return bootstrap_pair(analysis, a, b, resamples, seed, level)
+    key = (analysis.version, a, b, resamples, seed, level)
+    if key not in _results:
+        _results[key] = bootstrap_pair(analysis, a, b, resamples, seed, level)
+    return _results[key]
+
+
+def clear(version=None):
+    """Drop memoized bootstrap results from memory, for one dataset version or all"""
+    for key in list(_results):
+        if version is None or key[0] == version:
+            del _results[key]
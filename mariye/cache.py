@@ -0,0 +1,133 @@
+"""
+Cached computation layer for the Streamlit app
+
+Streamlit re-executes app.py top to bottom on every widget interaction.
+Everything that depends only on the dataset (derived columns, Fisher test,
+Wilson intervals, Beta posteriors and their pairwise comparison, bootstrap
+intervals, the hierarchical yearly estimates, the GLM trends, the regional
+breakdown) is computed by the mariye modules once per dataset version and
+shared across reruns and sessions via st.cache_data. invalidate() also drops
+the modules' own per-version memos (mariye.core.load_analysis,
+mariye.bayes.load_comparison, ...), which the figures and exports use.
+"""
+
+import streamlit as st
+
+from mariye import bayes, bootstrap, core, export, figures, hierarchical, regions, trends
+from mariye.bayes import compare_groups
+from mariye.bootstrap import bootstrap_pair
+from mariye.data import dataset_version
+from mariye.hierarchical import fit_yearly
+from mariye.pxweb import load_dataset
+from mariye.regions import breakdown, load_regions, regions_version
+from mariye.trends import fit_trends
+from mariye.update import load_incremental
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_dataset():
+    # Parquet read (or a conditional PxWeb refresh) at most once an hour per process
+    return load_dataset()
+
+
+@st.cache_data(show_spinner=False)
+def _cached_analysis(version, _data):
+    # Keyed on the dataset version only; _data is excluded from hashing.
+    # A new yearly release extends the previous version's results and figures.
+    return load_incremental(_data)
+
+
+def load_results(data=None):
+    """mariye.core.Analysis for `data` (defaults to the cached PxWeb table), computed once per version"""
+    if data is None:
+        data = _cached_dataset()
+    return _cached_analysis(dataset_version(data), data)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_comparison(version, _analysis):
+    return compare_groups(_analysis)
+
+
+def load_comparison(analysis):
+    """mariye.bayes.PosteriorComparison of all group pairs, computed once per version"""
+    return _cached_comparison(analysis.version, analysis)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_bootstrap(version, _analysis):
+    return bootstrap_pair(_analysis)
+
+
+def load_bootstrap(analysis):
+    """mariye.bootstrap.BootstrapResult of female vs male couples (seeded), computed once per version"""
+    return _cached_bootstrap(analysis.version, analysis)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_fit(version, _analysis):
+    return fit_yearly(_analysis)
+
+
+def load_hierarchical(analysis):
+    """mariye.hierarchical.HierarchicalFit of the yearly ratios, computed once per version"""
+    return _cached_fit(analysis.version, analysis)
+
+
+@st.cache_data(show_spinner=False)
+def _cached_trends(version, _analysis):
+    return fit_trends(_analysis)
+
+
+def load_trends(analysis):
+    """mariye.trends.TrendFit of the fig1 series (Poisson GLM), computed once per version"""
+    return _cached_trends(analysis.version, analysis)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_regions():
+    return load_regions()
+
+
+@st.cache_data(show_spinner=False)
+def _cached_breakdown(version, _regional):
+    return breakdown(_regional)
+
+
+def load_region_breakdown():
+    """
+    mariye.regions.RegionBreakdown of the cached regional table, computed once
+    per version; raises mariye.pxweb.PxWebError when no table is available
+    """
+    regional = _cached_regions()
+    return _cached_breakdown(regions_version(regional), regional)
+
+
+def invalidate(data=None):
+    """
+    Drop cached results when new data arrives
+    With `data`, only that dataset version is evicted; otherwise everything is,
+    including the loaded dataset itself. Module-level memos are cleared along
+    with the st.cache_data entries.
+    """
+    memos = (core, bayes, bootstrap, hierarchical, trends, figures, export)
+    if data is None:
+        _cached_dataset.clear()
+        _cached_analysis.clear()
+        _cached_comparison.clear()
+        _cached_bootstrap.clear()
+        _cached_fit.clear()
+        _cached_trends.clear()
+        _cached_regions.clear()
+        _cached_breakdown.clear()
+        regions.clear()
+        for module in memos:
+            module.clear()
+    else:
+        _cached_analysis.clear(dataset_version(data), None)
+        _cached_comparison.clear(dataset_version(data), None)
+        _cached_bootstrap.clear(dataset_version(data), None)
+        _cached_fit.clear(dataset_version(data), None)
+        _cached_trends.clear(dataset_version(data), None)
+        for module in memos:
+            module.clear(dataset_version(data))
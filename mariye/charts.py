@@ -0,0 +1,387 @@
+"""
+Static (matplotlib) charts for the analysis scripts and the report CLI
+
+Each function takes a mariye.core.Analysis and returns a matplotlib Figure;
+saving (format, dpi, output path) is left to mariye.report. The charts are
+the ones divorce_analysis.py, article_analysis.py and
+advanced_statistical_analysis.py used to draw inline.
+
+Figures are plain matplotlib.figure.Figure objects on an Agg canvas, never
+registered with pyplot: there is no global figure state to close or leak,
+and a dropped figure is simply garbage-collected. The data-independent part
+of every chart (figure size, axes grid, titles, axis labels, grids) is a
+template built once per process and copied for each render (TEMPLATES,
+template()); the chart functions only draw the data onto the copy.
+"""
+
+import pickle
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from mariye.intervals import beta_pdf
+from mariye.trends import load_trends
+
+
+def _overview_template():
+    fig = Figure(figsize=(16, 12))
+    axes = fig.subplots(2, 2)
+    fig.suptitle('Marriage and Divorce Analysis in Finland (2017-2024)\nSame-sex marriage legalized March 2017',
+                 fontsize=16, fontweight='bold')
+
+    ax1, ax2, ax3, ax4 = axes.flat
+    ax1.set_xlabel('Year', fontsize=11, fontweight='bold')
+    ax1.set_ylabel('Cumulative Divorce Rate (%)', fontsize=11, fontweight='bold')
+    ax1.set_title('Cumulative Divorce Rate\n(Divorces as % of all marriages since 2017)',
+                  fontsize=12, fontweight='bold')
+    ax1.grid(True, alpha=0.3)
+
+    ax2.set_xlabel('Year', fontsize=11, fontweight='bold')
+    ax2.set_ylabel('Number of Marriages', fontsize=11, fontweight='bold')
+    ax2.set_title('Annual Marriages by Couple Type\n(Opposite-sex in thousands)',
+                  fontsize=12, fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='y')
+
+    ax3.set_xlabel('Year', fontsize=11, fontweight='bold')
+    ax3.set_ylabel('Number of Divorces', fontsize=11, fontweight='bold')
+    ax3.set_title('Annual Divorces by Couple Type\n(Opposite-sex in thousands)',
+                  fontsize=12, fontweight='bold')
+    ax3.grid(True, alpha=0.3, axis='y')
+
+    ax4.set_ylabel('Cumulative Divorce Rate (%)', fontsize=11, fontweight='bold')
+    ax4.set_title('Cumulative Divorce Rates by Couple Type (2024)\n(Total divorces / Total marriages since 2017)',
+                  fontsize=12, fontweight='bold')
+    ax4.grid(True, alpha=0.3, axis='y')
+    return fig
+
+
+def _article_main_template():
+    fig = Figure(figsize=(12, 7))
+    ax = fig.subplots()
+    ax.set_xlabel('Vuosi', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Kumulatiivinen eroaste (%)', fontsize=14, fontweight='bold')
+    ax.set_title('Avioerot suhteessa avioliittojen määrään (2017-2024)\nSamaa sukupuolta olevien avioliitot laillistettu maaliskuussa 2017',
+                 fontsize=16, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    return fig
+
+
+def _article_supporting_template():
+    fig = Figure(figsize=(16, 6))
+    ax1, ax2 = fig.subplots(1, 2)
+    ax1.set_xlabel('Vuosi', fontsize=12, fontweight='bold')
+    ax1.set_ylabel('Avioliitot', fontsize=12, fontweight='bold')
+    ax1.set_title('Solmitut avioliitot vuosittain\n(eri sukupuolta tuhansia)', fontsize=13, fontweight='bold')
+    ax1.grid(True, alpha=0.3, axis='y')
+
+    ax2.set_xlabel('Vuosi', fontsize=12, fontweight='bold')
+    ax2.set_ylabel('Avioerot', fontsize=12, fontweight='bold')
+    ax2.set_title('Avioerot vuosittain\n(eri sukupuolta tuhansia)', fontsize=13, fontweight='bold')
+    ax2.grid(True, alpha=0.3, axis='y')
+    return fig
+
+
+def _article_simple_comparison_template():
+    fig = Figure(figsize=(10, 7))
+    ax = fig.subplots()
+    ax.set_xlabel('Kumulatiivinen eroaste (%) vuoden 2024 loppuun', fontsize=13, fontweight='bold')
+    ax.set_title('Avioerot suhteessa avioliittojen määrään (2017-2024)\nAvioerojen osuus kaikista solmituista avioliitoista',
+                 fontsize=14, fontweight='bold', pad=20)
+    ax.grid(True, alpha=0.3, axis='x')
+    return fig
+
+
+def _advanced_panels_template():
+    fig = Figure(figsize=(16, 12))
+    axes = fig.subplots(2, 2)
+    fig.suptitle('Kehittynyt Tilastollinen Analyysi - Avioerot Suomessa',
+                 fontsize=16, fontweight='bold')
+
+    ax1, ax2, ax3, ax4 = axes.flat
+    ax1.set_xlabel('Eroaste (%) ± 95% Luottamusväli', fontweight='bold')
+    ax1.set_title('Eroasteet Luottamusvälein\n(Wilson Score Interval)', fontweight='bold')
+    ax1.grid(True, alpha=0.3, axis='x')
+
+    ax2.set_xlabel('Eroaste', fontweight='bold')
+    ax2.set_ylabel('Todennäköisyystiheys', fontweight='bold')
+    ax2.set_title('Bayesilainen Posteriorijakauma\n(Samaa sukupuolta olevat parit)', fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+
+    ax3.set_xlabel('Vuosi', fontweight='bold')
+    ax3.set_ylabel('Saman vuoden erojen ja avioliittojen suhde (%)', fontweight='bold')
+    ax3.set_title('Vuosittainen Ero/Avioliitto -suhde\n(HUOM: Ei true divorce rate)', fontweight='bold')
+    ax3.grid(True, alpha=0.3)
+
+    ax4.set_ylabel('Avioliittojen määrä (log-skaala)', fontweight='bold')
+    ax4.set_title('Otoskoot (2017-2024)\nSuurempi otos = Luotettavampi estimaatti', fontweight='bold')
+    ax4.grid(True, alpha=0.3, axis='y')
+    return fig
+
+
+# Chart name -> function building its styled, empty figure
+TEMPLATES = {
+    'overview': _overview_template,
+    'article_main': _article_main_template,
+    'article_supporting': _article_supporting_template,
+    'article_simple_comparison': _article_simple_comparison_template,
+    'advanced_panels': _advanced_panels_template,
+}
+
+_templates = {}
+
+
+def template(name):
+    """
+    A fresh copy of chart `name`'s template figure on an Agg canvas
+    The template is built on first use and kept pickled, so later renders in
+    the same process (and processes forked after prime()) skip building it.
+    """
+    cached = _templates.get(name)
+    if cached is None:
+        cached = _templates[name] = pickle.dumps(TEMPLATES[name]())
+    fig = pickle.loads(cached)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def prime(names=None):
+    """Build the templates of `names` (default: all) ahead of the first render"""
+    for name in names or TEMPLATES:
+        if name not in _templates:
+            _templates[name] = pickle.dumps(TEMPLATES[name]())
+
+
+def overview(analysis):
+    """divorce_analysis.png: 2x2 overview of rates, marriages and divorces"""
+    df = analysis.df
+
+    fig = template('overview')
+    ax1, ax2, ax3, ax4 = fig.axes
+
+    # Plot 1: Cumulative Divorce Rates Over Time
+    ax1.plot(df['Year'], df['Rate_Opposite'], marker='o', linewidth=2,
+             label='Opposite-sex couples', color='#2E86AB')
+    ax1.plot(df['Year'], df['Rate_SameSex'], marker='s', linewidth=2,
+             label='Same-sex couples (combined)', color='#A23B72')
+    ax1.plot(df['Year'], df['Rate_Male'], marker='^', linewidth=1.5,
+             label='Male couples', color='#F18F01', linestyle='--')
+    ax1.plot(df['Year'], df['Rate_Female'], marker='v', linewidth=1.5,
+             label='Female couples', color='#C73E1D', linestyle='--')
+    ax1.legend(loc='upper left')
+    ax1.set_xticks(df['Year'])
+
+    # Plot 2: Annual Marriages by Type
+    width = 0.25
+    x = np.arange(len(df['Year']))
+    ax2.bar(x - width, df['Marriages_Opposite']/1000, width, label='Opposite-sex', color='#2E86AB')
+    ax2.bar(x, df['Marriages_Male'], width, label='Male couples', color='#F18F01')
+    ax2.bar(x + width, df['Marriages_Female'], width, label='Female couples', color='#C73E1D')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(df['Year'])
+    ax2.legend()
+
+    # Plot 3: Annual Divorces by Type
+    ax3.bar(x - width, df['Divorces_Opposite']/1000, width, label='Opposite-sex', color='#2E86AB')
+    ax3.bar(x, df['Divorces_Male'], width, label='Male couples', color='#F18F01')
+    ax3.bar(x + width, df['Divorces_Female'], width, label='Female couples', color='#C73E1D')
+    ax3.set_xticks(x)
+    ax3.set_xticklabels(df['Year'])
+    ax3.legend()
+
+    # Plot 4: Comparison of Cumulative Rates (last year)
+    categories = ['Opposite-sex', 'Same-sex\n(combined)', 'Male\ncouples', 'Female\ncouples']
+    rates = [
+        df['Rate_Opposite'].iloc[-1],
+        df['Rate_SameSex'].iloc[-1],
+        df['Rate_Male'].iloc[-1],
+        df['Rate_Female'].iloc[-1]
+    ]
+    colors = ['#2E86AB', '#A23B72', '#F18F01', '#C73E1D']
+    bars = ax4.bar(categories, rates, color=colors, alpha=0.8, edgecolor='black', linewidth=1.5)
+
+    # Add value labels on bars
+    for bar, rate in zip(bars, rates):
+        height = bar.get_height()
+        ax4.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{rate:.2f}%', ha='center', va='bottom', fontweight='bold', fontsize=11)
+
+    fig.tight_layout()
+    return fig
+
+
+def article_main(analysis):
+    """article_main_chart.png: cumulative divorce rates for the article"""
+    df = analysis.df
+
+    fig = template('article_main')
+    ax, = fig.axes
+
+    # Plot lines
+    ax.plot(df['Year'], df['Rate_Male'], marker='o', linewidth=3,
+            label='Miesparit', color='#3498db', markersize=8)
+    ax.plot(df['Year'], df['Rate_Female'], marker='s', linewidth=3,
+            label='Naisparit', color='#e74c3c', markersize=8)
+    ax.plot(df['Year'], df['Rate_SameSex'], marker='^', linewidth=3,
+            label='Samaa sukupuolta yhteensä', color='#9b59b6', markersize=8, linestyle='--')
+    ax.plot(df['Year'], df['Rate_Opposite'], marker='D', linewidth=3,
+            label='Eri sukupuolta', color='#2ecc71', markersize=8, linestyle=':')
+
+    # Modelled trend: 95% band of the cumulative rate (mariye.trends)
+    trends = load_trends(analysis)
+    for key, color in [('Male', '#3498db'), ('Female', '#e74c3c'),
+                       ('SameSex', '#9b59b6'), ('Opposite', '#2ecc71')]:
+        rows = trends.group(key)
+        ax.fill_between(rows['Year'], rows['Cum_Lower'], rows['Cum_Upper'], color=color, alpha=0.12,
+                        linewidth=0, label='Mallinnettu trendi, 95 % luottamusväli' if key == 'Male' else None)
+
+    # Styling
+    ax.legend(loc='upper left', fontsize=12, framealpha=0.95)
+    ax.set_xticks(df['Year'])
+    ax.set_ylim(0, max(df['Rate_Opposite'].max(), df['Rate_Female'].max(),
+                       trends.table['Cum_Upper'].max()) * 1.1)
+
+    # Add data labels on final points
+    last_year = df['Year'].iloc[-1]
+    for rate, label, color in [
+        (df['Rate_Male'].iloc[-1], 'Miehet', '#3498db'),
+        (df['Rate_Female'].iloc[-1], 'Naiset', '#e74c3c'),
+        (df['Rate_Opposite'].iloc[-1], 'Hetero', '#2ecc71')
+    ]:
+        ax.annotate(f'{rate:.1f}%',
+                    xy=(last_year, rate),
+                    xytext=(10, 0),
+                    textcoords='offset points',
+                    fontsize=11,
+                    fontweight='bold',
+                    color=color,
+                    bbox=dict(boxstyle='round,pad=0.3', facecolor='white', edgecolor=color, alpha=0.8))
+
+    fig.tight_layout()
+    return fig
+
+
+def article_supporting(analysis):
+    """article_supporting_chart.png: yearly marriages and divorces for context"""
+    df = analysis.df
+
+    fig = template('article_supporting')
+    ax1, ax2 = fig.axes
+
+    # Chart A: Marriages
+    years = df['Year'].values
+    width = 0.35
+    x = np.arange(len(years))
+
+    ax1.bar(x - width/2, df['Marriages_Opposite']/1000, width,
+            label='Eri sukupuolta', color='#2ecc71', alpha=0.8)
+    ax1.bar(x + width/2, df['Marriages_SameSex'], width,
+            label='Samaa sukupuolta', color='#9b59b6', alpha=0.8)
+
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(years, rotation=45)
+    ax1.legend(fontsize=11)
+
+    # Chart B: Divorces
+    ax2.bar(x - width/2, df['Divorces_Opposite']/1000, width,
+            label='Eri sukupuolta', color='#2ecc71', alpha=0.8)
+    ax2.bar(x + width/2, df['Divorces_SameSex'], width,
+            label='Samaa sukupuolta', color='#9b59b6', alpha=0.8)
+
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(years, rotation=45)
+    ax2.legend(fontsize=11)
+
+    fig.tight_layout()
+    return fig
+
+
+def article_simple_comparison(analysis):
+    """article_simple_comparison.png: final cumulative rates as horizontal bars"""
+    df = analysis.df
+
+    fig = template('article_simple_comparison')
+    ax, = fig.axes
+
+    categories = ['Miesparit', 'Naisparit', 'Eri sukupuolta']
+    rates = [
+        df['Rate_Male'].iloc[-1],
+        df['Rate_Female'].iloc[-1],
+        df['Rate_Opposite'].iloc[-1]
+    ]
+    colors = ['#3498db', '#e74c3c', '#2ecc71']
+
+    bars = ax.barh(categories, rates, color=colors, alpha=0.8, edgecolor='black', linewidth=2)
+
+    # Add percentage labels
+    for bar, rate in zip(bars, rates):
+        width = bar.get_width()
+        ax.text(width + 1, bar.get_y() + bar.get_height()/2.,
+                f'{rate:.1f}%', ha='left', va='center', fontweight='bold', fontsize=14)
+
+    fig.tight_layout()
+    return fig
+
+
+def advanced_panels(analysis):
+    """advanced_statistical_analysis.png: intervals, posteriors, ratios, sample sizes"""
+    df = analysis.df
+    ci_df = analysis.ci_frame()
+    groups = [analysis.groups[key] for key in ('Female', 'Male', 'Opposite')]
+
+    fig = template('advanced_panels')
+    ax1, ax2, ax3, ax4 = fig.axes
+
+    # Plot 1: Confidence Intervals
+    groups_names = ci_df['Group'].values
+    rates = ci_df['Rate'].values
+    ci_lower = ci_df['CI_Lower'].values
+    ci_upper = ci_df['CI_Upper'].values
+    errors = np.array([rates - ci_lower, ci_upper - rates])
+
+    colors = ['#e74c3c', '#3498db', '#2ecc71']
+    bars = ax1.barh(groups_names, rates, color=colors, alpha=0.7, edgecolor='black', linewidth=2)
+    ax1.errorbar(rates, groups_names, xerr=errors, fmt='none', color='black',
+                 capsize=5, capthick=2, linewidth=2)
+
+    for i, (bar, rate, lower, upper) in enumerate(zip(bars, rates, ci_lower, ci_upper)):
+        ax1.text(rate + 2, i, f'{rate:.1f}%\n[{lower:.1f}%-{upper:.1f}%]',
+                 va='center', fontweight='bold')
+
+    # Plot 2: Bayesian Posterior Distributions
+    x = np.linspace(0, 0.3, 1000)
+
+    for group in groups[:2]:  # Just same-sex couples
+        y = beta_pdf(x, group.alpha, group.beta)
+        ax2.plot(x, y, linewidth=2, label=group.label)
+        ax2.fill_between(x, 0, y, alpha=0.3)
+
+    ax2.legend()
+    ax2.set_xlim(0, 0.3)
+
+    # Plot 3: Yearly divorce-to-marriage ratios
+    ax3.plot(df['Year'], df['Ratio_SameSex'], marker='o', linewidth=2, markersize=8,
+             label='Samaa sukupuolta', color='#9b59b6')
+    ax3.plot(df['Year'], df['Ratio_Opposite'], marker='s', linewidth=2, markersize=8,
+             label='Eri sukupuolta', color='#2ecc71')
+
+    ax3.legend()
+
+    # Plot 4: Sample size visualization
+    sample_sizes = [analysis.groups[key].marriages for key in ('Male', 'Female', 'Opposite')]
+    labels = [f'{name}\n(n={size:,})' for name, size in
+              zip(['Miesparit', 'Naisparit', 'Eri sukupuolta'], sample_sizes)]
+    colors_bar = ['#3498db', '#e74c3c', '#2ecc71']
+
+    bars = ax4.bar(range(3), sample_sizes, color=colors_bar, alpha=0.7, edgecolor='black', linewidth=2)
+    ax4.set_xticks(range(3))
+    ax4.set_xticklabels(labels)
+    ax4.set_yscale('log')
+
+    for bar, size in zip(bars, sample_sizes):
+        height = bar.get_height()
+        ax4.text(bar.get_x() + bar.get_width()/2., height,
+                 f'{size:,}', ha='center', va='bottom', fontweight='bold', fontsize=10)
+
+    fig.tight_layout()
+    return fig
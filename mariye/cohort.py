@@ -0,0 +1,66 @@
+"""
+Cohort-table engine: per-year, per-group divorce/marriage rates
+
+Works on the wide yearly frame (Marriages_<group>, Divorces_<group> columns)
+or on long tables with any number of dimension columns (region, age band,
+...). Rates for all years and groups come out of one reshape or groupby,
+never a per-year boolean mask.
+"""
+
+import numpy as np
+import pandas as pd
+
+from mariye.intervals import wilson_score_interval
+
+
+def wide_groups(df):
+    """Group suffixes present in a wide frame, in column order"""
+    return [c[len('Marriages_'):] for c in df.columns
+            if c.startswith('Marriages_') and f"Divorces_{c[len('Marriages_'):]}" in df.columns]
+
+
+def _with_rates(table, confidence):
+    marriages = table['Marriages'].to_numpy()
+    divorces = table['Divorces'].to_numpy()
+    rate, ci_lower, ci_upper = wilson_score_interval(divorces, marriages, confidence)
+    # Same-year ratio: divorces of the year / marriages of the year (0 when no marriages)
+    table['Rate'] = rate * 100
+    table['CI_Lower'] = ci_lower * 100
+    table['CI_Upper'] = ci_upper * 100
+    return table
+
+
+def cohort_rates(frame, by, marriages='Marriages', divorces='Divorces', confidence=0.95):
+    """
+    Aggregate a long frame by the `by` columns and add rates in one pass
+    Returns a tidy frame: by..., Marriages, Divorces, Rate, CI_Lower, CI_Upper (%)
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    table = (
+        frame.groupby(by, observed=True, sort=True)[[marriages, divorces]]
+        .sum()
+        .rename(columns={marriages: 'Marriages', divorces: 'Divorces'})
+        .reset_index()
+    )
+    return _with_rates(table, confidence)
+
+
+def cohort_table(df, groups=None, year='Year', confidence=0.95):
+    """
+    Tidy per-year, per-group table from the wide yearly frame
+    `groups` defaults to every Marriages_*/Divorces_* pair in `df`.
+    Rates are same-year divorces / marriages, not cumulative.
+    """
+    groups = list(groups) if groups is not None else wide_groups(df)
+    marriages = df[[f'Marriages_{g}' for g in groups]].to_numpy()
+    divorces = df[[f'Divorces_{g}' for g in groups]].to_numpy()
+    years = df[year].to_numpy()
+
+    # (years x groups) arrays flattened row-major: year-major, group-minor
+    table = pd.DataFrame({
+        year: np.repeat(years, len(groups)),
+        'Group': pd.Categorical(np.tile(groups, len(years)), categories=groups),
+        'Marriages': marriages.ravel(),
+        'Divorces': divorces.ravel(),
+    })
+    return _with_rates(table, confidence)
@@ -0,0 +1,261 @@
+"""
+Shared analytics core: derived columns and statistics for all entry points
+
+app.py, divorce_analysis.py, article_analysis.py and
+advanced_statistical_analysis.py all import their frame and statistics from
+here, so the numbers cannot drift apart between copies.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from mariye.data import dataset_version
+from mariye.intervals import bayesian_estimate, beta_pdf, wilson_score_interval
+from mariye.pxweb import load_dataset
+from mariye.significance import chi2_test, fisher_test
+
+# Column suffixes in the order the derived columns are laid out
+GROUPS = ('Opposite', 'Male', 'Female', 'SameSex')
+
+# Raw yearly count columns of a dataset dict (besides 'Year')
+COUNT_COLUMNS = (
+    'Marriages_Opposite', 'Divorces_Opposite', 'Marriages_Male',
+    'Marriages_Female', 'Divorces_Male', 'Divorces_Female',
+)
+
+GROUP_LABELS = {
+    'Female': 'Naisparit',
+    'Male': 'Miesparit',
+    'SameSex': 'Samaa sukupuolta yhteensä',
+    'Opposite': 'Eri sukupuolta',
+}
+
+GROUP_COLORS = {
+    'Female': '#e74c3c',
+    'Male': '#3498db',
+    'SameSex': '#9b59b6',
+    'Opposite': '#2ecc71',
+}
+
+
+def cohens_h(p1, p2):
+    """
+    Cohen's h for comparing two proportions
+    Small: 0.2, Medium: 0.5, Large: 0.8
+    """
+    return 2 * (np.arcsin(np.sqrt(p1)) - np.arcsin(np.sqrt(p2)))
+
+
+def derive_frame(data, start=None):
+    """
+    Yearly frame with same-sex totals plus cumulative (Cum_Mar_*, Cum_Div_*),
+    cumulative rate (Rate_*, %) and same-year ratio (Ratio_*, %) columns
+    All groups are computed together on one (years x groups) array.
+    `start` = (marriages, divorces) per group already accumulated before the
+    first year of `data`, to continue an existing frame.
+    """
+    df = pd.DataFrame(data)
+    df['Marriages_SameSex'] = df['Marriages_Male'] + df['Marriages_Female']
+    df['Divorces_SameSex'] = df['Divorces_Male'] + df['Divorces_Female']
+
+    marriages = df[[f'Marriages_{g}' for g in GROUPS]].to_numpy(dtype=np.int64)
+    divorces = df[[f'Divorces_{g}' for g in GROUPS]].to_numpy(dtype=np.int64)
+    cum_mar = marriages.cumsum(axis=0)
+    cum_div = divorces.cumsum(axis=0)
+    if start is not None:
+        cum_mar += np.asarray(start[0], dtype=np.int64)
+        cum_div += np.asarray(start[1], dtype=np.int64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = cum_div / cum_mar * 100
+        ratio = divorces / marriages * 100
+
+    derived = {}
+    for i, g in enumerate(GROUPS):
+        derived[f'Cum_Mar_{g}'] = cum_mar[:, i]
+        derived[f'Cum_Div_{g}'] = cum_div[:, i]
+    for i, g in enumerate(GROUPS):
+        derived[f'Rate_{g}'] = rate[:, i]
+    for i, g in enumerate(GROUPS):
+        derived[f'Ratio_{g}'] = ratio[:, i]
+    return pd.concat([df, pd.DataFrame(derived, index=df.index)], axis=1)
+
+
+@dataclass(frozen=True)
+class GroupStats:
+    """Totals, Wilson interval and Beta(1, 1) posterior for one couple type"""
+    key: str
+    label: str
+    marriages: int
+    divorces: int
+    rate: float
+    ci_lower: float
+    ci_upper: float
+    posterior_mean: float
+    cred_lower: float
+    cred_upper: float
+    alpha: float
+    beta: float
+
+
+@dataclass(frozen=True)
+class Analysis:
+    """Everything the entry points show, computed once per dataset version"""
+    version: str
+    df: pd.DataFrame
+    groups: dict
+    # Male vs female same-sex couples (rows: male, female)
+    contingency_table: np.ndarray
+    odds_ratio: float
+    p_value_fisher: float
+    chi2: float
+    p_value_chi2: float
+    odds_ratio_female_vs_male: float
+    risk_ratio_female_vs_male: float
+    cohens_h: float
+    p_same: float
+    posterior_x: np.ndarray = field(repr=False)
+    posterior_pdf: dict = field(repr=False)
+
+    def ci_frame(self, keys=('Female', 'Male', 'Opposite')):
+        """Rates and 95% Wilson intervals in percent, one row per group"""
+        return pd.DataFrame([{
+            'Group': self.groups[k].label,
+            'Rate': self.groups[k].rate * 100,
+            'CI_Lower': self.groups[k].ci_lower * 100,
+            'CI_Upper': self.groups[k].ci_upper * 100,
+            'Marriages': self.groups[k].marriages,
+            'Divorces': self.groups[k].divorces,
+            'Color': GROUP_COLORS[k],
+        } for k in keys])
+
+
+def analyze(data):
+    """Compute the derived frame and all dataset-level statistics"""
+    df = derive_frame(data)
+    marriages = df[[f'Marriages_{g}' for g in GROUPS]].sum().to_numpy()
+    divorces = df[[f'Divorces_{g}' for g in GROUPS]].sum().to_numpy()
+    return _summarize(dataset_version(data), df, marriages, divorces)
+
+
+def _summarize(version, df, marriages, divorces):
+    # Dataset-level statistics depend on the data only through the per-group
+    # totals (sufficient statistics); intervals for all groups in one call each
+    rate, ci_lower, ci_upper = wilson_score_interval(divorces, marriages)
+    mean, cred_lower, cred_upper, a, b = bayesian_estimate(divorces, marriages)
+
+    groups = {}
+    for i, g in enumerate(GROUPS):
+        groups[g] = GroupStats(
+            g, GROUP_LABELS[g], int(marriages[i]), int(divorces[i]), float(rate[i]),
+            float(ci_lower[i]), float(ci_upper[i]), float(mean[i]),
+            float(cred_lower[i]), float(cred_upper[i]), float(a[i]), float(b[i])
+        )
+
+    male, female = groups['Male'], groups['Female']
+    contingency_table = np.array([
+        [male.divorces, male.marriages - male.divorces],
+        [female.divorces, female.marriages - female.divorces]
+    ])
+    odds_ratio, p_value_fisher = fisher_test(contingency_table)
+    chi2, p_value_chi2 = chi2_test(contingency_table)
+
+    posterior_x = np.linspace(0, 0.35, 1000)
+    posterior_pdf = {
+        g: beta_pdf(posterior_x, groups[g].alpha, groups[g].beta) for g in ('Male', 'Female')
+    }
+
+    return Analysis(
+        version=version,
+        df=df,
+        groups=groups,
+        contingency_table=contingency_table,
+        odds_ratio=odds_ratio,
+        p_value_fisher=p_value_fisher,
+        chi2=chi2,
+        p_value_chi2=p_value_chi2,
+        odds_ratio_female_vs_male=1/odds_ratio if odds_ratio != 0 else np.inf,
+        risk_ratio_female_vs_male=(female.rate / male.rate) if male.rate > 0 else np.inf,
+        cohens_h=cohens_h(female.rate, male.rate),
+        p_same=groups['SameSex'].rate,
+        posterior_x=posterior_x,
+        posterior_pdf=posterior_pdf,
+    )
+
+
+def _totals(analysis):
+    # Per-group (marriages, divorces) of an analysis, in GROUPS order
+    return (np.array([analysis.groups[g].marriages for g in GROUPS], dtype=np.int64),
+            np.array([analysis.groups[g].divorces for g in GROUPS], dtype=np.int64))
+
+
+def extends(analysis, data):
+    """
+    Number of years `data` appends to the dataset of `analysis`, or None if
+    `data` does not start with exactly the analysed years and counts
+    """
+    years = len(analysis.df)
+    if len(data['Year']) < years:
+        return None
+    for column in ('Year',) + COUNT_COLUMNS:
+        if analysis.df[column].tolist() != [int(v) for v in data[column][:years]]:
+            return None
+    return len(data['Year']) - years
+
+
+def append_years(analysis, data):
+    """
+    Analysis of `data` computed incrementally from `analysis` of its first years
+    Only the appended rows are derived (the cumulative columns continue from
+    the last analysed row) and the group totals are updated in place of
+    re-summing the whole frame; the result equals analyze(data).
+    Raises ValueError if `data` does not extend the analysed dataset.
+    """
+    added = extends(analysis, data)
+    if added is None:
+        raise ValueError(f'data does not extend dataset version {analysis.version}')
+    if added == 0:
+        return analysis
+
+    years = len(analysis.df)
+    new_rows = {column: list(values[years:]) for column, values in data.items()}
+    marriages, divorces = _totals(analysis)
+    tail = derive_frame(new_rows, start=(marriages, divorces))
+    df = pd.concat([analysis.df, tail], ignore_index=True)
+
+    marriages = marriages + tail[[f'Marriages_{g}' for g in GROUPS]].sum().to_numpy()
+    divorces = divorces + tail[[f'Divorces_{g}' for g in GROUPS]].sum().to_numpy()
+    return _summarize(dataset_version(data), df, marriages, divorces)
+
+
+_analyses = {}
+
+
+def base_analysis(data):
+    """Memoized analysis of the longest earlier dataset that `data` extends, or None"""
+    candidates = [(len(a.df), a) for a in _analyses.values() if extends(a, data)]
+    return max(candidates, key=lambda c: c[0])[1] if candidates else None
+
+
+def load_analysis(data=None):
+    """
+    Analysis of `data` (defaults to mariye.pxweb.load_dataset()),
+    memoized per dataset version within the process
+    A new version that only appends years to a memoized one (a yearly
+    release) is computed incrementally with append_years().
+    """
+    if data is None:
+        data = load_dataset()
+    version = dataset_version(data)
+    if version not in _analyses:
+        base = base_analysis(data)
+        _analyses[version] = append_years(base, data) if base is not None else analyze(data)
+    return _analyses[version]
+
+
+def clear(version=None):
+    """Drop memoized analyses from memory, for one dataset version or all"""
+    for key in list(_analyses):
+        if version is None or key == version:
+            del _analyses[key]
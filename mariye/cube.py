@@ -0,0 +1,227 @@
+"""
+Compact store for multi-dimensional PxWeb tables
+
+A PxWeb table is a cube: one value for every combination of its dimensions'
+categories (region x year x age x duration x content). Flattened into a long
+frame with one string column per dimension and float64 values, every cell
+costs 8 bytes per dimension plus 8 for the value. Cube keeps instead
+- the categories (codes and labels) of each dimension once,
+- the values in one dense ndarray indexed by category positions, in C order
+  like json-stat2, in the smallest type that holds them (COUNT_DTYPES:
+  uint16 for most StatFin count tables, int32 beyond that),
+- missing cells ('..' in PxWeb) as a boolean mask, only when there are any.
+
+Selections of categories (take) and sums over dimensions (sum) work on the
+array. Frames are built on demand: to_long gives the long layout with
+categorical dimension columns (int8/int16 codes), to_wide one row per
+combination of the index dimensions and one column per combination of the
+others, like the pivots used for mariye.data.DATA and the regional counts.
+"""
+
+import itertools
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+# Integer value types, smallest first; floats are kept as float64
+COUNT_DTYPES = (np.uint16, np.int32, np.int64)
+
+
+# Elements per block when checking float values for fractions
+CHECK_BLOCK = 1 << 20
+
+
+def _integral(values):
+    # True if all finite values are whole numbers, checked block by block
+    flat = values.ravel()
+    for start in range(0, flat.size, CHECK_BLOCK):
+        block = flat[start:start + CHECK_BLOCK]
+        block = block[np.isfinite(block)]
+        if not np.array_equal(block, np.round(block)):
+            return False
+    return True
+
+
+def count_dtype(values):
+    """Smallest of COUNT_DTYPES holding `values` (NaN ignored), float64 for fractions"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        if np.isnan(values).all():
+            return np.dtype(COUNT_DTYPES[0])
+        if not _integral(values):
+            return np.dtype(np.float64)
+        low, high = np.nanmin(values), np.nanmax(values)
+    elif values.size == 0:
+        return np.dtype(COUNT_DTYPES[0])
+    else:
+        low, high = values.min(), values.max()
+    for dtype in COUNT_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.float64)
+
+
+def compact(values):
+    """(values in count_dtype with missing cells as 0, missing mask or None)"""
+    values = np.asarray(values)
+    missing = np.isnan(values) if values.dtype.kind == 'f' else np.zeros(values.shape, dtype=bool)
+    dtype = count_dtype(values)
+    with np.errstate(invalid='ignore'):
+        values = values.astype(dtype, copy=False)
+    if dtype.kind != 'f':
+        values[missing] = 0
+    return values, (missing if missing.any() else None)
+
+
+def _combined_labels(label_lists):
+    # 'a b' for every combination, first list slowest like the C-order array
+    return [' '.join(parts) for parts in itertools.product(*label_lists)]
+
+
+@dataclass(frozen=True)
+class Cube:
+    """Values of a PxWeb table as a dense ndarray indexed by dimension categories"""
+    dims: tuple
+    # dim -> tuple of category codes, in array order
+    codes: dict = field(repr=False)
+    # dim -> {code: label}
+    labels: dict = field(repr=False)
+    values: np.ndarray = field(repr=False)
+    # True where PxWeb had no value; None when nothing is missing
+    missing: np.ndarray = field(default=None, repr=False)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self):
+        """Bytes held by the value array and the missing mask"""
+        return self.values.nbytes + (self.missing.nbytes if self.missing is not None else 0)
+
+    def axis(self, dim):
+        return self.dims.index(dim)
+
+    def label_list(self, dim):
+        return [str(self.labels.get(dim, {}).get(code, code)) for code in self.codes[dim]]
+
+    def take(self, dim, codes):
+        """Cube with only the given categories of `dim`, in the given order"""
+        position = {code: i for i, code in enumerate(self.codes[dim])}
+        indices = np.array([position[code] for code in codes], dtype=np.intp)
+        axis = self.axis(dim)
+        missing = None if self.missing is None else np.take(self.missing, indices, axis=axis)
+        return Cube(self.dims, {**self.codes, dim: tuple(codes)}, self.labels,
+                    np.take(self.values, indices, axis=axis),
+                    missing if missing is not None and missing.any() else None)
+
+    def drop(self, dim, codes):
+        """Cube without the given categories of `dim`"""
+        codes = set(codes)
+        return self.take(dim, [code for code in self.codes[dim] if code not in codes])
+
+    def sum(self, dims):
+        """Cube summed over `dims`; a cell is missing if all of its summands were"""
+        axes = tuple(self.axis(dim) for dim in dims)
+        kept = tuple(dim for dim in self.dims if dim not in dims)
+        dtype = np.float64 if self.values.dtype.kind == 'f' else np.int64
+        values, _ = compact(self.values.sum(axis=axes, dtype=dtype))
+        missing = None
+        if self.missing is not None:
+            missing = self.missing.all(axis=axes)
+            missing = missing if missing.any() else None
+        return Cube(kept, {dim: self.codes[dim] for dim in kept},
+                    {dim: self.labels[dim] for dim in kept if dim in self.labels},
+                    values, missing)
+
+    def to_long(self):
+        """
+        Long frame: one categorical column per dimension (category codes) plus
+        'value' (nullable integer when cells are missing)
+        """
+        columns = {}
+        size = self.values.size
+        inner = size
+        for dim in self.dims:
+            n = len(self.codes[dim])
+            inner //= max(n, 1)
+            positions = np.arange(n, dtype=np.min_scalar_type(max(n - 1, 0)))
+            positions = np.tile(np.repeat(positions, inner), size // max(n * inner, 1))
+            columns[dim] = pd.Categorical.from_codes(positions, categories=list(self.codes[dim]))
+
+        values = self.values.ravel()
+        if self.missing is None:
+            columns['value'] = values
+        elif values.dtype.kind == 'f':
+            columns['value'] = np.where(self.missing.ravel(), np.nan, values)
+        else:
+            columns['value'] = pd.arrays.IntegerArray(values, self.missing.ravel().copy())
+        return pd.DataFrame(columns)
+
+    def to_wide(self, index):
+        """
+        One row per combination of the `index` dimensions, one column per
+        combination of the other dimensions' labels (joined by a space;
+        columns with equal labels are summed). Missing cells count as 0.
+        """
+        index = list(index)
+        others = [dim for dim in self.dims if dim not in index]
+        order = [self.axis(dim) for dim in index + others]
+        n_rows = int(np.prod([len(self.codes[dim]) for dim in index]))
+        values = np.transpose(self.values, order).reshape(n_rows, -1)
+
+        columns = _combined_labels([self.label_list(dim) for dim in others])
+        unique, inverse = np.unique(columns, return_inverse=True)
+        if len(unique) < len(columns):
+            dtype = np.float64 if values.dtype.kind == 'f' else np.int64
+            summed = np.zeros((n_rows, len(unique)), dtype=dtype)
+            np.add.at(summed.T, inverse.ravel(), values.T)
+            keep = np.sort(np.unique(inverse.ravel(), return_index=True)[1])
+            values, columns = summed[:, inverse.ravel()[keep]], [columns[i] for i in keep]
+
+        if len(index) == 1:
+            rows = pd.Index(self.codes[index[0]], name=index[0])
+        else:
+            rows = pd.MultiIndex.from_product([self.codes[dim] for dim in index], names=index)
+        return pd.DataFrame(values, index=rows, columns=columns)
+
+
+def from_long(frame, labels=None, dims=None, value='value'):
+    """
+    Cube of a long frame (one column per dimension plus `value`)
+    Category order follows `labels` (dim -> {code: label}, e.g. the PxWeb
+    metadata), categorical columns or first appearance. Duplicate rows are
+    summed; combinations without a row are missing.
+    """
+    labels = labels or {}
+    dims = tuple(dims or (labels and list(labels)) or [c for c in frame.columns if c != value])
+    codes = {}
+    positions = []
+    for dim in dims:
+        column = frame[dim]
+        if dim in labels:
+            categories = list(labels[dim])
+        elif isinstance(column.dtype, pd.CategoricalDtype):
+            categories = list(column.cat.categories)
+        else:
+            categories = list(pd.unique(column))
+        position = pd.Categorical(column, categories=categories).codes
+        if (position < 0).any():
+            unknown = sorted(set(column[position < 0].astype(str)))[:5]
+            raise ValueError(f'{dim}: codes not in the table metadata: {unknown}')
+        codes[dim] = tuple(categories)
+        positions.append(position)
+
+    shape = tuple(len(codes[dim]) for dim in dims)
+    size = int(np.prod(shape))
+    flat = np.ravel_multi_index(positions, shape) if dims else np.zeros(len(frame), dtype=np.intp)
+    data = pd.to_numeric(frame[value], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    present = ~np.isnan(data)
+    sums = np.bincount(flat[present], weights=data[present], minlength=size)
+    observed = np.bincount(flat[present], minlength=size) > 0
+    values, _ = compact(np.where(observed, sums, np.nan).reshape(shape))
+    missing = ~observed.reshape(shape)
+    return Cube(dims, codes, {dim: dict(labels[dim]) for dim in dims if dim in labels},
+                values, missing if missing.any() else None)
@@ -0,0 +1,407 @@
+"""
+Data exports: CSV, Parquet, JSON-stat and Excel, built only on demand
+
+    python -m mariye.export [TABLE] [--format csv|parquet|json-stat|xlsx]
+                            [--out FILE] [--source pxweb|bundled|FILE.json]
+
+Every exportable table (TABLES) is a function of a source object with a
+`version`: a mariye.core.Analysis for the yearly tables, a
+mariye.regions.RegionBreakdown for the regional ones. An export is rendered
+the first time it is asked for and kept in memory per (table, version,
+format) like the figure specs in mariye.figures, optionally backed by files
+under MARIYE_EXPORT_CACHE_DIR.
+
+stream() yields an export in chunks. CSV and Parquet are written CHUNK_ROWS
+rows at a time (one Parquet row group each), so a large regional or cohort
+table is never converted in one piece; JSON-stat and Excel files are built
+whole and then sent in CHUNK_BYTES pieces. Parquet needs pyarrow and Excel
+openpyxl or xlsxwriter; available_formats() lists what this installation
+can write.
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mariye.cohort import cohort_table
+from mariye.core import load_analysis
+from mariye.pxweb import load_source
+from mariye.regions import load_breakdown, load_regions
+
+EXPORT_CACHE_DIR = os.environ.get('MARIYE_EXPORT_CACHE_DIR')
+
+CHUNK_ROWS = 50_000
+CHUNK_BYTES = 1 << 20
+
+# Name of the content (metric) dimension in JSON-stat, as in StatFin tables
+CONTENT_DIMENSION = 'Tiedot'
+
+
+class ExportError(RuntimeError):
+    """Raised when a table cannot be exported in the requested format"""
+
+
+def detailed_table(analysis):
+    """divorce_analysis_detailed.csv: the full derived yearly frame"""
+    return analysis.df
+
+
+def datawrapper_table(analysis):
+    """datawrapper_export.csv: rates and counts with Finnish column names for Datawrapper"""
+    df = analysis.df
+    return pd.DataFrame({
+        'Vuosi': df['Year'],
+        'Miesparit_eroaste': df['Rate_Male'].round(2),
+        'Naisparit_eroaste': df['Rate_Female'].round(2),
+        'Samaa_sukupuolta_yhteensä': df['Rate_SameSex'].round(2),
+        'Eri_sukupuolta_eroaste': df['Rate_Opposite'].round(2),
+        'Miesparit_avioliitot': df['Marriages_Male'],
+        'Naisparit_avioliitot': df['Marriages_Female'],
+        'Eri_sukupuolta_avioliitot': df['Marriages_Opposite'],
+        'Miesparit_avioerot': df['Divorces_Male'],
+        'Naisparit_avioerot': df['Divorces_Female'],
+        'Eri_sukupuolta_avioerot': df['Divorces_Opposite'],
+    })
+
+
+def yearly_group_table(analysis):
+    """Same-year rates with Wilson intervals, one row per year and couple type"""
+    return cohort_table(analysis.df)
+
+
+def region_rates_table(breakdown):
+    """Raw and shrunken rates, one row per region and couple type"""
+    return breakdown.rates
+
+
+def region_tests_table(breakdown):
+    """Female vs male Fisher tests, one row per region"""
+    return breakdown.tests
+
+
+@dataclass(frozen=True)
+class Table:
+    """One exportable table: its builder and how its rows are keyed"""
+    name: str
+    stem: str  # download file name without extension
+    build: object  # source (Analysis or RegionBreakdown) -> DataFrame
+    keys: tuple  # columns identifying a row; the JSON-stat dimensions
+    source: str = 'analysis'  # or 'regions'
+    labels: dict = field(default_factory=dict)  # key column -> column of its labels
+    title: str = ''
+
+
+TABLES = {t.name: t for t in [
+    Table('yearly', 'avioerot_vuosittain', detailed_table, ('Year',),
+          title='Avioliitot ja avioerot vuosittain'),
+    Table('datawrapper', 'datawrapper_export', datawrapper_table, ('Vuosi',),
+          title='Eroasteet ja määrät (Datawrapper)'),
+    Table('groups', 'eroasteet_ryhmittain', yearly_group_table, ('Year', 'Group'),
+          title='Vuoden eroaste ryhmittäin (Wilson-luottamusväli)'),
+    Table('regions', 'eroasteet_alueittain', region_rates_table, ('Region', 'Group'),
+          source='regions', labels={'Region': 'Region_Label'},
+          title='Eroasteet alueittain (empiirinen Bayes)'),
+    Table('region_tests', 'naisparit_miesparit_alueittain', region_tests_table, ('Region',),
+          source='regions', labels={'Region': 'Region_Label'},
+          title='Naisparit vs. miesparit alueittain (Fisherin tarkka testi)'),
+]}
+
+
+def _pieces(payload):
+    for start in range(0, len(payload), CHUNK_BYTES):
+        yield payload[start:start + CHUNK_BYTES]
+
+
+def csv_chunks(frame, table, chunk_rows=CHUNK_ROWS):
+    """UTF-8 CSV of `frame`, chunk_rows rows per chunk (the first with the header)"""
+    if frame.empty:
+        yield frame.to_csv(index=False).encode('utf-8')
+    for start in range(0, len(frame), chunk_rows):
+        chunk = frame.iloc[start:start + chunk_rows]
+        yield chunk.to_csv(index=False, header=start == 0).encode('utf-8')
+
+
+class _Sink(io.RawIOBase):
+    # Write-only file that hands its bytes over on drain() (Parquet streaming)
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts.clear()
+        return data
+
+
+def parquet_chunks(frame, table, chunk_rows=CHUNK_ROWS):
+    """Parquet file of `frame`, one row group of chunk_rows rows per chunk"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ExportError('Parquet export needs pyarrow') from exc
+
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for start in range(0, max(len(frame), 1), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def json_stat(frame, table):
+    """
+    JSON-stat 2.0 dataset of `frame` (a dict): one dimension per key column
+    plus the content dimension (CONTENT_DIMENSION) of the remaining columns;
+    readable with mariye.pxweb.parse_json_stat2
+    """
+    keys = list(table.keys)
+    if frame.duplicated(keys).any():
+        raise ExportError(f'{table.name}: rows are not unique by {keys}')
+    label_columns = set(table.labels.values())
+    metrics = [c for c in frame.columns if c not in keys and c not in label_columns]
+
+    dimension = {}
+    sizes = []
+    position = np.zeros(len(frame), dtype=np.int64)
+    for key in keys:
+        codes, categories = pd.factorize(frame[key], sort=False)
+        categories = [str(c) for c in categories]
+        if key in table.labels:
+            names = frame[table.labels[key]].groupby(codes).first().astype(str).tolist()
+        else:
+            names = categories
+        dimension[key] = {'label': key, 'category': {
+            'index': categories, 'label': dict(zip(categories, names))
+        }}
+        position = position * len(categories) + codes
+        sizes.append(len(categories))
+    dimension[CONTENT_DIMENSION] = {'label': CONTENT_DIMENSION, 'category': {
+        'index': metrics, 'label': {m: m for m in metrics}
+    }}
+    sizes.append(len(metrics))
+
+    # Row-major cells, content last; combinations absent from the frame are null
+    value = np.full(int(np.prod(sizes)), None, dtype=object)
+    for i, metric in enumerate(metrics):
+        column = frame[metric]
+        if pd.api.types.is_float_dtype(column):
+            column = column.where(np.isfinite(column))
+        cells = np.array(column.astype(object).where(column.notna(), None).tolist(), dtype=object)
+        value[position * len(metrics) + i] = cells
+    return {
+        'version': '2.0',
+        'class': 'dataset',
+        'label': table.title or table.name,
+        'id': keys + [CONTENT_DIMENSION],
+        'size': sizes,
+        'role': {'metric': [CONTENT_DIMENSION]},
+        'dimension': dimension,
+        'value': value.tolist(),
+    }
+
+
+def json_stat_chunks(frame, table, chunk_rows=CHUNK_ROWS):
+    """JSON-stat 2.0 file of `frame` (built whole, sent in CHUNK_BYTES pieces)"""
+    payload = json.dumps(json_stat(frame, table), ensure_ascii=False, allow_nan=False,
+                         default=_json_default)
+    yield from _pieces(payload.encode('utf-8'))
+
+
+def _json_default(value):
+    # numpy scalars left in object columns
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def excel_chunks(frame, table, chunk_rows=CHUNK_ROWS):
+    """Excel workbook of `frame` on one sheet (built whole, sent in CHUNK_BYTES pieces)"""
+    buffer = io.BytesIO()
+    try:
+        frame.to_excel(buffer, index=False, sheet_name=table.name[:31])
+    except ImportError as exc:
+        raise ExportError('Excel export needs openpyxl or xlsxwriter') from exc
+    yield from _pieces(buffer.getvalue())
+
+
+@dataclass(frozen=True)
+class Format:
+    """One output format: file extension, MIME type and chunk writer"""
+    name: str
+    extension: str
+    mime: str
+    write: object  # (frame, table, chunk_rows) -> iterator of bytes
+    requires: tuple = ()  # any one of these modules
+
+
+FORMATS = {f.name: f for f in [
+    Format('csv', '.csv', 'text/csv', csv_chunks),
+    Format('parquet', '.parquet', 'application/vnd.apache.parquet', parquet_chunks, ('pyarrow',)),
+    Format('json-stat', '.json', 'application/json', json_stat_chunks),
+    Format('xlsx', '.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+           excel_chunks, ('openpyxl', 'xlsxwriter')),
+]}
+
+
+def available_formats():
+    """Names of the formats whose optional dependencies are installed"""
+    return [name for name, f in FORMATS.items()
+            if not f.requires or any(importlib.util.find_spec(m) for m in f.requires)]
+
+
+def _lookup(name, fmt):
+    if name not in TABLES:
+        raise KeyError(f"unknown table {name!r}, expected one of {', '.join(TABLES)}")
+    if fmt not in FORMATS:
+        raise KeyError(f"unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    return TABLES[name], FORMATS[fmt]
+
+
+def filename(name, fmt):
+    """Download file name of table `name` in format `fmt`"""
+    table, output = _lookup(name, fmt)
+    return table.stem + output.extension
+
+
+def cache_key(name, version, fmt):
+    """Key of one export: table name, source version and format"""
+    return f'{name}-{version}-{fmt}'
+
+
+_exports = {}
+
+
+def stream(name, source, fmt='csv', chunk_rows=CHUNK_ROWS, cache_dir=None):
+    """
+    Export of table `name` for `source` in format `fmt`, as an iterator of
+    bytes chunks. Served from the cache when present; otherwise rendered while
+    streaming and cached once the last chunk was produced.
+    """
+    table, output = _lookup(name, fmt)
+    key = cache_key(name, source.version, fmt)
+    cached = _exports.get(key)
+    if cached is not None:
+        yield from _pieces(cached)
+        return
+
+    cache_dir = cache_dir or EXPORT_CACHE_DIR
+    path = Path(cache_dir) / f'{key}{output.extension}' if cache_dir else None
+    if path is not None and path.exists():
+        with open(path, 'rb') as f:
+            while chunk := f.read(CHUNK_BYTES):
+                yield chunk
+        return
+
+    parts = []
+    for chunk in output.write(table.build(source), table, chunk_rows):
+        parts.append(chunk)
+        yield chunk
+    payload = b''.join(parts)
+    _exports[key] = payload
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+
+
+def export_bytes(name, source, fmt='csv', cache_dir=None):
+    """The whole export of table `name` for `source` (see stream), cached per version"""
+    cached = _exports.get(cache_key(name, source.version, fmt))
+    if cached is not None:
+        return cached
+    return b''.join(stream(name, source, fmt, cache_dir=cache_dir))
+
+
+def clear(version=None):
+    """Drop cached exports from memory, for one source version or all"""
+    for key in list(_exports):
+        if version is None or f'-{version}-' in key:
+            del _exports[key]
+
+
+def load_input(name, source='pxweb', refresh=False, offline=False):
+    """
+    Source object of table `name`: the Analysis of dataset `source` (see
+    mariye.pxweb.load_source) or the breakdown of the regional table
+    """
+    if TABLES[name].source == 'regions':
+        return load_breakdown(load_regions(refresh=refresh, offline=offline))
+    return load_analysis(load_source(source, refresh=refresh, offline=offline))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m mariye.export',
+        description='Write one table in CSV, Parquet, JSON-stat or Excel format.'
+    )
+    parser.add_argument('table', nargs='?', default='yearly',
+                        help=f"table (default: %(default)s): {', '.join(TABLES)}")
+    parser.add_argument('-f', '--format', default='csv', choices=list(FORMATS),
+                        help='output format (default: %(default)s)')
+    parser.add_argument('-o', '--out', type=Path, default=None,
+                        help="output file, '-' for stdout (default: the table's file name)")
+    parser.add_argument('-s', '--source', default='pxweb',
+                        help="dataset of the yearly tables: 'pxweb' (cached table, default), "
+                             "'bundled' or a JSON file in the mariye.data.DATA layout")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS,
+                        help='rows per CSV chunk / Parquet row group (default: %(default)s)')
+    parser.add_argument('--refresh', action='store_true', help='re-validate the PxWeb cache first')
+    parser.add_argument('--offline', action='store_true', help='never touch the network')
+    parser.add_argument('--list', action='store_true', help='list the tables and formats and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for table in TABLES.values():
+            print(f'{table.name:14s} {table.source:9s} {table.title}')
+        print(f"formats: {', '.join(available_formats())}")
+        return 0
+    if args.table not in TABLES:
+        parser.error(f"unknown table {args.table!r} (see --list)")
+
+    source = load_input(args.table, args.source, refresh=args.refresh, offline=args.offline)
+    chunks = stream(args.table, source, args.format, chunk_rows=args.chunk_rows)
+    if str(args.out) == '-':
+        for chunk in chunks:
+            sys.stdout.buffer.write(chunk)
+        return 0
+    path = args.out or Path(filename(args.table, args.format))
+    tmp = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    except ExportError as exc:
+        tmp.unlink(missing_ok=True)
+        print(f'error: {exc}', file=sys.stderr)
+        return 1
+    os.replace(tmp, path)
+    print(f'{path} ({path.stat().st_size:,} bytes)', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
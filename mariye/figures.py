@@ -0,0 +1,403 @@
+"""
+Plotly figures for the app, built once per dataset version
+
+Each builder turns a mariye.core.Analysis into a go.Figure. The app does not
+call the builders directly: figure_spec() serializes the result to Plotly
+JSON once per (figure, dataset version, display options) and serves it from
+an in-memory cache, optionally backed by JSON files on disk so new worker
+processes start warm.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import plotly.graph_objects as go
+
+# Set to a directory to persist figure specs across processes
+FIGURE_CACHE_DIR = os.environ.get('MARIYE_FIGURE_CACHE_DIR')
+
+
+def simple_comparison(analysis):
+    """fig_simple: female vs male same-sex divorce rate, horizontal bars"""
+    p_female = analysis.groups['Female'].rate
+    p_male = analysis.groups['Male'].rate
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=[p_female*100, p_male*100],
+        y=['Naisparit', 'Miesparit'],
+        orientation='h',
+        marker=dict(color=['#e74c3c', '#3498db']),
+        text=[f'{p_female*100:.1f}%', f'{p_male*100:.1f}%'],
+        textposition='outside',
+        textfont=dict(size=20, color='black', family='Arial Black'),
+        hovertemplate='<b>%{y}</b><br>Eroaste: %{x:.1f}%<br><extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text="Samaa sukupuolta olevien parien avioerot 2017-2024",
+            font=dict(size=18, family='Arial', color='black')
+        ),
+        xaxis=dict(
+            title="Eroaste (%)",
+            range=[0, 30],
+            tickfont=dict(size=14),
+            titlefont=dict(size=16)
+        ),
+        yaxis=dict(
+            tickfont=dict(size=16, family='Arial Black'),
+            categoryorder='total ascending'
+        ),
+        height=300,
+        showlegend=False,
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        margin=dict(l=100, r=100, t=60, b=60)
+    )
+    return fig
+
+
+def cumulative_rates(analysis):
+    """fig1: cumulative divorce rate per couple type by year"""
+    df = analysis.df
+
+    fig = go.Figure()
+
+    for column, name, color, dash in [
+        ('Rate_Male', 'Miesparit', '#3498db', None),
+        ('Rate_Female', 'Naisparit', '#e74c3c', None),
+        ('Rate_SameSex', 'Samaa sukupuolta yhteensä', '#9b59b6', 'dash'),
+        ('Rate_Opposite', 'Eri sukupuolta', '#2ecc71', 'dot'),
+    ]:
+        line = dict(color=color, width=3)
+        if dash:
+            line['dash'] = dash
+        fig.add_trace(go.Scatter(
+            x=df['Year'], y=df[column],
+            name=name,
+            mode='lines+markers',
+            line=line,
+            marker=dict(size=8)
+        ))
+
+    fig.update_layout(
+        xaxis_title="Vuosi",
+        yaxis_title="Kumulatiivinen eroaste (%)",
+        hovermode='x unified',
+        height=500,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+
+def cumulative_trends(analysis):
+    """
+    fig1_trend: fig1 with the modelled cumulative rate of each couple type
+    and its 95% band (mariye.trends, Poisson GLM, quadratic in year)
+    """
+    # Only this figure needs the trend model (and with it scipy)
+    from mariye.trends import load_trends
+
+    fig = cumulative_rates(analysis)
+    trends = load_trends(analysis)
+    for trace, key in zip(list(fig.data), ['Male', 'Female', 'SameSex', 'Opposite']):
+        rows = trends.group(key)
+        color = trace.line.color
+        fig.add_trace(go.Scatter(
+            x=list(rows['Year']) + list(rows['Year'][::-1]),
+            y=list(rows['Cum_Upper']) + list(rows['Cum_Lower'][::-1]),
+            fill='toself', fillcolor=color, opacity=0.15, line=dict(width=0),
+            name=f'{trace.name}: 95% luottamusväli', hoverinfo='skip', showlegend=False
+        ))
+        fig.add_trace(go.Scatter(
+            x=rows['Year'], y=rows['Cum_Fitted'],
+            name=f'{trace.name} (malli)', mode='lines',
+            line=dict(color=color, width=1.5, dash='longdash'),
+            customdata=rows[['Cum_Lower', 'Cum_Upper']],
+            hovertemplate='%{y:.1f}% (95% LV %{customdata[0]:.1f}–%{customdata[1]:.1f}%)',
+            showlegend=False
+        ))
+    return fig
+
+
+def _yearly_bars(analysis, prefix, yaxis_title):
+    df = analysis.df
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        x=df['Year'],
+        y=df[f'{prefix}_Male'],
+        name='Miesparit',
+        marker_color='#3498db'
+    ))
+
+    fig.add_trace(go.Bar(
+        x=df['Year'],
+        y=df[f'{prefix}_Female'],
+        name='Naisparit',
+        marker_color='#e74c3c'
+    ))
+
+    fig.update_layout(
+        xaxis_title="Vuosi",
+        yaxis_title=yaxis_title,
+        barmode='group',
+        height=400
+    )
+    return fig
+
+
+def yearly_marriages(analysis):
+    """fig2: same-sex marriages per year"""
+    return _yearly_bars(analysis, 'Marriages', "Avioliittojen määrä")
+
+
+def yearly_divorces(analysis):
+    """fig3: same-sex divorces per year"""
+    return _yearly_bars(analysis, 'Divorces', "Avioerojen määrä")
+
+
+def confidence_intervals(analysis):
+    """fig_ci: rates with 95% Wilson intervals"""
+    fig = go.Figure()
+
+    for result in analysis.ci_frame().to_dict('records'):
+        fig.add_trace(go.Bar(
+            y=[result['Group']],
+            x=[result['Rate']],
+            orientation='h',
+            name=result['Group'],
+            marker_color=result['Color'],
+            error_x=dict(
+                type='data',
+                symmetric=False,
+                array=[result['CI_Upper'] - result['Rate']],
+                arrayminus=[result['Rate'] - result['CI_Lower']],
+                thickness=2,
+                width=10
+            ),
+            showlegend=False
+        ))
+
+    fig.update_layout(
+        title="Eroasteet 95% Luottamusvälein",
+        xaxis_title="Eroaste (%) ± 95% Luottamusväli",
+        yaxis_title="",
+        height=300
+    )
+    return fig
+
+
+def posterior(analysis):
+    """fig_bayes: Beta posteriors of the male and female divorce rates"""
+    x = analysis.posterior_x
+
+    fig = go.Figure()
+
+    for key, name, color in [('Male', 'Miesparit', '#3498db'), ('Female', 'Naisparit', '#e74c3c')]:
+        fig.add_trace(go.Scatter(
+            x=x*100, y=analysis.posterior_pdf[key],
+            mode='lines',
+            name=name,
+            fill='tozeroy',
+            line=dict(color=color, width=2),
+            opacity=0.7
+        ))
+
+    fig.update_layout(
+        title="Bayesilainen Posteriorijakauma<br><sub>Todennäköisyysjakauma sille, mikä todellinen eroaste on</sub>",
+        xaxis_title="Eroaste (%)",
+        yaxis_title="Todennäköisyystiheys",
+        height=400,
+        hovermode='x unified'
+    )
+    return fig
+
+
+def yearly_shrinkage(fit, keys=('Male', 'Female')):
+    """Yearly ratios: raw (Wilson interval) vs hierarchical estimate (credible interval)"""
+    fig = go.Figure()
+
+    for key, name, color in [('Male', 'Miesparit', '#3498db'), ('Female', 'Naisparit', '#e74c3c')]:
+        if key not in keys:
+            continue
+        rows = fit.group(key)
+        fig.add_trace(go.Scatter(
+            x=rows['Year'], y=rows['Rate'],
+            name=f'{name}: havaittu',
+            mode='markers',
+            marker=dict(color=color, size=9, symbol='circle-open'),
+            error_y=dict(type='data', symmetric=False,
+                         array=rows['CI_Upper'] - rows['Rate'],
+                         arrayminus=rows['Rate'] - rows['CI_Lower'],
+                         thickness=1, width=3)
+        ))
+        fig.add_trace(go.Scatter(
+            x=rows['Year'], y=rows['EB_Rate'],
+            name=f'{name}: hierarkkinen malli',
+            mode='lines+markers',
+            line=dict(color=color, width=3),
+            error_y=dict(type='data', symmetric=False,
+                         array=rows['Cred_Upper'] - rows['EB_Rate'],
+                         arrayminus=rows['EB_Rate'] - rows['Cred_Lower'],
+                         thickness=2, width=6)
+        ))
+
+    fig.update_layout(
+        xaxis_title="Vuosi",
+        yaxis_title="Vuoden avioerot / vuoden avioliitot (%)",
+        hovermode='x unified',
+        height=450,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
+
+
+def regional_rates(breakdown, key, limit=30):
+    """Shrunken (EB) rates with credible intervals for the `limit` highest regions, raw rates as markers"""
+    rows = breakdown.group(key).head(limit).iloc[::-1]
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        y=rows['Region_Label'],
+        x=rows['EB_Rate'],
+        orientation='h',
+        name='Tasoitettu eroaste',
+        marker_color='#9b59b6',
+        error_x=dict(
+            type='data',
+            symmetric=False,
+            array=rows['Cred_Upper'] - rows['EB_Rate'],
+            arrayminus=rows['EB_Rate'] - rows['Cred_Lower'],
+            thickness=1.5,
+            width=4
+        ),
+        customdata=rows[['Divorces', 'Marriages']],
+        hovertemplate='<b>%{y}</b><br>Tasoitettu: %{x:.1f}%<br>'
+                      'Avioerot / avioliitot: %{customdata[0]} / %{customdata[1]}<extra></extra>'
+    ))
+
+    fig.add_trace(go.Scatter(
+        y=rows['Region_Label'],
+        x=rows['Rate'],
+        mode='markers',
+        name='Havaittu eroaste',
+        marker=dict(color='black', symbol='line-ns-open', size=12)
+    ))
+
+    fig.update_layout(
+        xaxis_title="Eroaste (%)",
+        yaxis_title="",
+        height=max(300, 22 * len(rows) + 120),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=10, r=10, t=40, b=40)
+    )
+    return fig
+
+
+FIGURES = {
+    'fig_simple': simple_comparison,
+    'fig1': cumulative_rates,
+    'fig1_trend': cumulative_trends,
+    'fig2': yearly_marriages,
+    'fig3': yearly_divorces,
+    'fig_ci': confidence_intervals,
+    'fig_bayes': posterior,
+}
+
+# Figures whose traces are yearly series, one frame column per trace (in
+# trace order): when a dataset only appends years their cached specs are
+# extended with the new points instead of rebuilt
+YEARLY_SERIES = {
+    'fig1': ['Rate_Male', 'Rate_Female', 'Rate_SameSex', 'Rate_Opposite'],
+    'fig2': ['Marriages_Male', 'Marriages_Female'],
+    'fig3': ['Divorces_Male', 'Divorces_Female'],
+}
+
+_specs = {}
+
+
+def cache_key(name, version, options=None):
+    """Key of one figure spec: figure name, dataset version and display options"""
+    options_hash = hashlib.sha256(
+        json.dumps(options or {}, sort_keys=True).encode('utf-8')
+    ).hexdigest()[:8]
+    return f'{name}-{version}-{options_hash}'
+
+
+def figure_json(name, analysis, options=None, cache_dir=None):
+    """
+    Plotly JSON for figure `name`, built at most once per cache key
+    `options` are applied with update_layout (e.g. {'height': 600}).
+    """
+    key = cache_key(name, analysis.version, options)
+    spec = _specs.get(key)
+    if spec is not None:
+        return spec
+
+    cache_dir = cache_dir or FIGURE_CACHE_DIR
+    path = Path(cache_dir) / f'{key}.json' if cache_dir else None
+    if path is not None and path.exists():
+        spec = path.read_text(encoding='utf-8')
+    else:
+        fig = FIGURES[name](analysis)
+        if options:
+            fig.update_layout(**options)
+        spec = fig.to_json()
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.json.tmp')
+            tmp.write_text(spec, encoding='utf-8')
+            os.replace(tmp, path)
+
+    _specs[key] = spec
+    return spec
+
+
+def figure_spec(name, analysis, options=None, cache_dir=None):
+    """Figure as a plain dict, ready for st.plotly_chart (fresh copy per call)"""
+    return json.loads(figure_json(name, analysis, options, cache_dir))
+
+
+def clear(version=None):
+    """Drop cached specs from memory, for one dataset version or all"""
+    for key in list(_specs):
+        if version is None or f'-{version}-' in key:
+            del _specs[key]
+
+
+def extend_spec(name, spec, previous, analysis):
+    """
+    Plotly JSON of yearly-series figure `name` for `analysis`, from its `spec`
+    for `previous` (an analysis of the first years of the same dataset)
+    """
+    tail = analysis.df.iloc[len(previous.df):]
+    fig = json.loads(spec)
+    for trace, column in zip(fig['data'], YEARLY_SERIES[name]):
+        trace['x'].extend(tail['Year'].tolist())
+        trace['y'].extend(tail[column].tolist())
+    return json.dumps(fig)
+
+
+def extend(previous, analysis):
+    """
+    Carry the cached yearly-series specs of `previous` over to `analysis`
+    (see extend_spec); returns the new cache keys. The other figures depend on
+    the totals only and are rebuilt on first use.
+    """
+    added = []
+    for key, spec in list(_specs.items()):
+        name, version, options_hash = key.rsplit('-', 2)
+        if version != previous.version or name not in YEARLY_SERIES:
+            continue
+        new_key = f'{name}-{analysis.version}-{options_hash}'
+        if new_key not in _specs:
+            _specs[new_key] = extend_spec(name, spec, previous, analysis)
+            added.append(new_key)
+    return added
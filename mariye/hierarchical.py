@@ -0,0 +1,149 @@
+"""
+Hierarchical beta-binomial model for yearly divorce ratios
+
+The fixed Beta(1, 1) prior of mariye.intervals.bayesian_estimate treats every
+year and group on its own, so the estimate for a year with 1 divorce in 181
+marriages rests on those two numbers alone. Here the yearly rates of each
+group are modelled as draws from a common Beta distribution:
+
+    divorces[t, g] ~ Binomial(marriages[t, g], p[t, g])
+    p[t, g]        ~ Beta(mean[g] * concentration[g], (1 - mean[g]) * concentration[g])
+
+Each group has its own mean and its own concentration (how similar its years
+are). A concentration shared across groups would be set by the opposite-sex
+ratios, which drift far more between years than their large counts allow,
+and would leave the small same-sex years almost unpooled. (On the bundled
+counts the same-sex concentrations are small too: their yearly ratios rise
+as the marriages since 2017 age, so the years genuinely differ.) The
+hyperparameters maximize the beta-binomial marginal likelihood (L-BFGS-B
+with analytic gradients over the whole (years x groups) array, started from
+the method-of-moments estimate); each yearly estimate is then the conjugate
+posterior under the fitted prior.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from mariye.cohort import cohort_table
+from mariye.intervals import bayesian_estimate, beta_prior_moments
+
+# Same-sex groups separately; SameSex is their sum and would be counted twice
+DEFAULT_GROUPS = ('Male', 'Female', 'Opposite')
+
+# Bounds of each group's concentration (prior sample size)
+MIN_CONCENTRATION = 1e-2
+MAX_CONCENTRATION = 1e7
+
+
+def marginal_loglik(alpha, beta, successes, trials):
+    """
+    Beta-binomial log marginal likelihood of every cell (binomial coefficient
+    omitted, it does not depend on the prior); arguments broadcast
+    """
+    return (special.betaln(alpha + successes, beta + trials - successes)
+            - special.betaln(alpha, beta))
+
+
+def _objective(params, successes, trials):
+    # params = (logit mean per group, log concentration per group); negative
+    # log likelihood and gradient
+    mean, concentration = special.expit(params[:trials.shape[1]]), np.exp(params[trials.shape[1]:])
+    alpha = mean * concentration
+    beta = (1 - mean) * concentration
+
+    loglik = marginal_loglik(alpha, beta, successes, trials).sum()
+    total = special.digamma(alpha + beta) - special.digamma(alpha + beta + trials)
+    d_alpha = special.digamma(alpha + successes) - special.digamma(alpha) + total
+    d_beta = special.digamma(beta + trials - successes) - special.digamma(beta) + total
+    d_logit = (concentration * mean * (1 - mean) * (d_alpha - d_beta)).sum(axis=0)
+    d_log_concentration = (alpha * d_alpha + beta * d_beta).sum(axis=0)
+    return -loglik, -np.append(d_logit, d_log_concentration)
+
+
+def fit_hyperparameters(successes, trials):
+    """
+    Maximum marginal likelihood (mean and concentration per column) for a
+    (cells x groups) array of counts; returns (mean, concentration, loglik)
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    if (successes > trials).any() or (successes < 0).any():
+        raise ValueError('counts must satisfy 0 <= successes <= trials')
+
+    # Start: the method-of-moments prior of each group
+    alpha0, beta0 = beta_prior_moments(successes, trials, axis=0, max_concentration=MAX_CONCENTRATION)
+    mean0 = np.clip(alpha0 / (alpha0 + beta0), 1e-6, 1 - 1e-6)
+    concentration0 = np.clip(alpha0 + beta0, MIN_CONCENTRATION, MAX_CONCENTRATION)
+    start = np.append(special.logit(mean0), np.log(concentration0))
+
+    # Only fitting needs scipy.optimize; it is imported here to keep startup light
+    from scipy import optimize
+
+    bounds = ([(-20, 20)] * len(mean0)
+              + [(np.log(MIN_CONCENTRATION), np.log(MAX_CONCENTRATION))] * len(mean0))
+    result = optimize.minimize(_objective, start, args=(successes, trials), jac=True,
+                               method='L-BFGS-B', bounds=bounds)
+    return (special.expit(result.x[:len(mean0)]), np.exp(result.x[len(mean0):]),
+            float(-result.fun))
+
+
+@dataclass(frozen=True)
+class HierarchicalFit:
+    """Fitted prior and shrunken yearly estimates (percent), one row per year x group"""
+    version: str
+    groups: tuple
+    mean: dict
+    concentration: dict
+    loglik: float
+    table: pd.DataFrame = field(repr=False)
+
+    def group(self, key):
+        """Yearly rows of one group"""
+        return self.table[self.table['Group'] == key].reset_index(drop=True)
+
+
+def fit_yearly(analysis, groups=DEFAULT_GROUPS, level=0.95):
+    """
+    Hierarchical fit to the same-year ratios (divorces / marriages of the
+    year, as in mariye.cohort.cohort_table) of `groups`
+    Table columns: Year, Group, Marriages, Divorces, Rate, CI_Lower, CI_Upper
+    (Wilson), EB_Rate, Cred_Lower, Cred_Upper and Weight, the share of the
+    estimate coming from the year's own data: n / (n + the group's concentration).
+    """
+    groups = tuple(groups)
+    table = cohort_table(analysis.df, groups=groups)
+    shape = (len(analysis.df), len(groups))
+    marriages = table['Marriages'].to_numpy(dtype=np.float64).reshape(shape)
+    divorces = table['Divorces'].to_numpy(dtype=np.float64).reshape(shape)
+
+    mean, concentration, loglik = fit_hyperparameters(divorces, marriages)
+    eb_rate, cred_lower, cred_upper, _, _ = bayesian_estimate(
+        divorces, marriages, mean * concentration, (1 - mean) * concentration, level=level
+    )
+    table['EB_Rate'] = eb_rate.ravel() * 100
+    table['Cred_Lower'] = cred_lower.ravel() * 100
+    table['Cred_Upper'] = cred_upper.ravel() * 100
+    table['Weight'] = (marriages / (marriages + concentration)).ravel()
+    return HierarchicalFit(analysis.version, groups, dict(zip(groups, mean.tolist())),
+                           dict(zip(groups, concentration.tolist())), loglik, table)
+
+
+_fits = {}
+
+
+def load_fit(analysis, groups=DEFAULT_GROUPS, level=0.95):
+    """fit_yearly(), memoized per dataset version and settings"""
+    key = (analysis.version, tuple(groups), level)
+    if key not in _fits:
+        _fits[key] = fit_yearly(analysis, groups, level)
+    return _fits[key]
+
+
+def clear(version=None):
+    """Drop memoized fits from memory, for one dataset version or all"""
+    for key in list(_fits):
+        if version is None or key[0] == version:
+            del _fits[key]
@@ -0,0 +1,123 @@
+"""
+Vectorized interval estimates for (successes, trials) cells
+
+Both functions accept scalars or arrays of any (broadcastable) shape, e.g.
+one cell per region x age band x year, and compute every interval in a
+single NumPy call. Scalar inputs give scalar outputs.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+
+def _z(confidence):
+    # Two-sided normal quantile, e.g. 1.96 for 95%
+    return -special.ndtri((1 - confidence) / 2)
+
+
+def wilson_score_interval(successes, trials, confidence=0.95):
+    """
+    Wilson score interval - better for proportions than normal approximation
+    Especially for small samples or extreme proportions
+    Returns: (p, lower, upper); cells with zero trials give (0, 0, 0)
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    z = _z(confidence)
+
+    empty = trials == 0
+    n = np.where(empty, 1.0, trials)
+    p = successes / n
+    denominator = 1 + z**2 / n
+    center = (p + z**2 / (2 * n)) / denominator
+    margin = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denominator
+
+    p = np.where(empty, 0.0, p)
+    lower = np.where(empty, 0.0, np.maximum(0, center - margin))
+    upper = np.where(empty, 0.0, np.minimum(1, center + margin))
+    return p[()], lower[()], upper[()]
+
+
+def bayesian_estimate(successes, trials, prior_alpha=1, prior_beta=1, level=0.95):
+    """
+    Bayesian estimate with Beta prior
+    Returns: posterior mean, credible interval (equal-tailed), posterior parameters
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+
+    posterior_alpha = prior_alpha + successes
+    posterior_beta = prior_beta + (trials - successes)
+    mean = posterior_alpha / (posterior_alpha + posterior_beta)
+    # betaincinv is the Beta quantile function without scipy.stats overhead
+    tail = (1 - level) / 2
+    ci_lower = special.betaincinv(posterior_alpha, posterior_beta, tail)
+    ci_upper = special.betaincinv(posterior_alpha, posterior_beta, 1 - tail)
+    return mean[()], ci_lower[()], ci_upper[()], posterior_alpha[()], posterior_beta[()]
+
+
+def beta_pdf(x, alpha, beta):
+    """Density of Beta(alpha, beta) at x, broadcasting (scipy.stats.beta.pdf without its import cost)"""
+    x = np.asarray(x, dtype=np.float64)
+    log_pdf = (special.xlogy(alpha - 1, x) + special.xlog1py(beta - 1, -x)
+               - special.betaln(alpha, beta))
+    inside = (x >= 0) & (x <= 1)
+    return np.where(inside, np.exp(log_pdf), 0.0)[()]
+
+
+def beta_prior_moments(successes, trials, axis=0, max_concentration=1e6):
+    """
+    Empirical-Bayes Beta prior estimated from many cells by the method of moments
+    Cells are pooled along `axis` (e.g. regions); returns (alpha, beta) for each
+    remaining index. The between-cell variance is the trials-weighted variance
+    of the observed rates minus its expected binomial part; when the rates vary
+    no more than binomial noise the prior concentration is capped at
+    `max_concentration` (complete pooling). Cells with zero trials are ignored.
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+
+    total = trials.sum(axis=axis, keepdims=True)
+    safe_total = np.where(total == 0, 1.0, total)
+    mean = np.clip(successes.sum(axis=axis, keepdims=True) / safe_total, 1e-9, 1 - 1e-9)
+    weight = trials / safe_total
+    rate = successes / np.where(trials == 0, 1.0, trials)
+    spread = (weight * (rate - mean) ** 2).sum(axis=axis, keepdims=True)
+
+    # E[spread] = mean (1 - mean) (A + B rho), rho = 1 / (concentration + 1)
+    binomial = mean * (1 - mean)
+    a = (weight * (1 - weight) / np.where(trials == 0, 1.0, trials)).sum(axis=axis, keepdims=True)
+    b = (weight * (1 - weight) * (trials - 1) / np.where(trials == 0, 1.0, trials)).sum(axis=axis, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = (spread / binomial - a) / b
+    rho = np.clip(np.nan_to_num(rho, nan=0.0), 1 / (max_concentration + 1), 1 - 1e-9)
+    concentration = 1 / rho - 1
+
+    alpha = np.squeeze(mean * concentration, axis=axis)
+    beta = np.squeeze((1 - mean) * concentration, axis=axis)
+    return alpha[()], beta[()]
+
+
+def interval_frame(successes, trials, confidence=0.95, prior_alpha=1, prior_beta=1):
+    """
+    Wilson and Beta-posterior intervals for many cells as one flat table
+    Columns: successes, trials, rate, ci_lower, ci_upper, posterior_mean,
+    cred_lower, cred_upper (proportions, not percent)
+    """
+    successes = np.ravel(successes)
+    trials = np.ravel(trials)
+    rate, ci_lower, ci_upper = wilson_score_interval(successes, trials, confidence)
+    mean, cred_lower, cred_upper, _, _ = bayesian_estimate(
+        successes, trials, prior_alpha, prior_beta, level=confidence
+    )
+    return pd.DataFrame({
+        'successes': successes,
+        'trials': trials,
+        'rate': rate,
+        'ci_lower': ci_lower,
+        'ci_upper': ci_upper,
+        'posterior_mean': mean,
+        'cred_lower': cred_lower,
+        'cred_upper': cred_upper,
+    })
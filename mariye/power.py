@@ -0,0 +1,237 @@
+"""
+Exact power and sample-size planning for comparing two divorce rates
+
+Power of the two-sided Fisher exact test, computed by enumeration instead of
+a normal approximation:
+
+- given the margin t = x1 + x2, x1 is hypergeometric and its probabilities
+  rise and then fall, so the test accepts an interval low[t] <= x1 <= high[t]
+  and rejects both tails. The intervals are found one block of margins at a
+  time, only within a window around the conditional mean (cells outside it
+  have probability below WINDOW_EPS and are always rejected); memory is
+  O(n1 + n2) instead of a dense (n1 + n2 + 1) x (n1 + 1) table.
+- power(p1, p2) = 1 - the probability of the accepted outcomes, i.e.
+  1 - b1 @ A @ b2 with A the sparse indicator of the intervals (a few
+  standard deviations wide per margin), so a whole (p1 x p2) grid is two
+  matrix products.
+
+Acceptance intervals are cached per (n1, n2, alpha), which makes repeated
+queries (a slider moving over p, a power curve redrawn) nearly free.
+sample_size and power_curve switch to the normal approximation of the test
+above EXACT_MAX_N (n1 + n2), where the two agree to within half a percentage
+point and exact enumeration stops being interactive.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, special
+
+# Same "as or less likely" tolerance and log-factorial table as fisher_test
+from mariye.significance import _RTOL, log_factorial
+
+# Probability mass left outside the window around the conditional mean
+WINDOW_EPS = 1e-12
+
+# Hypergeometric cells (margins x window) evaluated per block
+BLOCK_CELLS = 1 << 20
+
+# Largest n1 + n2 planned with the exact test; beyond it the normal approximation
+EXACT_MAX_N = 6_000
+
+# Cached acceptance intervals: O(n1 + n2) integers each
+CACHE_SIZE = 64
+
+
+def _log_binomial(n):
+    # log C(n, k) for k = 0..n
+    k = np.arange(n + 1)
+    return log_factorial(n) - log_factorial(k) - log_factorial(n - k)
+
+
+def _accepted_cut(pmf, alpha):
+    # Smallest probability the test accepts, per row (inf: rejects all).
+    # A cell's two-sided p-value is the sum of the probabilities in the row
+    # not larger than its own: in a sorted row, the cumulative sum at the end
+    # of its run of (relatively) equal values. That grows along the row, so
+    # the rejected cells are a prefix ending at a run end.
+    ranked = np.sort(pmf, axis=1)
+    cumulative = np.cumsum(ranked, axis=1)
+    run_end = np.ones_like(ranked, dtype=bool)
+    run_end[:, :-1] = ranked[:, 1:] > ranked[:, :-1] * _RTOL
+    rejected = run_end & (cumulative <= alpha * _RTOL)
+    prefix = np.where(rejected, np.arange(pmf.shape[1]), -1).max(axis=1) + 1
+    padded = np.hstack([ranked, np.full((len(ranked), 1), np.inf)])
+    return padded[np.arange(len(ranked)), prefix]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _acceptance(n1, n2, alpha):
+    # (low, high) per margin t = 0..n1 + n2: the test accepts low <= x1 <= high
+    # (low = high + 1 when it rejects every table with that margin)
+    total = n1 + n2
+    t = np.arange(total + 1)
+    first = np.maximum(0, t - n2)
+    last = np.minimum(n1, t)
+
+    # Serfling: P(|x1 - mean| >= d) <= 2 exp(-2 d^2 / (m (1 - (m - 1) / N)))
+    # for m draws out of N, here of either margin and either group
+    draws = np.minimum(np.minimum(t, total - t), min(n1, n2))
+    spread = draws * (1 - (draws - 1) / max(total, 1))
+    half = np.ceil(np.sqrt(spread * np.log(2 / WINDOW_EPS) / 2)).astype(np.int64) + 1
+    mean = np.round(t * (n1 / max(total, 1))).astype(np.int64)
+    start = np.maximum(first, mean - half)
+    stop = np.minimum(last, mean + half)
+    width = int((stop - start).max()) + 1
+
+    log_b1, log_b2, log_bt = _log_binomial(n1), _log_binomial(n2), _log_binomial(total)
+    low = last + 1
+    high = last.copy()
+    rows = max(1, BLOCK_CELLS // width)
+    for begin in range(0, total + 1, rows):
+        block = slice(begin, begin + rows)
+        x1 = start[block, None] + np.arange(width)[None, :]
+        valid = x1 <= stop[block, None]
+        x1 = np.minimum(x1, stop[block, None])
+        margin = t[block, None]
+        log_pmf = log_b1[x1] + log_b2[margin - x1] - log_bt[margin]
+        pmf = np.exp(np.where(valid, log_pmf, -np.inf))
+
+        accept = (pmf >= _accepted_cut(pmf, alpha)[:, None]) & valid
+        found = accept.any(axis=1)
+        first_in = start[block] + accept.argmax(axis=1)
+        last_in = start[block] + width - 1 - accept[:, ::-1].argmax(axis=1)
+        low[block] = np.where(found, first_in, low[block])
+        high[block] = np.where(found, last_in, high[block])
+    low.flags.writeable = high.flags.writeable = False
+    return low, high
+
+
+def _accepted(n1, n2, alpha):
+    # Sparse (n1 + 1, n2 + 1) indicator of the outcomes the test accepts
+    low, high = _acceptance(n1, n2, alpha)
+    counts = np.maximum(high - low + 1, 0)
+    offsets = np.cumsum(counts) - counts
+    x1 = np.repeat(low, counts) + np.arange(counts.sum()) - np.repeat(offsets, counts)
+    x2 = np.repeat(np.arange(n1 + n2 + 1), counts) - x1
+    return sparse.csr_array((np.ones(len(x1)), (x1, x2)), shape=(n1 + 1, n2 + 1))
+
+
+def rejection_region(n1, n2, alpha=0.05):
+    """
+    Boolean (n1 + 1, n2 + 1) array: True where the two-sided Fisher exact
+    test of x1/n1 vs x2/n2 rejects at level alpha (built on every call)
+    """
+    return _accepted(int(n1), int(n2), float(alpha)).toarray() == 0
+
+
+def _binomial_pmf(n, p):
+    # (len(p), n + 1) matrix of Binomial(n, p) probabilities
+    k = np.arange(n + 1)[None, :]
+    p = np.atleast_1d(p)[:, None]
+    return np.exp(_log_binomial(n)[None, :] + special.xlogy(k, p) + special.xlog1py(n - k, -p))
+
+
+def power_grid(n1, n2, p1, p2, alpha=0.05):
+    """Exact power for every combination of p1 (rows) and p2 (columns)"""
+    n1, n2 = int(n1), int(n2)
+    accepted = _accepted(n1, n2, float(alpha))
+    return 1 - (accepted.T @ _binomial_pmf(n1, p1).T).T @ _binomial_pmf(n2, p2).T
+
+
+def exact_power(n1, n2, p1, p2, alpha=0.05):
+    """
+    Exact power of the two-sided Fisher test for true rates p1, p2
+    p1 and p2 broadcast against each other; scalars give a scalar.
+    """
+    n1, n2 = int(n1), int(n2)
+    p1, p2 = np.broadcast_arrays(np.asarray(p1, dtype=np.float64), np.asarray(p2, dtype=np.float64))
+    accepted = _accepted(n1, n2, float(alpha))
+    b1 = _binomial_pmf(n1, p1.ravel())
+    b2 = _binomial_pmf(n2, p2.ravel())
+    power = 1 - ((accepted.T @ b1.T).T * b2).sum(axis=1)
+    return power.reshape(p1.shape)[()]
+
+
+def normal_power(n1, n2, p1, p2, alpha=0.05):
+    """
+    Power of the two-sided two-proportion z-test (pooled variance under H0),
+    the large-sample approximation of exact_power; broadcasts like it
+    """
+    p1, p2 = np.broadcast_arrays(np.asarray(p1, dtype=np.float64), np.asarray(p2, dtype=np.float64))
+    pooled = (n1 * p1 + n2 * p2) / (n1 + n2)
+    null_se = np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+    se = np.sqrt(p1 * (1 - p1) / n1 + p2 * (1 - p2) / n2)
+    critical = special.ndtri(1 - alpha / 2) * null_se
+    difference = np.abs(p1 - p2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        power = special.ndtr((difference - critical) / se) + special.ndtr((-difference - critical) / se)
+    return np.where(se > 0, power, (difference > critical).astype(np.float64))[()]
+
+
+def planning_power(n1, n2, p1, p2, alpha=0.05):
+    """exact_power up to EXACT_MAX_N outcomes (n1 + n2), normal_power above"""
+    if n1 + n2 <= EXACT_MAX_N:
+        return exact_power(n1, n2, p1, p2, alpha)
+    return normal_power(n1, n2, p1, p2, alpha)
+
+
+@lru_cache(maxsize=256)
+def _power_curve(sizes, ratio, p1, p2, alpha):
+    n2 = [max(1, round(n * ratio)) for n in sizes]
+    power = [float(planning_power(n, m, p1, p2, alpha)) for n, m in zip(sizes, n2)]
+    return pd.DataFrame({'n1': sizes, 'n2': n2, 'Power': power})
+
+
+def power_curve(sizes, p1, p2, ratio=1.0, alpha=0.05):
+    """
+    Power (planning_power) for each group-1 sample size in `sizes`, with
+    n2 = ratio * n1. Returns a frame with columns n1, n2, Power (cached per
+    argument set).
+    """
+    return _power_curve(tuple(int(n) for n in sizes), float(ratio), float(p1), float(p2), float(alpha)).copy()
+
+
+def normal_sample_size(p1, p2, ratio=1.0, power=0.8, alpha=0.05):
+    """n1 (with n2 = ratio * n1, not rounded) at which normal_power reaches `power`"""
+    pooled = (p1 + ratio * p2) / (1 + ratio)
+    null_sd = np.sqrt(pooled * (1 - pooled) * (1 + 1 / ratio))
+    sd = np.sqrt(p1 * (1 - p1) + p2 * (1 - p2) / ratio)
+    z = special.ndtri(1 - alpha / 2) * null_sd + special.ndtri(power) * sd
+    return float(z ** 2 / (p1 - p2) ** 2) if p1 != p2 else np.inf
+
+
+def sample_size(p1, p2, ratio=1.0, power=0.8, alpha=0.05, max_n=10_000):
+    """
+    Smallest n1 (with n2 = ratio * n1) whose power (planning_power) reaches
+    `power`. Found by galloping out from normal_sample_size and bisection;
+    exact power is not strictly monotone in n (it zigzags by a few tenths of
+    a percent), so this is the first crossing of the target along that
+    search. Returns None above max_n.
+    """
+    def reaches(n):
+        return planning_power(n, max(1, round(n * ratio)), p1, p2, alpha) >= power
+
+    # n = 0 never reaches the target; steps start at about 3% of the guess
+    guess = int(min(max(normal_sample_size(p1, p2, ratio, power, alpha), 1), max_n))
+    step = max(1, guess // 32)
+    if reaches(guess):
+        high, low = guess, max(guess - step, 0)
+        while low > 0 and reaches(low):
+            high, step = low, 2 * step
+            low = max(high - step, 0)
+    else:
+        low, high = guess, min(guess + step, max_n)
+        while not reaches(high):
+            if high >= max_n:
+                return None
+            low, step = high, 2 * step
+            high = min(low + step, max_n)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if reaches(middle):
+            high = middle
+        else:
+            low = middle
+    return high
@@ -0,0 +1,382 @@
+"""
+PxWeb ingestion client for Statistics Finland with a local on-disk cache
+
+Tables are fetched with a POST query (see api.md). json-stat2 responses are
+parsed into a Cube (mariye.cube: one uint16/int32 array indexed by the
+dimension categories) and stored as .npy files; later loads memory-map them
+(open_cube), so app workers and the CLIs opening the same table share one
+copy in the OS page cache and a multi-million-cell table opens in
+milliseconds. CSV responses are stored as Parquet. A small JSON sidecar holds
+the labels and freshness metadata. The network is only touched when the
+cached copy is older than `max_age`, and even then the request is
+conditional (If-None-Match / If-Modified-Since).
+
+The API root can be overridden with MARIYE_PXWEB_URL (e.g. a local fake
+server) and the cache location with MARIYE_CACHE_DIR.
+"""
+
+import hashlib
+import io
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mariye.cube import Cube, compact, from_long
+from mariye.data import DATA
+
+API_URL = os.environ.get('MARIYE_PXWEB_URL', 'https://pxdata.stat.fi/PXWeb/api/v1/fi/StatFin')
+CACHE_DIR = Path(os.environ.get('MARIYE_CACHE_DIR', Path(__file__).resolve().parent.parent / '.cache' / 'pxweb'))
+
+# Siviilisäädyn muutokset (changes in marital status), 1990-2024
+TABLE = 'statfin_ssaaty_pxt_121e.px'
+FIRST_YEAR = 2017  # same-sex marriage legalized in March 2017
+
+DEFAULT_MAX_AGE = 24 * 3600
+TIMEOUT = 10
+
+# Keywords identifying each series among the labels of the table's content
+# dimension. All keywords of a rule must appear in the (lower-cased) label.
+SERIES_KEYWORDS = {
+    'Marriages_Opposite': ('vihit', 'eri sukupuol'),
+    'Divorces_Opposite': ('avioero', 'eri sukupuol'),
+    'Marriages_Male': ('vihit', 'mies'),
+    'Marriages_Female': ('vihit', 'nais'),
+    'Divorces_Male': ('avioero', 'mies'),
+    'Divorces_Female': ('avioero', 'nais'),
+}
+
+
+class PxWebError(RuntimeError):
+    """Raised when a table cannot be fetched or parsed"""
+
+
+def _query_key(table, query):
+    payload = json.dumps({'table': table, 'query': query or []}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+
+def _cache_paths(table, query, cache_dir):
+    stem = f"{table.replace('.px', '')}-{_query_key(table, query)}"
+    return cache_dir / f'{stem}.parquet', cache_dir / f'{stem}.json'
+
+
+def fetch_table(table, query=None, fmt='json-stat2', etag=None, last_modified=None,
+                api_url=None):
+    """
+    POST a PxWeb query and return (status, body bytes, response headers)
+    Status 304 means the cached copy identified by etag/last_modified is current
+    """
+    url = f"{(api_url or API_URL).rstrip('/')}/{table}"
+    body = json.dumps({'query': query or [], 'response': {'format': fmt}}).encode('utf-8')
+    request = urllib.request.Request(url, data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    if etag:
+        request.add_header('If-None-Match', etag)
+    if last_modified:
+        request.add_header('If-Modified-Since', last_modified)
+
+    try:
+        with urllib.request.urlopen(request, timeout=TIMEOUT) as response:
+            return response.status, response.read(), dict(response.headers)
+    except urllib.error.HTTPError as exc:
+        if exc.code == 304:
+            return 304, b'', dict(exc.headers)
+        # 403: over the 100 000 cell limit, 404: bad query or table name
+        raise PxWebError(f'PxWeb returned {exc.code} for {url}') from exc
+    except (urllib.error.URLError, TimeoutError, OSError) as exc:
+        raise PxWebError(f'PxWeb request failed for {url}: {exc}') from exc
+
+
+def parse_cube(payload):
+    """Cube (mariye.cube) of a json-stat2 dataset, without a long intermediate frame"""
+    if isinstance(payload, (bytes, str)):
+        payload = json.loads(payload)
+
+    dims = payload['id']
+    sizes = payload['size']
+    labels = {}
+    codes = {}
+    for dim in dims:
+        category = payload['dimension'][dim]['category']
+        index = category['index']
+        if isinstance(index, list):
+            ordered = index
+        else:
+            ordered = sorted(index, key=index.get)
+        codes[dim] = tuple(ordered)
+        labels[dim] = {code: category.get('label', {}).get(code, code) for code in ordered}
+
+    shape = tuple(len(codes[dim]) for dim in dims)
+    values = payload['value']
+    if isinstance(values, dict):
+        # Sparse form: {"flat index": value}
+        dense = np.full(int(np.prod(shape)), np.nan)
+        for position, value in values.items():
+            dense[int(position)] = np.nan if value is None else value
+        values = dense
+    else:
+        try:
+            # null -> NaN without an object array in between
+            values = np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            values = pd.to_numeric(pd.Series(values, dtype='object'), errors='coerce').to_numpy(
+                dtype=np.float64, na_value=np.nan)
+    if len(values) != int(np.prod(shape)) or list(sizes) != list(shape):
+        raise PxWebError('json-stat2 value count does not match dimension sizes')
+
+    values, missing = compact(values.reshape(shape))
+    return Cube(tuple(dims), codes, labels, values, missing)
+
+
+def parse_json_stat2(payload):
+    """
+    Flatten a json-stat2 dataset into a long frame
+    One categorical column per dimension (category codes) plus 'value' in the
+    smallest integer type (see mariye.cube.compact); returns (frame, labels)
+    where labels maps dimension -> {code: label}
+    """
+    cube = parse_cube(payload)
+    return cube.to_long(), cube.labels
+
+
+def parse_csv(payload):
+    """Read a PxWeb CSV response (comma separated, first row = header)"""
+    if isinstance(payload, bytes):
+        payload = payload.decode('utf-8-sig')
+    return pd.read_csv(io.StringIO(payload)), {}
+
+
+def _read_meta(meta_path):
+    try:
+        return json.loads(meta_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp = meta_path.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps(meta, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.replace(tmp, meta_path)
+
+
+def _write_cube(cube, data_path, content_hash):
+    # values (and the missing mask) as .npy files named after the content, so
+    # a reader that still maps the previous version keeps a valid file
+    stem = f'{data_path.stem}-{content_hash[:12]}'
+    files = {'values': f'{stem}.npy',
+             'missing': f'{stem}.missing.npy' if cube.missing is not None else None}
+    for key, array in [('values', cube.values), ('missing', cube.missing)]:
+        if array is None:
+            continue
+        tmp = data_path.with_name(files[key] + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array))
+        os.replace(tmp, data_path.with_name(files[key]))
+    return {'dims': list(cube.dims), 'shape': list(cube.shape), 'dtype': str(cube.values.dtype), **files}
+
+
+def _remove_stale(data_path, keep):
+    # Earlier versions of the same table; open memory maps stay valid on POSIX
+    for path in data_path.parent.glob(f'{data_path.stem}-*.npy'):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+
+
+def open_cube(meta, cache_dir=None, mmap=True):
+    """
+    Cube of a table cached as .npy files (meta from load_table)
+    With mmap=True the arrays are memory-mapped read-only: opening takes
+    milliseconds, and processes opening the same table share one copy in the
+    OS page cache.
+    """
+    info = meta['cube']
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    mode = 'r' if mmap else None
+    values = np.load(cache_dir / info['values'], mmap_mode=mode)
+    missing = np.load(cache_dir / info['missing'], mmap_mode=mode) if info.get('missing') else None
+    if list(values.shape) != info['shape']:
+        raise PxWebError(f"{info['values']} does not match its metadata")
+    dims = tuple(info['dims'])
+    codes = {dim: tuple(meta['labels'][dim]) for dim in dims}
+    return Cube(dims, codes, meta['labels'], values, missing)
+
+
+def _cached(data_path, meta, cache_dir, mmap=True):
+    # Cached data of `meta`: a Cube (.npy files) or a frame (Parquet); None if gone
+    if meta is None:
+        return None
+    if 'cube' in meta:
+        files = [meta['cube']['values'], meta['cube'].get('missing')]
+        if all((cache_dir / name).exists() for name in files if name):
+            return open_cube(meta, cache_dir, mmap)
+        return None
+    return pd.read_parquet(data_path) if data_path.exists() else None
+
+
+def _load(table, query, fmt, max_age, refresh, offline, cache_dir, api_url, mmap=True):
+    # (Cube or frame, meta) through the cache, see load_table
+    cache_dir = Path(cache_dir or CACHE_DIR)
+    data_path, meta_path = _cache_paths(table, query, cache_dir)
+    meta = _read_meta(meta_path)
+    cached = _cached(data_path, meta, cache_dir, mmap)
+    if cached is None:
+        meta = None
+
+    if meta is not None and (offline or (not refresh and time.time() - meta['checked_at'] < max_age)):
+        return cached, meta
+    if offline:
+        raise PxWebError(f'{table} is not cached in {cache_dir}')
+
+    try:
+        status, body, headers = fetch_table(
+            table, query, fmt,
+            etag=meta and meta.get('etag'),
+            last_modified=meta and meta.get('last_modified'),
+            api_url=api_url
+        )
+    except PxWebError as exc:
+        if meta is None:
+            raise
+        # A stale copy is better than nothing
+        warnings.warn(f'Using cached {table}: {exc}', stacklevel=3)
+        return cached, meta
+    if status == 304:
+        meta['checked_at'] = time.time()
+        _write_meta(meta_path, meta)
+        return cached, meta
+
+    content_hash = hashlib.sha256(body).hexdigest()
+    if meta is not None and meta.get('content_hash') == content_hash:
+        # Server ignored the conditional headers but nothing changed
+        meta.update(checked_at=time.time(), etag=headers.get('ETag', meta.get('etag')))
+        _write_meta(meta_path, meta)
+        return cached, meta
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    meta = {
+        'table': table,
+        'query': query or [],
+        'format': fmt,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+        'content_hash': content_hash,
+        'fetched_at': time.time(),
+        'checked_at': time.time(),
+    }
+    if fmt == 'json-stat2':
+        payload = json.loads(body)
+        data = parse_cube(payload)
+        meta.update(labels=data.labels, updated=payload.get('updated'),
+                    cube=_write_cube(data, data_path, content_hash))
+        _write_meta(meta_path, meta)
+        _remove_stale(data_path, {meta['cube']['values'], meta['cube']['missing']})
+        data_path.unlink(missing_ok=True)
+        if mmap:
+            data = open_cube(meta, cache_dir)
+    else:
+        data, labels = parse_csv(body)
+        tmp = data_path.with_suffix('.parquet.tmp')
+        data.to_parquet(tmp, index=False)
+        os.replace(tmp, data_path)
+        meta.update(labels=labels, updated=None)
+        _write_meta(meta_path, meta)
+    return data, meta
+
+
+def load_table(table=TABLE, query=None, fmt='json-stat2', max_age=DEFAULT_MAX_AGE,
+               refresh=False, offline=False, cache_dir=None, api_url=None):
+    """
+    Load a PxWeb table through the on-disk cache
+    Returns (frame, meta), the frame in the long layout of parse_json_stat2.
+    The network is skipped while the cached copy is younger than `max_age`
+    seconds (or always when offline=True); `refresh` forces a conditional
+    request regardless of age.
+    """
+    data, meta = _load(table, query, fmt, max_age, refresh, offline, cache_dir, api_url)
+    return (data.to_long() if isinstance(data, Cube) else data), meta
+
+
+def load_cube(table=TABLE, query=None, fmt='json-stat2', max_age=DEFAULT_MAX_AGE,
+              refresh=False, offline=False, cache_dir=None, api_url=None, mmap=True):
+    """
+    load_table() as (Cube, meta) without building a frame
+    json-stat2 tables are cached as .npy files and memory-mapped (see
+    open_cube); copies cached by earlier versions as Parquet are converted.
+    """
+    data, meta = _load(table, query, fmt, max_age, refresh, offline, cache_dir, api_url, mmap)
+    return (data if isinstance(data, Cube) else from_long(data, meta['labels'])), meta
+
+
+def _find_dimension(labels, keyword):
+    for dim in labels:
+        if keyword in dim.lower():
+            return dim
+    return None
+
+
+def match_series(columns):
+    """Column of `columns` (lower-cased content labels) for each of SERIES_KEYWORDS"""
+    series = {}
+    for column, keywords in SERIES_KEYWORDS.items():
+        matches = [label for label in columns if all(k in label for k in keywords)]
+        if len(matches) != 1:
+            raise PxWebError(f'expected one series for {column}, found {matches}')
+        series[column] = matches[0]
+    return series
+
+
+def to_dataset(frame, meta, first_year=FIRST_YEAR):
+    """
+    Convert the long 121e frame (or its Cube) into the `data` dict layout
+    used by the scripts (Year + Marriages_*/Divorces_* lists, see
+    mariye.data.DATA)
+    """
+    labels = meta['labels']
+    year_dim = _find_dimension(labels, 'vuosi') or _find_dimension(labels, 'year')
+    content_dims = [dim for dim in labels if dim != year_dim]
+    if year_dim is None or not content_dims:
+        raise PxWebError('cannot identify the year and content dimensions')
+
+    # One row per year, one column per combined content label
+    cube = frame if isinstance(frame, Cube) else from_long(frame, labels)
+    cube = cube.take(year_dim, [code for code in cube.codes[year_dim] if int(code) >= first_year])
+    wide = cube.to_wide([year_dim])
+    wide.index = wide.index.astype(int)
+    wide.columns = wide.columns.str.lower()
+    wide = wide.sort_index()
+
+    data = {'Year': wide.index.tolist()}
+    for column, label in match_series(wide.columns).items():
+        data[column] = wide[label].astype(int).tolist()
+    return data
+
+
+def load_dataset(max_age=DEFAULT_MAX_AGE, refresh=False, offline=False, cache_dir=None):
+    """
+    Yearly counts for the analysis, read from the local cache
+    Falls back to the bundled counts (mariye.data.DATA) when the table is
+    neither cached nor reachable.
+    """
+    try:
+        cube, meta = load_cube(max_age=max_age, refresh=refresh, offline=offline,
+                               cache_dir=cache_dir)
+        return to_dataset(cube, meta)
+    except PxWebError as exc:
+        warnings.warn(f'Using bundled data: {exc}', stacklevel=2)
+        return DATA
+
+
+def load_source(source, refresh=False, offline=False):
+    """Dataset dict for a CLI --source: 'pxweb' (cached table), 'bundled' or a JSON file"""
+    if source == 'pxweb':
+        return load_dataset(refresh=refresh, offline=offline)
+    if source == 'bundled':
+        return DATA
+    return json.loads(Path(source).read_text(encoding='utf-8'))
@@ -0,0 +1,199 @@
+"""
+Regional breakdown: divorce rates by region with sparse-cell handling
+
+Statistics Finland publishes marriages and divorces by region (maakunta or
+kunta) in separate StatFin tables; set MARIYE_REGION_TABLE to the table id
+(e.g. statfin_xxxx_pxt_yyyy.px). The table is fetched and cached like the
+national one (mariye.pxweb.load_cube) and reshaped to one row per region
+and year with the same count columns as mariye.data.DATA.
+
+Summed over the years, every (region x couple type) cell gets in one
+vectorized call each:
+- the Wilson interval of the raw rate
+- an empirical-Bayes estimate: a Beta prior per couple type is fitted to all
+  regions by the method of moments (mariye.intervals.beta_prior_moments),
+  so regions with a handful of marriages are pulled towards the national
+  rate instead of showing 0% or 100%
+- per region, Fisher's exact test of female vs male couples in one batch
+  (mariye.significance; identical tables, common among tiny cells, are
+  tested once) with the conditional maximum likelihood odds ratio (R's
+  estimate, less biased than the sample one in small cells) and
+  Benjamini-Hochberg adjusted p-values across regions
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from mariye.core import COUNT_COLUMNS, GROUP_LABELS, GROUPS
+from mariye.cube import Cube, from_long
+from mariye.intervals import bayesian_estimate, beta_prior_moments, wilson_score_interval
+from mariye.pxweb import FIRST_YEAR, PxWebError, _find_dimension, load_cube, match_series
+from mariye.significance import adjust, fisher_test, tables_from_counts
+
+REGION_TABLE = os.environ.get('MARIYE_REGION_TABLE')
+
+# Region codes of whole-country rows in StatFin tables
+WHOLE_COUNTRY = ('SSS',)
+
+
+def to_regional(frame, meta, first_year=FIRST_YEAR):
+    """
+    Convert a long regional PxWeb frame (or its Cube) into one row per region
+    and year: Region (code), Region_Label, Year and the COUNT_COLUMNS
+    """
+    labels = meta['labels']
+    year_dim = _find_dimension(labels, 'vuosi') or _find_dimension(labels, 'year')
+    region_dim = (_find_dimension(labels, 'alue') or _find_dimension(labels, 'kunta')
+                  or _find_dimension(labels, 'region'))
+    content_dims = [dim for dim in labels if dim not in (year_dim, region_dim)]
+    if year_dim is None or region_dim is None or not content_dims:
+        raise PxWebError('cannot identify the year, region and content dimensions')
+
+    cube = frame if isinstance(frame, Cube) else from_long(frame, labels)
+    cube = cube.drop(region_dim, WHOLE_COUNTRY)
+    cube = cube.take(year_dim, [code for code in cube.codes[year_dim] if int(code) >= first_year])
+    wide = cube.to_wide([region_dim, year_dim])
+    wide.columns = wide.columns.str.lower()
+
+    regions = wide.index.get_level_values(0)
+    result = pd.DataFrame({
+        'Region': regions,
+        'Region_Label': regions.map(labels[region_dim]),
+        'Year': wide.index.get_level_values(1).astype(int),
+    })
+    for column, label in match_series(wide.columns).items():
+        result[column] = wide[label].to_numpy(dtype=np.int64)
+    return result
+
+
+def load_regions(table=None, query=None, refresh=False, offline=False, cache_dir=None):
+    """Regional counts (see to_regional) from the local cache or PxWeb"""
+    table = table or REGION_TABLE
+    if not table:
+        raise PxWebError('no regional table configured (set MARIYE_REGION_TABLE)')
+    cube, meta = load_cube(table, query, refresh=refresh, offline=offline, cache_dir=cache_dir)
+    return to_regional(cube, meta)
+
+
+def regions_version(regional):
+    """Content hash of a regional frame, the cache key like mariye.data.dataset_version"""
+    hashed = pd.util.hash_pandas_object(regional, index=False).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+
+
+def _fisher(female_divorces, female_marriages, male_divorces, male_marriages):
+    # Female vs male tables, each distinct table tested once; NaN without both groups
+    tables = tables_from_counts(female_divorces, female_marriages, male_divorces, male_marriages)
+    odds_ratio = np.full(len(tables), np.nan)
+    p_value = np.full(len(tables), np.nan)
+    testable = (female_marriages > 0) & (male_marriages > 0)
+    unique, inverse = np.unique(tables[testable], axis=0, return_inverse=True)
+    unique_odds, unique_p = fisher_test(unique, conditional=True)
+    odds_ratio[testable] = unique_odds[inverse.ravel()]
+    p_value[testable] = unique_p[inverse.ravel()]
+    return odds_ratio, p_value
+
+
+@dataclass(frozen=True)
+class RegionBreakdown:
+    """Per-region rates, shrunken estimates and female vs male tests"""
+    version: str
+    years: tuple
+    # One row per region x couple type
+    rates: pd.DataFrame = field(repr=False)
+    # One row per region: female vs male Fisher test, BH-adjusted across regions
+    tests: pd.DataFrame = field(repr=False)
+    # Empirical-Bayes Beta prior per couple type
+    priors: pd.DataFrame = field(repr=False)
+
+    def group(self, key):
+        """Rates of one couple type, highest shrunken rate first"""
+        rows = self.rates[self.rates['Group'] == key]
+        return rows.sort_values('EB_Rate', ascending=False).reset_index(drop=True)
+
+
+def breakdown(regional, years=None, confidence=0.95):
+    """
+    RegionBreakdown of a regional frame, summed over `years` (default: all)
+    Rates, interval bounds and EB estimates are in percent.
+    """
+    if years is not None:
+        regional = regional[regional['Year'].isin(list(years))]
+    totals = regional.groupby(['Region', 'Region_Label'], sort=True)[list(COUNT_COLUMNS)].sum()
+    totals['Marriages_SameSex'] = totals['Marriages_Male'] + totals['Marriages_Female']
+    totals['Divorces_SameSex'] = totals['Divorces_Male'] + totals['Divorces_Female']
+
+    # (regions x groups) arrays
+    marriages = totals[[f'Marriages_{g}' for g in GROUPS]].to_numpy(dtype=np.int64)
+    divorces = totals[[f'Divorces_{g}' for g in GROUPS]].to_numpy(dtype=np.int64)
+    rate, ci_lower, ci_upper = wilson_score_interval(divorces, marriages, confidence)
+    prior_alpha, prior_beta = beta_prior_moments(divorces, marriages, axis=0)
+    eb_rate, cred_lower, cred_upper, _, _ = bayesian_estimate(
+        divorces, marriages, prior_alpha, prior_beta, level=confidence
+    )
+
+    regions = totals.index.get_level_values('Region').to_numpy()
+    region_labels = totals.index.get_level_values('Region_Label').to_numpy()
+    n_regions, n_groups = marriages.shape
+    rates = pd.DataFrame({
+        'Region': np.repeat(regions, n_groups),
+        'Region_Label': np.repeat(region_labels, n_groups),
+        'Group': np.tile(GROUPS, n_regions),
+        'Marriages': marriages.ravel(),
+        'Divorces': divorces.ravel(),
+        'Rate': rate.ravel() * 100,
+        'CI_Lower': ci_lower.ravel() * 100,
+        'CI_Upper': ci_upper.ravel() * 100,
+        'EB_Rate': eb_rate.ravel() * 100,
+        'Cred_Lower': cred_lower.ravel() * 100,
+        'Cred_Upper': cred_upper.ravel() * 100,
+    })
+
+    female, male = GROUPS.index('Female'), GROUPS.index('Male')
+    odds_ratio, p_value = _fisher(divorces[:, female], marriages[:, female],
+                                  divorces[:, male], marriages[:, male])
+    tests = pd.DataFrame({
+        'Region': regions,
+        'Region_Label': region_labels,
+        'Rate_Female': rate[:, female] * 100,
+        'Rate_Male': rate[:, male] * 100,
+        'Odds_Ratio': odds_ratio,
+        'P_Value': p_value,
+        'P_Adjusted': adjust(p_value, 'bh'),
+    })
+
+    priors = pd.DataFrame({
+        'Group': GROUPS,
+        'Label': [GROUP_LABELS[g] for g in GROUPS],
+        'Alpha': prior_alpha,
+        'Beta': prior_beta,
+        'Prior_Rate': prior_alpha / (prior_alpha + prior_beta) * 100,
+        'Concentration': prior_alpha + prior_beta,
+    })
+    year_values = regional['Year']
+    span = (int(year_values.min()), int(year_values.max())) if len(year_values) else ()
+    return RegionBreakdown(regions_version(regional), span, rates, tests, priors)
+
+
+_breakdowns = {}
+
+
+def load_breakdown(regional=None):
+    """breakdown() of `regional` (defaults to load_regions()), memoized per version"""
+    if regional is None:
+        regional = load_regions()
+    version = regions_version(regional)
+    if version not in _breakdowns:
+        _breakdowns[version] = breakdown(regional)
+    return _breakdowns[version]
+
+
+def clear(version=None):
+    """Drop memoized breakdowns from memory, for one regional table version or all"""
+    for key in list(_breakdowns):
+        if version is None or key == version:
+            del _breakdowns[key]
@@ -0,0 +1,327 @@
+"""
+Report builder: the charts (PNG) and tables (CSV) for articles, as a CLI
+
+    python -m mariye.report [--out DIR] [--source pxweb|bundled|FILE.json]
+                            [--jobs N] [--force] [TARGET ...]
+
+Targets are rendered in parallel across a process pool, longest first (by
+the render time recorded in the last build). Before the pool starts the
+analysis and the chart templates (mariye.charts.template) are prepared once,
+so forked workers begin drawing immediately. The output directory
+holds a manifest with the input hash of every file written there (dataset
+version + the source of the target's module, of mariye.core and of every
+mariye module they import, directly or not); a target whose file exists
+and whose hash is unchanged is skipped, so a rerun only redoes what
+changed. Per-target timings are printed at the end.
+
+Target builders are named ('module:function') rather than imported: the
+chart code, and with it matplotlib, is only loaded when a chart is actually
+rendered, so listing targets or a rerun with nothing to do stays fast.
+
+The default output directory (reports/ in the repository root, ignored by
+git like site/) can be overridden with MARIYE_OUTPUT_DIR.
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from mariye.core import load_analysis
+from mariye.data import dataset_version
+from mariye.pxweb import load_dataset, load_source
+
+PACKAGE_DIR = Path(__file__).resolve().parent
+OUTPUT_DIR = Path(os.environ.get('MARIYE_OUTPUT_DIR', Path(__file__).resolve().parent.parent / 'reports'))
+MANIFEST = '.mariye-report.json'
+# Builds the Analysis every target is drawn from
+ANALYSIS_MODULE = 'mariye.core'
+DPI = 300
+
+
+@dataclass(frozen=True)
+class Target:
+    """One output file and the function producing it from an Analysis"""
+    name: str
+    filename: str
+    build: str  # 'module:function', Analysis -> matplotlib Figure (.png) or DataFrame (.csv)
+
+    @property
+    def function(self):
+        """The builder itself, importing its module"""
+        module, _, name = self.build.partition(':')
+        return getattr(importlib.import_module(module), name)
+
+    @property
+    def sources(self):
+        """
+        {module: source} of the builder's module and of every mariye module it
+        imports (see module_sources), read without importing them
+        """
+        module, _, name = self.build.partition(':')
+        sources = module_sources(module)
+        defined = {node.name for node in ast.parse(sources[module]).body
+                   if isinstance(node, ast.FunctionDef)}
+        if name not in defined:
+            raise LookupError(f'{self.build} not found')
+        return sources
+
+
+@dataclass(frozen=True)
+class TargetResult:
+    """Outcome of one target in a build"""
+    name: str
+    path: Path
+    status: str  # 'built', 'up to date' or 'failed'
+    seconds: float = 0.0
+    error: str = None
+
+
+class ReportError(RuntimeError):
+    """Raised by build() when at least one target failed; carries all results"""
+
+    def __init__(self, results):
+        failed = [r.name for r in results if r.status == 'failed']
+        super().__init__(f"failed targets: {', '.join(failed)}")
+        self.results = results
+
+
+TARGETS = {t.name: t for t in [
+    Target('divorce_analysis', 'divorce_analysis.png', 'mariye.charts:overview'),
+    Target('divorce_analysis_detailed', 'divorce_analysis_detailed.csv', 'mariye.export:detailed_table'),
+    Target('article_main_chart', 'article_main_chart.png', 'mariye.charts:article_main'),
+    Target('article_supporting_chart', 'article_supporting_chart.png', 'mariye.charts:article_supporting'),
+    Target('article_simple_comparison', 'article_simple_comparison.png',
+           'mariye.charts:article_simple_comparison'),
+    Target('datawrapper_export', 'datawrapper_export.csv', 'mariye.export:datawrapper_table'),
+    Target('advanced_statistical_analysis', 'advanced_statistical_analysis.png',
+           'mariye.charts:advanced_panels'),
+]}
+
+
+def _imported_modules(text):
+    # mariye modules imported anywhere in `text`, function bodies included;
+    # 'from mariye.x import y' also yields 'mariye.x.y' in case y is a module
+    names = set()
+    for node in ast.walk(ast.parse(text)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+            names.update(f'{node.module}.{alias.name}' for alias in node.names)
+    return {name for name in names if name.partition('.')[0] == 'mariye'}
+
+
+@lru_cache(maxsize=None)
+def _read_module(path, mtime_ns):
+    # (source, mariye modules it imports), parsed once per modification time
+    text = path.read_text(encoding='utf-8')
+    return text, _imported_modules(text)
+
+
+def module_sources(module):
+    """
+    Source of a mariye module and of every mariye module it imports,
+    directly or through others (lazy imports inside functions included), as
+    {module: source}. Read from the package directory, nothing is imported.
+    """
+    sources = {}
+    pending = [module]
+    while pending:
+        name = pending.pop()
+        parts = name.split('.')[1:]
+        path = PACKAGE_DIR.joinpath(*parts).with_suffix('.py') if parts else PACKAGE_DIR / '__init__.py'
+        if name in sources or not path.is_file():
+            continue
+        sources[name], imported = _read_module(path, path.stat().st_mtime_ns)
+        pending.extend(imported)
+    return sources
+
+
+def input_hash(target, version):
+    """Hash of everything a target's file depends on: data, code and output settings"""
+    payload = json.dumps({
+        'version': version,
+        'filename': target.filename,
+        'dpi': DPI,
+        'code': {**module_sources(ANALYSIS_MODULE), **target.sources},
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _warm(data, names):
+    # Everything the targets `names` share: the analysis (memoized per
+    # process) and the templates of their charts. Runs in the parent before
+    # the pool forks and as the pool initializer (a no-op when inherited).
+    load_analysis(data)
+    chart_names = [TARGETS[n].build.partition(':')[2] for n in names
+                   if TARGETS[n].build.startswith('mariye.charts:')]
+    if chart_names:
+        from mariye.charts import prime
+        prime(chart_names)
+
+
+def _render(name, data, path):
+    # Runs in a worker process: analysis is memoized per process and version
+    start = time.perf_counter()
+    target = TARGETS[name]
+    result = target.function(load_analysis(data))
+    path = Path(path)
+    tmp = path.with_name(path.name + '.tmp')
+    if path.suffix == '.csv':
+        result.to_csv(tmp, index=False)
+    else:
+        result.savefig(tmp, format=path.suffix[1:], dpi=DPI, bbox_inches='tight')
+    os.replace(tmp, path)
+    return time.perf_counter() - start
+
+
+def _read_manifest(out_dir, name=MANIFEST):
+    path = out_dir / name
+    if path.exists():
+        return json.loads(path.read_text(encoding='utf-8'))
+    return {}
+
+
+def _write_manifest(out_dir, manifest, name=MANIFEST):
+    path = out_dir / name
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def build(targets=None, out_dir=None, data=None, jobs=None, force=False):
+    """
+    Render `targets` (names, default all) into `out_dir`, skipping unchanged ones
+    `data` defaults to mariye.pxweb.load_dataset(). With jobs=1 everything runs
+    in this process; otherwise up to `jobs` worker processes (default: CPU
+    count) share the pending targets. Returns a list of TargetResult in target
+    order; raises ReportError after all targets ran if any of them failed.
+    """
+    names = list(targets) if targets else list(TARGETS)
+    unknown = [n for n in names if n not in TARGETS]
+    if unknown:
+        raise KeyError(f"unknown targets: {', '.join(unknown)}")
+    out_dir = Path(out_dir or OUTPUT_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if data is None:
+        data = load_dataset()
+    version = dataset_version(data)
+
+    manifest = _read_manifest(out_dir)
+    results = {}
+    pending = {}
+    for name in names:
+        target = TARGETS[name]
+        path = out_dir / target.filename
+        key = input_hash(target, version)
+        entry = manifest.get(target.filename)
+        if not force and path.exists() and entry and entry['hash'] == key:
+            results[name] = TargetResult(name, path, 'up to date')
+        else:
+            pending[name] = (path, key)
+
+    def record(name, seconds=None, error=None):
+        path, key = pending[name]
+        if error is not None:
+            results[name] = TargetResult(name, path, 'failed', error=error)
+            return
+        results[name] = TargetResult(name, path, 'built', seconds)
+        manifest[TARGETS[name].filename] = {'hash': key, 'version': version, 'seconds': round(seconds, 3)}
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(pending) <= 1:
+        for name, (path, _) in pending.items():
+            try:
+                record(name, _render(name, data, path))
+            except Exception as exc:
+                record(name, error=f'{type(exc).__name__}: {exc}')
+    elif pending:
+        # Longest targets first, so the slowest one does not start last
+        order = sorted(pending, key=lambda n: -manifest.get(TARGETS[n].filename, {}).get('seconds', 0))
+        _warm(data, order)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending)),
+                                 initializer=_warm, initargs=(data, order)) as pool:
+            futures = {pool.submit(_render, name, data, str(pending[name][0])): name
+                       for name in order}
+            for future in as_completed(futures):
+                try:
+                    record(futures[future], future.result())
+                except Exception as exc:
+                    record(futures[future], error=f'{type(exc).__name__}: {exc}')
+
+    if pending:
+        _write_manifest(out_dir, manifest)
+    results = [results[name] for name in names]
+    if any(r.status == 'failed' for r in results):
+        raise ReportError(results)
+    return results
+
+
+def format_results(results, elapsed=None):
+    """Per-target timing table, as printed by the CLI"""
+    width = max(len(r.path.name) for r in results)
+    lines = [f"{'target':{width}s}  {'status':10s}  {'seconds':>8s}"]
+    for r in results:
+        seconds = f'{r.seconds:8.2f}' if r.status == 'built' else f"{'-':>8s}"
+        lines.append(f'{r.path.name:{width}s}  {r.status:10s}  {seconds}')
+        if r.error:
+            lines.append(f'    {r.error}')
+    counts = {status: sum(r.status == status for r in results) for status in ('built', 'up to date', 'failed')}
+    summary = f"{len(results)} targets: {counts['built']} built, {counts['up to date']} up to date, {counts['failed']} failed"
+    if elapsed is not None:
+        summary += f' in {elapsed:.2f} s'
+    lines.append(summary)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m mariye.report',
+        description='Render the article charts and CSV exports, skipping unchanged targets.'
+    )
+    parser.add_argument('targets', nargs='*', metavar='TARGET',
+                        help=f"targets to build (default: all): {', '.join(TARGETS)}")
+    parser.add_argument('-o', '--out', type=Path, default=OUTPUT_DIR,
+                        help='output directory (default: %(default)s)')
+    parser.add_argument('-s', '--source', default='pxweb',
+                        help="dataset: 'pxweb' (cached table, default), 'bundled' or a JSON file "
+                             "in the mariye.data.DATA layout")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count; 1 = no pool)')
+    parser.add_argument('-f', '--force', action='store_true', help='rebuild even if up to date')
+    parser.add_argument('--refresh', action='store_true', help='re-validate the PxWeb cache first')
+    parser.add_argument('--offline', action='store_true', help='never touch the network')
+    parser.add_argument('--list', action='store_true', help='list the targets and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for target in TARGETS.values():
+            print(f'{target.name:32s} {target.filename}')
+        return 0
+    unknown = [n for n in args.targets if n not in TARGETS]
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(unknown)} (see --list)")
+
+    data = load_source(args.source, refresh=args.refresh, offline=args.offline)
+    start = time.perf_counter()
+    try:
+        results = build(args.targets, args.out, data, jobs=args.jobs, force=args.force)
+        status = 0
+    except ReportError as exc:
+        results = exc.results
+        status = 1
+    print(format_results(results, time.perf_counter() - start))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,398 @@
+"""
+Batch significance tests for many 2x2 tables, with multiple-testing correction
+
+A batch is an array of shape (..., 2, 2); each table is
+[[divorces_a, not_divorced_a], [divorces_b, not_divorced_b]] like the
+contingency table in mariye.core. Every test runs on the whole batch in one
+vectorized pass and returns arrays of the batch shape:
+
+- fisher_test: Fisher exact test (two-sided or one-sided) on log
+  hypergeometric probabilities from a shared log-factorial table
+  (log_factorial): the tails of all tables are summed in lockstep, the other
+  two-sided tail located by bisection as in scipy.stats.fisher_exact; the
+  odds ratio is the sample one or the conditional maximum likelihood
+  estimate (conditional_odds_ratio)
+- chi2_test: Pearson chi-square with Yates' correction (scipy.stats.chi2_contingency)
+- z_test: two-proportion z test with pooled variance
+
+Tables with an empty row or column get p = 1 and a NaN statistic, as in
+scipy.stats.fisher_exact. adjust() applies Holm or Benjamini-Hochberg
+correction to a batch of p-values; pairwise() runs a test on every pair of
+groups and returns a tidy frame.
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+# Relative tolerance for "as or less likely" in the Fisher test (R's fisher.test)
+_RTOL = 1 + 1e-7
+
+# A tail sum stops once its terms fall below this fraction of the sum
+_TAIL_EPS = 1e-17
+
+# Conditional odds ratio solver: cells per block, convergence of log(psi)
+_CHUNK = 1 << 16
+_NEWTON_TOL = 1e-10
+
+# log(n!) for n = 0, 1, ...; see log_factorial
+_LOG_FACTORIAL = np.zeros(1)
+
+TESTS = ('fisher', 'chi2', 'z')
+ALTERNATIVES = ('two-sided', 'less', 'greater')
+ADJUSTMENTS = ('holm', 'bh', 'bonferroni', None)
+
+
+def as_tables(tables):
+    """Validate a batch of 2x2 tables and return it as an int64 array"""
+    tables = np.asarray(tables)
+    if tables.shape[-2:] != (2, 2):
+        raise ValueError(f'expected an array of 2x2 tables, got shape {tables.shape}')
+    if np.any(tables < 0):
+        raise ValueError('table counts must be nonnegative')
+    return tables.astype(np.int64)
+
+
+def tables_from_counts(divorces_a, marriages_a, divorces_b, marriages_b):
+    """Batch of 2x2 tables (group a vs b, divorced vs not) from broadcastable count arrays"""
+    divorces_a, marriages_a, divorces_b, marriages_b = np.broadcast_arrays(
+        divorces_a, marriages_a, divorces_b, marriages_b
+    )
+    return as_tables(np.stack([
+        np.stack([divorces_a, marriages_a - divorces_a], axis=-1),
+        np.stack([divorces_b, marriages_b - divorces_b], axis=-1),
+    ], axis=-2))
+
+
+def _cells(tables):
+    tables = as_tables(tables)
+    return tables[..., 0, 0], tables[..., 0, 1], tables[..., 1, 0], tables[..., 1, 1]
+
+
+def log_factorial(n):
+    """
+    log(n!) of an integer array, looked up in a table of gammaln values that
+    is kept between calls and grown (doubling) when a larger n comes along
+    """
+    global _LOG_FACTORIAL
+    n = np.asarray(n, dtype=np.int64)
+    top = int(n.max(initial=0))
+    if top >= len(_LOG_FACTORIAL):
+        size = max(top + 1, 2 * len(_LOG_FACTORIAL))
+        _LOG_FACTORIAL = special.gammaln(np.arange(1, size + 1, dtype=np.float64))
+    return _LOG_FACTORIAL[n]
+
+
+def _hypergeom(tables):
+    # a ~ Hypergeometric(total, row = a + b, col = a + c): flat parameters, the
+    # support [lo, hi] and the mode
+    a, b, c, d = (x.ravel() for x in _cells(tables))
+    row, col, total = a + b, a + c, a + b + c + d
+    lo = np.maximum(0, col - (c + d))
+    hi = np.minimum(row, col)
+    mode = (col + 1) * (row + 1) // (total + 2)
+    return a, b, c, d, row, col, total, lo, hi, mode
+
+
+def _log_kernel(x, row, col, total):
+    # log P(a = x) up to a constant per table (log C(row, x) C(total - row, col - x))
+    return -(log_factorial(x) + log_factorial(row - x) + log_factorial(col - x)
+             + log_factorial(total - row - col + x))
+
+
+def _log_constant(row, col, total):
+    return (log_factorial(row) + log_factorial(total - row) + log_factorial(col)
+            + log_factorial(total - col) - log_factorial(total))
+
+
+def _first_below(row, col, total, log_threshold, lo, hi, step):
+    # First x walking from lo towards hi (step +1 or -1) with a kernel at most
+    # log_threshold, hi + step when there is none; the kernel is monotone
+    # along the walk (one side of the mode), so this is a lockstep bisection.
+    left, right = lo.copy(), hi + step
+    while True:
+        active = np.flatnonzero(left != right)
+        if not len(active):
+            return left
+        mid = left[active] + step[active] * (np.abs(right[active] - left[active]) // 2)
+        below = _log_kernel(mid, row[active], col[active], total[active]) <= log_threshold[active]
+        right[active[below]] = mid[below]
+        left[active[~below]] = mid[~below] + step[active[~below]]
+
+
+def _tail_sum(start, stop, step, reference, row, col, total):
+    # Sum of exp(kernel(x) - reference) for x from start to stop (inclusive,
+    # empty when start is past stop), stepping away from the mode. Terms
+    # shrink along the walk, so all tables are summed in lockstep blocks
+    # (doubling in size) until their last term is negligible.
+    result = np.zeros(len(start))
+    active = np.flatnonzero((stop - start) * step >= 0)
+    offset, block = 0, 32
+    while len(active):
+        x = start[active, None] + step[active, None] * (offset + np.arange(block))
+        inside = (stop[active, None] - x) * step[active, None] >= 0
+        x = np.where(inside, x, start[active, None])
+        terms = np.where(inside, np.exp(_log_kernel(x, row[active, None], col[active, None],
+                                                   total[active, None]) - reference[active, None]), 0.0)
+        result[active] += terms.sum(axis=1)
+        more = inside[:, -1] & (terms[:, -1] > _TAIL_EPS * result[active])
+        active = active[more]
+        offset += block
+        block *= 2
+    return result
+
+
+def fisher_test(tables, conditional=False, alternative='two-sided'):
+    """
+    Fisher exact test of every table in the batch
+    Returns (odds_ratio, p_value). The two-sided p-value sums the
+    probabilities of all tables with the same margins that are at most as
+    likely as the observed one (within a relative 1e-7, as R's fisher.test);
+    'less' and 'greater' sum those with a at most or at least the observed
+    one, like scipy.stats.fisher_exact. The odds ratio is the sample
+    a*d / (b*c), or with `conditional` the conditional maximum likelihood
+    estimate (conditional_odds_ratio; R's estimate).
+    """
+    if alternative not in ALTERNATIVES:
+        raise ValueError(f"unknown alternative {alternative!r}, expected one of {', '.join(ALTERNATIVES)}")
+    tables = as_tables(tables)
+    a, b, c, d, row, col, total, lo, hi, mode = _hypergeom(tables)
+    shape = tables.shape[:-2]
+
+    degenerate = (row == 0) | (c + d == 0) | (col == 0) | (b + d == 0)
+    if conditional:
+        odds_ratio = conditional_odds_ratio(tables).ravel()
+    else:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            odds_ratio = np.where((c > 0) & (b > 0), a * d / np.maximum(b * c, 1), np.inf)
+        odds_ratio = np.where(degenerate, np.nan, odds_ratio)
+
+    log_observed = _log_kernel(a, row, col, total)
+    if alternative != 'two-sided':
+        p_value = np.ones(len(a))
+        tested = np.flatnonzero(~degenerate)
+        p_value[tested] = _one_sided(a[tested], row[tested], col[tested], total[tested], lo[tested],
+                                     hi[tested], mode[tested], log_observed[tested], alternative)
+        return odds_ratio.reshape(shape)[()], p_value.reshape(shape)[()]
+
+    # Everything relative to the observed table's kernel; the mode is as
+    # likely as the observed table for p = 1
+    log_threshold = log_observed + np.log(_RTOL)
+    p_value = np.ones(len(a))
+    tested = np.flatnonzero(~degenerate & (_log_kernel(mode, row, col, total) > log_threshold))
+    if len(tested):
+        a, row, col, total = a[tested], row[tested], col[tested], total[tested]
+        lo, hi, mode = lo[tested], hi[tested], mode[tested]
+        reference = log_observed[tested]
+        # Observed tail: from the observed value away from the mode; the other
+        # tail: from the first value beyond the mode that is as unlikely
+        down = np.where(a < mode, -1, 1)
+        end = np.where(down < 0, lo, hi)
+        other_end = np.where(down < 0, hi, lo)
+        other_start = _first_below(row, col, total, log_threshold[tested], mode - down, other_end, -down)
+        tails = (_tail_sum(a, end, down, reference, row, col, total)
+                 + _tail_sum(other_start, other_end, -down, reference, row, col, total))
+        p_value[tested] = np.exp(reference + _log_constant(row, col, total) + np.log(tails))
+
+    return odds_ratio.reshape(shape)[()], np.minimum(p_value, 1.0).reshape(shape)[()]
+
+
+def _one_sided(a, row, col, total, lo, hi, mode, reference, alternative):
+    # P(x <= a) ('less') or P(x >= a) ('greater'). A tail that lies away from
+    # the mode is summed directly; one that holds the mode is 1 minus the
+    # opposite tail beyond a, so every sum walks towards smaller terms.
+    down = -1 if alternative == 'less' else 1
+    direct = (a - mode) * down > 0
+    start = np.where(direct, a, a - down)
+    stop = np.where(direct == (down < 0), lo, hi)
+    step = np.where(direct, down, -down)
+    with np.errstate(divide='ignore'):
+        tail = np.exp(reference + _log_constant(row, col, total)
+                      + np.log(_tail_sum(start, stop, step, reference, row, col, total)))
+    return np.clip(np.where(direct, tail, 1 - tail), 0.0, 1.0)
+
+
+def conditional_odds_ratio(tables):
+    """
+    Conditional maximum likelihood estimate of the odds ratio of every table
+    The odds ratio psi at which the mean of Fisher's noncentral hypergeometric
+    distribution (the distribution of a given the margins) equals the
+    observed a, as scipy.stats.contingency.odds_ratio(kind='conditional').
+    0 or inf when a is at the end of its support, NaN for an empty row or
+    column. Solved by Newton's method on log(psi) for all tables at once,
+    each summing over a window of +-10 approximate standard deviations
+    around a.
+    """
+    tables = as_tables(tables)
+    a, b, c, d, row, col, total, lo, hi, _ = _hypergeom(tables)
+    shape = tables.shape[:-2]
+
+    result = np.where(a == lo, 0.0, np.inf)
+    result[(row == 0) | (c + d == 0) | (col == 0) | (b + d == 0)] = np.nan
+    interior = np.flatnonzero((a > lo) & (a < hi))
+    a, b, c, d, row, col, total, lo, hi = (x[interior] for x in (a, b, c, d, row, col, total, lo, hi))
+
+    # Large-sample standard deviation of a given the margins at the estimate
+    spread = 1 / np.sqrt(1 / a + 1 / b + 1 / c + 1 / d)
+    width = np.ceil(10 * spread).astype(np.int64) + 10
+    first = np.maximum(lo, a - width)
+    last = np.minimum(hi, a + width)
+    # Started from the sample log odds ratio with 0.5 added to every cell
+    theta = np.log((a + 0.5) * (d + 0.5) / ((b + 0.5) * (c + 0.5)))
+
+    # Tables of similar window size together, blocks of at most _CHUNK cells
+    sizes = last - first + 1
+    order = np.argsort(sizes, kind='stable')
+    estimate = np.empty(len(interior))
+    start = 0
+    while start < len(order):
+        # Widest table last: take the most tables whose padded grid fits
+        padded = np.arange(1, len(order) - start + 1) * sizes[order[start:]]
+        chunk = order[start:start + max(1, int(np.count_nonzero(padded <= _CHUNK)))]
+        estimate[chunk] = _solve_log_odds(a[chunk], row[chunk], col[chunk], total[chunk],
+                                          first[chunk], last[chunk], int(sizes[chunk[-1]]),
+                                          theta[chunk])
+        start += len(chunk)
+    result[interior] = estimate
+    return result.reshape(shape)[()]
+
+
+def _solve_log_odds(a, row, col, total, first, last, size, theta):
+    # Newton iterations E[x | theta] = a on the log odds ratio theta, over
+    # each table's window of x values (centered on a), steps clipped to +-1.
+    # Converged tables are dropped from the arrays as they finish.
+    x = first[:, None] + np.arange(size)
+    inside = x <= last[:, None]
+    x = np.where(inside, x, first[:, None])
+    base = np.where(inside, _log_kernel(x, row[:, None], col[:, None], total[:, None]), -np.inf)
+    centered = (x - a[:, None]).astype(np.float64)
+    squared = centered ** 2
+    result = theta.copy()
+    index = np.arange(len(a))
+    for _ in range(100):
+        log_weight = base + theta[:, None] * centered
+        weight = np.exp(log_weight - log_weight.max(axis=1, keepdims=True))
+        norm = weight.sum(axis=1)
+        mean = (weight * centered).sum(axis=1) / norm
+        variance = (weight * squared).sum(axis=1) / norm - mean ** 2
+        step = np.clip(-mean / np.maximum(variance, 1e-300), -1.0, 1.0)
+        theta = theta + step
+        result[index] = theta
+        going = np.abs(step) > _NEWTON_TOL
+        if not going.any():
+            break
+        if not going.all():
+            base, centered, squared = base[going], centered[going], squared[going]
+            theta, index = theta[going], index[going]
+    return np.exp(result)
+
+
+def chi2_test(tables, correction=True):
+    """
+    Pearson chi-square test (1 degree of freedom) of every table in the batch
+    With `correction`, Yates' continuity correction as in
+    scipy.stats.chi2_contingency. Returns (chi2, p_value).
+    """
+    observed = as_tables(tables).astype(np.float64)
+    total = observed.sum(axis=(-2, -1), keepdims=True)
+    expected = (observed.sum(axis=-1, keepdims=True) * observed.sum(axis=-2, keepdims=True)
+                / np.where(total == 0, 1, total))
+    degenerate = (expected == 0).any(axis=(-2, -1))
+    if correction:
+        diff = expected - observed
+        observed = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi2 = ((observed - expected) ** 2 / expected).sum(axis=(-2, -1))
+    chi2 = np.where(degenerate, np.nan, chi2)
+    p_value = np.where(degenerate, 1.0, special.chdtrc(1, chi2))
+    return chi2[()], p_value[()]
+
+
+def z_test(tables):
+    """
+    Two-sided two-proportion z test (pooled variance) of every table in the batch
+    z > 0 when the first row has the higher rate. Returns (z, p_value).
+    """
+    a, b, c, d = (x.astype(np.float64) for x in _cells(tables))
+    n1, n2 = a + b, c + d
+    pooled = (a + c) / np.where(n1 + n2 == 0, 1, n1 + n2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        se = np.sqrt(pooled * (1 - pooled) * (1 / n1 + 1 / n2))
+        z = (a / n1 - c / n2) / se
+    degenerate = (n1 == 0) | (n2 == 0) | (se == 0)
+    z = np.where(degenerate, np.nan, z)
+    p_value = np.where(degenerate, 1.0, 2 * special.ndtr(-np.abs(z)))
+    return z[()], p_value[()]
+
+
+def run_test(tables, test='fisher'):
+    """(statistic, p_value) of `test` ('fisher', 'chi2' or 'z') for a batch"""
+    if test == 'fisher':
+        return fisher_test(tables)
+    if test == 'chi2':
+        return chi2_test(tables)
+    if test == 'z':
+        return z_test(tables)
+    raise ValueError(f"unknown test {test!r}, expected one of {', '.join(TESTS)}")
+
+
+def adjust(p_values, method='holm'):
+    """
+    Multiple-testing adjusted p-values over the whole batch
+    'holm' (family-wise error, step-down), 'bh' (Benjamini-Hochberg false
+    discovery rate), 'bonferroni' or None. NaN p-values are left out of the
+    family and stay NaN.
+    """
+    p = np.asarray(p_values, dtype=np.float64)
+    if method is None:
+        return p.copy()[()]
+    if method not in ADJUSTMENTS:
+        raise ValueError(f"unknown adjustment {method!r}, expected one of {ADJUSTMENTS}")
+
+    flat = p.ravel()
+    adjusted = np.full(flat.shape, np.nan)
+    valid = np.flatnonzero(~np.isnan(flat))
+    m = len(valid)
+    if m == 0:
+        return adjusted.reshape(p.shape)[()]
+    order = valid[np.argsort(flat[valid], kind='stable')]
+    ranked = flat[order]
+    rank = np.arange(1, m + 1)
+
+    if method == 'bonferroni':
+        result = ranked * m
+    elif method == 'holm':
+        result = np.maximum.accumulate(ranked * (m - rank + 1))
+    else:
+        result = np.minimum.accumulate((ranked * m / rank)[::-1])[::-1]
+    adjusted[order] = np.minimum(result, 1.0)
+    return adjusted.reshape(p.shape)[()]
+
+
+def pairwise(divorces, marriages, labels, test='fisher', method='holm', alpha=0.05):
+    """
+    Test every pair of groups (e.g. couple types, years or regions)
+    One row per pair i < j: Group_A, Group_B, Rate_A, Rate_B (%), Statistic,
+    P_Value, P_Adjusted (over all pairs) and Significant (P_Adjusted < alpha).
+    """
+    if len(labels) < 2:
+        raise ValueError(f'pairwise needs at least 2 groups, got {len(labels)}')
+    divorces = np.asarray(divorces)
+    marriages = np.asarray(marriages)
+    i, j = (np.array(x, dtype=np.int64) for x in zip(*combinations(range(len(labels)), 2)))
+    tables = tables_from_counts(divorces[i], marriages[i], divorces[j], marriages[j])
+    statistic, p_value = run_test(tables, test)
+    p_adjusted = adjust(p_value, method)
+    labels = np.asarray(labels)
+    return pd.DataFrame({
+        'Group_A': labels[i],
+        'Group_B': labels[j],
+        'Rate_A': divorces[i] / marriages[i] * 100,
+        'Rate_B': divorces[j] / marriages[j] * 100,
+        'Statistic': statistic,
+        'P_Value': p_value,
+        'P_Adjusted': p_adjusted,
+        'Significant': p_adjusted < alpha,
+    })
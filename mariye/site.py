@@ -0,0 +1,463 @@
+"""
+Static site: the app's charts, tables and Finnish text as plain HTML, as a CLI
+
+    python -m mariye.site [--out DIR] [--source pxweb|bundled|FILE.json]
+                          [--force] [--cdn] [PAGE ...]
+
+The pages show what the Streamlit app shows for the same dataset (without
+its widgets): fig_simple and fig1-fig3 with the key figures and the summary
+table on index.html, fig_ci and fig_bayes with the tests and posterior
+intervals on tilastot.html. The text blocks and number formatting come from
+mariye.text, which the app uses too. Each chart is embedded as its Plotly JSON
+(mariye.figures.figure_json) and drawn by plotly.js in the browser, so the
+bundle can be served from GitHub Pages or any static host without Python.
+The yearly, per-group and Datawrapper tables are written next to the pages
+as CSV downloads (mariye.export).
+
+Like mariye.report, the output directory holds a manifest with the input
+hash of every file (dataset version + the Plotly version + the source of
+the page's and its figures' modules and of every mariye module they
+import); a file whose hash is unchanged is skipped, and when nothing
+changed the analysis is not even loaded.
+"""
+
+import argparse
+import hashlib
+import html
+import inspect
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import plotly
+
+from mariye import export, figures, text
+from mariye.bayes import load_comparison
+from mariye.core import load_analysis
+from mariye.data import dataset_version
+from mariye.pxweb import load_dataset, load_source
+from mariye.report import (ReportError, TargetResult, _read_manifest, _write_manifest, format_results,
+                           module_sources)
+
+SITE_DIR = Path(os.environ.get('MARIYE_SITE_DIR', Path(__file__).resolve().parent.parent / 'site'))
+MANIFEST = '.mariye-site.json'
+PLOTLY_JS = 'plotly.min.js'
+PLOTLY_CDN = 'https://cdn.plot.ly/plotly-{version}.min.js'
+
+
+@dataclass(frozen=True)
+class Page:
+    """One file of the site and the function producing its content from an Analysis"""
+    name: str
+    filename: str
+    build: object  # Analysis -> str (HTML) or bytes
+    # Figures (mariye.figures.FIGURES names) and other code the content depends on
+    figures: tuple = ()
+    depends: tuple = ()
+
+
+# ----------------------------------------------------------------------------
+# HTML helpers
+# ----------------------------------------------------------------------------
+
+STYLE = """
+body { font-family: -apple-system, "Segoe UI", Roboto, Arial, sans-serif; margin: 0; color: #262730; }
+main { max-width: 1100px; margin: 0 auto; padding: 1.5rem 1rem 4rem; }
+nav { background: #f0f2f6; padding: 0.6rem 1rem; }
+nav a { margin-right: 1.2rem; color: #262730; }
+hr { border: 0; border-top: 1px solid #e6e6e6; margin: 2rem 0; }
+.box { border-radius: 0.5rem; padding: 0.8rem 1rem; margin: 1rem 0; }
+.info { background: #e8f0fe; } .success { background: #e6f4ea; }
+.warning { background: #fff8e1; } .error { background: #fdecea; }
+.columns { display: flex; flex-wrap: wrap; gap: 1rem; }
+.columns > div { flex: 1 1 0; min-width: 240px; }
+.metric { flex: 1 1 0; min-width: 180px; }
+.metric .label { font-size: 0.9rem; color: #555; }
+.metric .value { font-size: 2rem; }
+.metric .help { font-size: 0.8rem; color: #777; }
+.caption { font-size: 0.85rem; color: #666; }
+pre { background: #f6f8fa; padding: 0.8rem; white-space: pre-wrap; }
+table { border-collapse: collapse; margin: 1rem 0; }
+th, td { border: 1px solid #e6e6e6; padding: 0.3rem 0.7rem; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+"""
+
+
+def _inline(text):
+    # **bold** and *italic* of the app's markdown, after escaping
+    text = html.escape(text, quote=False)
+    text = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', text)
+    return re.sub(r'\*(.+?)\*', r'<em>\1</em>', text)
+
+
+def markdown(text):
+    """HTML of the small markdown subset used in the app: paragraphs, lists, emphasis"""
+    blocks = []
+    for block in re.split(r'\n\s*\n', inspect.cleandoc(text)):
+        lines = [line.strip() for line in block.splitlines() if line.strip()]
+        items = [line for line in lines if line.startswith('- ')]
+        head = [line for line in lines if not line.startswith('- ')]
+        if head:
+            blocks.append('<p>' + '<br>\n'.join(_inline(line) for line in head) + '</p>')
+        if items:
+            blocks.append('<ul>' + ''.join(f'<li>{_inline(i[2:])}</li>' for i in items) + '</ul>')
+    return '\n'.join(blocks)
+
+
+def box(kind, text):
+    """st.info / st.success / st.warning / st.error as a coloured block"""
+    return f'<div class="box {kind}">{markdown(text)}</div>'
+
+
+def metric(label, value, help_text=None):
+    help_html = f'<div class="help">{html.escape(help_text)}</div>' if help_text else ''
+    return (f'<div class="metric"><div class="label">{html.escape(label)}</div>'
+            f'<div class="value">{html.escape(value)}</div>{help_html}</div>')
+
+
+def columns(*cells):
+    return '<div class="columns">' + ''.join(f'<div>{c}</div>' for c in cells) + '</div>'
+
+
+def code(text):
+    return f'<pre>{html.escape(text.strip())}</pre>'
+
+
+def caption(text):
+    return f'<div class="caption">{markdown(text)}</div>'
+
+
+def table(frame):
+    return frame.to_html(index=False, border=0, escape=True)
+
+
+def chart(name, analysis):
+    """A chart placeholder with the figure's Plotly JSON embedded next to it"""
+    # "</" inside a script element would end it early
+    spec = figures.figure_json(name, analysis).replace('</', '<\\/')
+    return (f'<div class="chart" data-spec="{name}-spec"></div>\n'
+            f'<script type="application/json" id="{name}-spec">{spec}</script>')
+
+
+PLOT_SCRIPT = """
+document.querySelectorAll('.chart').forEach(function (el) {
+  var spec = JSON.parse(document.getElementById(el.dataset.spec).textContent);
+  Plotly.newPlot(el, spec.data, spec.layout, {responsive: true, displaylogo: false});
+});
+"""
+
+
+def document(title, body, plotly_src=PLOTLY_JS):
+    """A complete page: navigation, body and the plotly.js bootstrap"""
+    nav = ''.join(f'<a href="{p.filename}">{html.escape(label)}</a>'
+                  for p, label in ((PAGES['index'], 'Yleiskatsaus'), (PAGES['tilastot'], 'Tilastot')))
+    return f"""<!DOCTYPE html>
+<html lang="fi">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title>
+<style>{STYLE}</style>
+<script src="{plotly_src}" charset="utf-8"></script>
+</head>
+<body>
+<nav>{nav}</nav>
+<main>
+{body}
+</main>
+<script>{PLOT_SCRIPT}</script>
+</body>
+</html>
+"""
+
+
+# ----------------------------------------------------------------------------
+# Pages
+# ----------------------------------------------------------------------------
+
+def index_page(analysis, plotly_src=PLOTLY_JS):
+    """index.html: the app's main page"""
+    period = text.span(analysis)
+    downloads = ''.join(
+        f'<li><a href="{PAGES[name].filename}">{html.escape(export.TABLES[name].title)}</a></li>'
+        for name in DOWNLOADS
+    )
+
+    body = f"""
+<h1>💍 {html.escape(text.title(analysis))}</h1>
+<h3>Vertailu: Samaa sukupuolta vs. eri sukupuolta olevat parit</h3>
+<hr>
+<h2>🧩 Mitä tarkoittaa 'eroaste'?</h2>
+{columns(*map(markdown, text.rate_meanings(analysis)))}
+{box('warning', text.important_difference(analysis))}
+{box('info', text.timespan_note(analysis))}
+<hr>
+<h2>📰 Toimittajan Pikaopas</h2>
+{box('success', text.quick_answer(analysis))}
+<p><strong>📋 Kopioi artikkeliisi (YKSINKERTAINEN VERSIO):</strong></p>
+{code(text.simple_copy(analysis))}
+<h3>📊 Yksinkertainen vertailu</h3>
+{chart('fig_simple', analysis)}
+<h3>📊 Avainluvut</h3>
+<div class="columns">
+{''.join(metric(*figure) for figure in text.key_figures(analysis))}
+</div>
+{box('error', text.misleading_note(analysis))}
+<hr>
+<h2>📈 Kumulatiivinen eroaste vuosittain</h2>
+{chart('fig1', analysis)}
+{caption(text.cumulative_caption(analysis))}
+<hr>
+<h2>🧠 Kolme tärkeintä asiaa (selkokieli)</h2>
+{box('success', text.takeaways(analysis))}
+<p><strong>Kopioi juttuun:</strong></p>
+{code(text.copy_blurb(analysis))}
+<hr>
+{columns('<h2>💑 Solmitut avioliitot vuosittain</h2>' + chart('fig2', analysis),
+         '<h2>💔 Avioerot vuosittain</h2>' + chart('fig3', analysis))}
+<hr>
+<h2>📊 Yhteenvetotaulukko ({period})</h2>
+{table(text.summary_table(analysis))}
+<p><strong>Lataa data:</strong></p>
+<ul>{downloads}</ul>
+<hr>
+<h2>⚠️ Tärkeät huomiot</h2>
+{box('warning', text.limitations(analysis))}
+<hr>
+{caption(text.SOURCE_NOTE)}
+"""
+    return document(text.title(analysis), body, plotly_src)
+
+
+def statistics_page(analysis, plotly_src=PLOTLY_JS):
+    """tilastot.html: confidence intervals, significance and the Bayesian tab"""
+    groups = analysis.groups
+    comparison = load_comparison(analysis)
+    female_vs_male = comparison.pair('Female', 'Male')
+
+    intervals = analysis.ci_frame()
+    intervals = intervals.assign(**{
+        'Eroaste': intervals['Rate'].map(lambda r: f'{r:.2f}%'),
+        '95% luottamusväli': [text.interval(lo, hi, unit='%')
+                              for lo, hi in zip(intervals['CI_Lower'], intervals['CI_Upper'])],
+    })[['Group', 'Eroaste', '95% luottamusväli', 'Divorces', 'Marriages']].rename(
+        columns={'Group': 'Ryhmä', 'Divorces': 'Avioerot', 'Marriages': 'Avioliitot'})
+
+    body = f"""
+<h1>🔬 Tilastotieteilijän nurkkaus</h1>
+<h2>Luottamusvälit ja Tilastollinen Merkitsevyys</h2>
+{markdown('''
+    Pelkkä prosenttiluku ei kerro, kuinka varma luvusta voi olla tai onko ero ryhmien välillä
+    todellinen vai sattumaa. Tilastollinen analyysi vastaa näihin kysymyksiin.
+    ''')}
+{chart('fig_ci', analysis)}
+<h3>📊 Numeeriset Tulokset</h3>
+{table(intervals)}
+<h3>🧪 Tilastollinen merkitsevyys: Naisparit vs. miesparit</h3>
+<div class="columns">
+{metric("Fisher's Exact Test (P-value)", f'{analysis.p_value_fisher:.6f}')}
+{metric('Odds‑suhde (naisparit / miesparit)', f'{analysis.odds_ratio_female_vs_male:.2f}x',
+        'Odds‑suhde ei ole sama kuin riskisuhde, mutta pienillä prosenteilla ne ovat lähekkäin.')}
+</div>
+{box(*text.significance_note(analysis))}
+<h3>📏 Efektikoko (Cohen's h)</h3>
+<div class="columns">
+{metric("Cohen's h", f'{analysis.cohens_h:.3f}')}
+{metric('Riskisuhde (naisparit / miesparit)', f'{analysis.risk_ratio_female_vs_male:.2f}x',
+        'Todennäköisyyksien suhde: p(ero | naispari) / p(ero | miespari)')}
+</div>
+{box(*text.effect_note(analysis.cohens_h))}
+<hr>
+<h2>Bayesilainen Lähestymistapa</h2>
+{markdown('''
+    Bayesilainen analyysi antaa todennäköisyysjakauman sille, mikä TODELLINEN eroaste on.
+    Se on helpompi tulkita ja erityisen hyvä pienille otoksille.
+    ''')}
+{chart('fig_bayes', analysis)}
+{columns(markdown(text.posterior_summary(groups['Male'])), markdown(text.posterior_summary(groups['Female'])))}
+<div class="columns">
+{metric('P(naisparien eroaste > miesparien)', text.probability(female_vs_male['Prob_Greater']))}
+{metric('Riskisuhde (naisparit / miesparit)', f"{female_vs_male['RR_Median']:.2f}x",
+        f"95% CrI {text.interval(female_vs_male['RR_Lower'], female_vs_male['RR_Upper'])}")}
+</div>
+<h3>Kaikki ryhmäparit</h3>
+{table(text.pairs_table(analysis, comparison))}
+{caption(text.pairs_caption(comparison))}
+<hr>
+{caption(text.SOURCE_NOTE)}
+"""
+    return document('Tilastotieteilijän nurkkaus', body, plotly_src)
+
+
+def plotly_js(analysis):
+    """plotly.min.js of the installed Plotly version (independent of the data)"""
+    # plotly.offline pulls in IPython; only import it when the file is written
+    import plotly.offline
+    return plotly.offline.get_plotlyjs()
+
+
+def plotly_cdn():
+    """CDN address of the plotly.js version bundled with the installed Plotly"""
+    import plotly.offline
+    return PLOTLY_CDN.format(version=plotly.offline.get_plotlyjs_version())
+
+
+def csv_download(name, analysis):
+    """Export table `name` as CSV (mariye.export)"""
+    return export.export_bytes(name, analysis, 'csv')
+
+
+DOWNLOADS = ('yearly', 'groups', 'datawrapper')
+
+# Shared by every HTML page, so part of their input hashes
+HTML_HELPERS = (_inline, markdown, box, metric, columns, code, caption, table, chart, document)
+
+PAGES = {p.name: p for p in [
+    Page('index', 'index.html', index_page, ('fig_simple', 'fig1', 'fig2', 'fig3'), HTML_HELPERS),
+    Page('tilastot', 'tilastot.html', statistics_page, ('fig_ci', 'fig_bayes'), HTML_HELPERS),
+    Page('plotly', PLOTLY_JS, plotly_js),
+] + [
+    Page(name, export.filename(name, 'csv'), partial(csv_download, name),
+         depends=(export.TABLES[name].build, export.csv_chunks))
+    for name in DOWNLOADS
+]}
+
+
+def _module(fn):
+    # Module of a builder (of the wrapped function for partials)
+    return (fn.func if isinstance(fn, partial) else fn).__module__
+
+
+def input_hash(page, version, plotly_src=PLOTLY_JS):
+    """
+    Hash of everything a file depends on: data, Plotly and the source of the
+    modules of the page and its figures plus every mariye module they import
+    """
+    functions = (page.build,) + page.depends + tuple(figures.FIGURES[name] for name in page.figures)
+    code = {}
+    for module in sorted({_module(fn) for fn in functions}):
+        code.update(module_sources(module))
+    payload = json.dumps({
+        'version': version if page.name != 'plotly' else None,
+        'filename': page.filename,
+        'plotly': plotly.__version__,
+        'plotly_src': plotly_src,
+        'code': code,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _render(page, analysis, path, plotly_src):
+    start = time.perf_counter()
+    if page.filename.endswith('.html'):
+        content = page.build(analysis, plotly_src)
+    else:
+        content = page.build(analysis)
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+    return time.perf_counter() - start
+
+
+def build(pages=None, out_dir=None, data=None, force=False, cdn=False):
+    """
+    Write `pages` (names, default all) into `out_dir`, skipping unchanged ones
+    `data` defaults to mariye.pxweb.load_dataset(). With cdn=True the pages
+    load plotly.js from the Plotly CDN and it is not written locally.
+    Returns a list of mariye.report.TargetResult in page order; raises
+    mariye.report.ReportError after all pages ran if any of them failed.
+    """
+    names = list(pages) if pages else list(PAGES)
+    plotly_src = plotly_cdn() if cdn else PLOTLY_JS
+    if cdn and not pages:
+        names.remove('plotly')
+    unknown = [n for n in names if n not in PAGES]
+    if unknown:
+        raise KeyError(f"unknown pages: {', '.join(unknown)}")
+    out_dir = Path(out_dir or SITE_DIR)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    if data is None:
+        data = load_dataset()
+    version = dataset_version(data)
+
+    manifest = _read_manifest(out_dir, MANIFEST)
+    results = {}
+    pending = {}
+    for name in names:
+        page = PAGES[name]
+        path = out_dir / page.filename
+        key = input_hash(page, version, plotly_src)
+        entry = manifest.get(page.filename)
+        if not force and path.exists() and entry and entry['hash'] == key:
+            results[name] = TargetResult(name, path, 'up to date')
+        else:
+            pending[name] = (path, key)
+
+    # The analysis (and every figure) is only computed when something changed
+    analysis = load_analysis(data) if pending else None
+    for name, (path, key) in pending.items():
+        try:
+            seconds = _render(PAGES[name], analysis, path, plotly_src)
+        except Exception as exc:
+            results[name] = TargetResult(name, path, 'failed', error=f'{type(exc).__name__}: {exc}')
+            continue
+        results[name] = TargetResult(name, path, 'built', seconds)
+        manifest[PAGES[name].filename] = {'hash': key, 'version': version, 'seconds': round(seconds, 3)}
+
+    if pending:
+        _write_manifest(out_dir, manifest, MANIFEST)
+    results = [results[name] for name in names]
+    if any(r.status == 'failed' for r in results):
+        raise ReportError(results)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m mariye.site',
+        description='Render the app as a static HTML bundle, skipping unchanged files.'
+    )
+    parser.add_argument('pages', nargs='*', metavar='PAGE',
+                        help=f"files to build (default: all): {', '.join(PAGES)}")
+    parser.add_argument('-o', '--out', type=Path, default=SITE_DIR,
+                        help='output directory (default: %(default)s)')
+    parser.add_argument('-s', '--source', default='pxweb',
+                        help="dataset: 'pxweb' (cached table, default), 'bundled' or a JSON file "
+                             "in the mariye.data.DATA layout")
+    parser.add_argument('-f', '--force', action='store_true', help='rebuild even if up to date')
+    parser.add_argument('--cdn', action='store_true',
+                        help='load plotly.js from the Plotly CDN instead of writing it to the bundle')
+    parser.add_argument('--refresh', action='store_true', help='re-validate the PxWeb cache first')
+    parser.add_argument('--offline', action='store_true', help='never touch the network')
+    parser.add_argument('--list', action='store_true', help='list the pages and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for page in PAGES.values():
+            print(f'{page.name:12s} {page.filename}')
+        return 0
+    unknown = [n for n in args.pages if n not in PAGES]
+    if unknown:
+        parser.error(f"unknown pages: {', '.join(unknown)} (see --list)")
+
+    data = load_source(args.source, refresh=args.refresh, offline=args.offline)
+    start = time.perf_counter()
+    try:
+        results = build(args.pages, args.out, data, force=args.force, cdn=args.cdn)
+        status = 0
+    except ReportError as exc:
+        results = exc.results
+        status = 1
+    print(format_results(results, time.perf_counter() - start))
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Survival analysis for marriage-duration data (life table / Kaplan-Meier)
+
+Statistics Finland publishes divorces by marriage duration. Combined with
+the number of marriages per year (the cohort sizes), each marriage cohort
+becomes one row of a (cohorts x durations) array and the survival curve of
+"still married after d years" is estimated for all cohorts at once. The
+engine takes any long duration-by-cohort table (column names are
+arguments), so it does not depend on a particular StatFin table:
+
+- at risk at duration d = cohort size - divorces at shorter durations
+- cohorts are censored after the last observed calendar year
+- pooled hazard h(d) = sum of divorces / sum at risk over observed cohorts
+- S(d) = prod(1 - h), with Greenwood variance and a log-log confidence band
+
+Deaths and emigration are not in the aggregate tables, so S(d) is the
+share of marriages not yet ended by divorce (divorce as the only exit).
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+
+@dataclass(frozen=True)
+class DurationArrays:
+    """Divorces by cohort and duration for one couple type"""
+    cohorts: np.ndarray       # (C,) marriage years
+    durations: np.ndarray     # (D,) 0, 1, ..., D-1 years
+    sizes: np.ndarray         # (C,) marriages in each cohort
+    events: np.ndarray        # (C, D) divorces at each duration
+    observed: np.ndarray      # (C, D) False where cohort + duration is past the data
+
+
+@dataclass(frozen=True)
+class LifeTable:
+    """Pooled Kaplan-Meier life table plus per-cohort survival curves"""
+    table: pd.DataFrame
+    cohort_survival: pd.DataFrame = field(repr=False)
+
+    def survival_at(self, duration):
+        """S(duration) with its confidence band, as (S, lower, upper)"""
+        row = self.table.loc[self.table['Duration'] == duration].iloc[0]
+        return row['Survival'], row['CI_Lower'], row['CI_Upper']
+
+
+def duration_arrays(divorces, marriages, group=None, cohort='Cohort', year='Year',
+                    duration='Duration', count='Divorces', size='Marriages',
+                    last_year=None, max_duration=None):
+    """
+    Reshape long tables into DurationArrays, one per couple type
+    `divorces` has a duration column and either a cohort (marriage year)
+    column or a calendar year column (cohort = year - duration); `marriages`
+    has the cohort sizes per marriage year. With `group`, both frames are
+    split on that column and a dict group -> DurationArrays is returned.
+    """
+    if group is not None:
+        return {
+            key: duration_arrays(part, marriages[marriages[group] == key], None, cohort, year,
+                                 duration, count, size, last_year, max_duration)
+            for key, part in divorces.groupby(group, observed=True, sort=False)
+        }
+
+    divorces = divorces.copy()
+    if cohort not in divorces:
+        divorces[cohort] = divorces[year] - divorces[duration]
+    if last_year is None:
+        last_year = int((divorces[cohort] + divorces[duration]).max())
+
+    if (divorces[count] < 0).any() or (marriages[size] < 0).any():
+        raise ValueError('counts must be nonnegative')
+    sizes = marriages.groupby(cohort if cohort in marriages else year)[size].sum()
+    cohorts = sizes.index.to_numpy()
+    n_durations = int(max_duration if max_duration is not None else last_year - cohorts.min()) + 1
+    durations = np.arange(n_durations)
+
+    # Scatter the counts into the (cohorts x durations) grid in one call
+    events = np.zeros((len(cohorts), n_durations))
+    cohort_of = divorces[cohort].to_numpy()
+    rows = np.minimum(np.searchsorted(cohorts, cohort_of), len(cohorts) - 1)
+    cols = divorces[duration].to_numpy().astype(int)
+    keep = (cohorts[rows] == cohort_of) & (cols >= 0) & (cols < n_durations)
+    np.add.at(events, (rows[keep], cols[keep]), divorces[count].to_numpy()[keep])
+
+    if (events.sum(axis=1) > sizes.to_numpy()).any():
+        raise ValueError('a cohort has more divorces than marriages')
+    observed = cohorts[:, None] + durations[None, :] <= last_year
+    return DurationArrays(cohorts, durations, sizes.to_numpy().astype(float), events, observed)
+
+
+def life_table(arrays, level=0.95):
+    """Kaplan-Meier estimate over all cohorts of one DurationArrays"""
+    events = np.where(arrays.observed, arrays.events, 0.0)
+    divorced_before = np.cumsum(events, axis=1) - events
+    at_risk_cohort = np.where(arrays.observed, arrays.sizes[:, None] - divorced_before, 0.0)
+
+    at_risk = at_risk_cohort.sum(axis=0)
+    n_events = events.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hazard = np.where(at_risk > 0, n_events / at_risk, 0.0)
+        survival = np.cumprod(1 - hazard)
+
+        # Greenwood variance and log-log band (stays inside [0, 1])
+        greenwood = np.cumsum(np.where(at_risk > n_events, n_events / (at_risk * (at_risk - n_events)), 0.0))
+        z = -special.ndtri((1 - level) / 2)
+        se_loglog = np.sqrt(greenwood) / np.abs(np.log(survival))
+        lower = np.where(survival < 1, survival ** np.exp(z * se_loglog), 1.0)
+        upper = np.where(survival < 1, survival ** np.exp(-z * se_loglog), 1.0)
+
+        # Per-cohort curves; NaN once the cohort is censored
+        cohort_hazard = np.where(at_risk_cohort > 0, events / at_risk_cohort, 0.0)
+        cohort_survival = np.where(arrays.observed, np.cumprod(1 - cohort_hazard, axis=1), np.nan)
+
+    # The curve is only estimable while someone is still under observation
+    estimable = at_risk > 0
+    table = pd.DataFrame({
+        'Duration': arrays.durations,
+        'At_Risk': at_risk,
+        'Divorces': n_events,
+        'Hazard': hazard,
+        'Survival': survival,
+        'CI_Lower': np.nan_to_num(lower, nan=0.0),
+        'CI_Upper': np.nan_to_num(upper, nan=1.0),
+        'Ever_Divorced': 1 - survival,
+    })[estimable]
+    cohort_frame = pd.DataFrame(cohort_survival, index=pd.Index(arrays.cohorts, name='Cohort'),
+                                columns=pd.Index(arrays.durations, name='Duration'))
+    return LifeTable(table.reset_index(drop=True), cohort_frame)
+
+
+def kaplan_meier(divorces, marriages, group='Group', level=0.95, **kwargs):
+    """
+    Life tables for every couple type: dict group -> LifeTable
+    Arguments as in duration_arrays(); `group` names the couple-type column.
+    """
+    arrays = duration_arrays(divorces, marriages, group=group, **kwargs)
+    return {key: life_table(a, level) for key, a in arrays.items()}
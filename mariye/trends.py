@@ -0,0 +1,285 @@
+"""
+Rate trends: Poisson / binomial GLMs of yearly divorces, fitted in batch
+
+For every series g (couple type, or region x couple type, ...) the yearly
+divorces are modelled with the year's marriages as exposure:
+
+    poisson:   log E[divorces[t, g]] = log(marriages[t, g]) + x(t) . b[g]
+    binomial:  divorces[t, g] ~ Binomial(marriages[t, g], expit(x(t) . b[g]))
+
+x(t) is a polynomial in the centered year (degree 1: intercept and log rate
+ratio per year). A separate coefficient vector per series is the year x group
+interaction model. All series are fitted at once by iteratively reweighted
+least squares: each iteration solves one (series x k x k) batch of weighted
+normal equations, so hundreds of models cost little more than one.
+
+Standard errors are scaled by the Pearson dispersion (quasi-likelihood, never
+below 1), as the yearly counts vary more than a Poisson or binomial with a
+smooth trend allows. Bands are Wald intervals on the link scale for the
+same-year ratio, and delta-method intervals (log scale) for the modelled
+cumulative rate sum(marriages * fitted ratio) / sum(marriages) that fig1
+and the article chart show.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy import special
+
+from mariye.cohort import cohort_table
+
+FAMILIES = ('poisson', 'binomial')
+# The series of fig1
+DEFAULT_GROUPS = ('Male', 'Female', 'SameSex', 'Opposite')
+DEFAULT_DEGREE = 2
+MAX_ITER = 50
+# Relative deviance change at which a model has converged (as in R's glm)
+TOLERANCE = 1e-8
+# Linear predictors are clipped to keep exp/expit finite
+MAX_ETA = 30.0
+
+
+def design_matrix(years, degree=DEFAULT_DEGREE, center=None):
+    """(years x degree + 1) polynomial basis in year - center (default: mid-year)"""
+    years = np.asarray(years, dtype=np.float64)
+    if center is None:
+        center = (years.min() + years.max()) / 2 if len(years) else 0.0
+    return np.vander(years - center, degree + 1, increasing=True)
+
+
+def _inverse_link(eta, family):
+    # Fitted ratio per unit of exposure and its derivative d ratio / d eta
+    if family == 'poisson':
+        ratio = np.exp(eta)
+        return ratio, ratio
+    ratio = special.expit(eta)
+    return ratio, ratio * (1 - ratio)
+
+
+def _deviance(successes, trials, fitted, family):
+    # Unit deviances summed over years, one value per series
+    unit = special.xlogy(successes, successes / np.where(fitted > 0, fitted, 1))
+    if family == 'poisson':
+        unit -= successes - fitted
+    else:
+        failures, fitted_failures = trials - successes, trials - fitted
+        unit += special.xlogy(failures, failures / np.where(fitted_failures > 0, fitted_failures, 1))
+    return 2 * unit.sum(axis=-1)
+
+
+def _weights(eta, n, observed, family):
+    # IRLS quantities: fitted ratio, d ratio / d eta and the working weights
+    ratio, slope = _inverse_link(eta, family)
+    variance = ratio if family == 'poisson' else ratio * (1 - ratio)
+    weight = np.where(observed, n * slope**2 / np.maximum(variance, 1e-300), 0.0)
+    return ratio, slope, weight
+
+
+def _information(design, weight):
+    # X' W X for every series: (series x k x k)
+    return (design.T * weight[:, None, :]) @ design
+
+
+def _solve(matrix, rhs):
+    # Batched solve; a singular system anywhere falls back to the pseudo-inverse
+    try:
+        return np.linalg.solve(matrix, rhs[..., None])[..., 0]
+    except np.linalg.LinAlgError:
+        return (np.linalg.pinv(matrix) @ rhs[..., None])[..., 0]
+
+
+@dataclass(frozen=True)
+class GLMFit:
+    """Coefficients of a batch of GLMs sharing one design matrix"""
+    family: str
+    # (series x k)
+    coef: np.ndarray = field(repr=False)
+    # (series x k x k), scaled by the dispersion
+    cov: np.ndarray = field(repr=False)
+    dispersion: np.ndarray = field(repr=False)
+    deviance: np.ndarray = field(repr=False)
+    df_resid: np.ndarray = field(repr=False)
+    converged: np.ndarray = field(repr=False)
+    iterations: int = 0
+
+    def predict(self, design, level=0.95):
+        """
+        Fitted ratio per unit of exposure (series x rows of `design`) with
+        its Wald interval (lower, upper), computed on the link scale
+        """
+        eta = self.coef @ design.T
+        se = np.sqrt(np.einsum('tk,bkl,tl->bt', design, self.cov, design))
+        z = -special.ndtri((1 - level) / 2)
+        return tuple(_inverse_link(np.clip(bound, -MAX_ETA, MAX_ETA), self.family)[0]
+                     for bound in (eta, eta - z * se, eta + z * se))
+
+    def cumulative(self, design, trials, level=0.95):
+        """
+        Modelled cumulative rate cumsum(trials * ratio) / cumsum(trials) per
+        series with its delta-method interval on the log scale (NaN before
+        the first exposure)
+        """
+        trials = np.asarray(trials, dtype=np.float64)
+        eta = np.clip(self.coef @ design.T, -MAX_ETA, MAX_ETA)
+        ratio, slope = _inverse_link(eta, self.family)
+        exposure = np.cumsum(trials, axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rate = np.cumsum(trials * ratio, axis=-1) / exposure
+            # d rate / d coef: (series x years x k)
+            gradient = np.cumsum((trials * slope)[..., None] * design, axis=-2) / exposure[..., None]
+            log_se = np.sqrt(np.einsum('btk,bkl,btl->bt', gradient, self.cov, gradient)) / rate
+        z = -special.ndtri((1 - level) / 2)
+        return rate, rate * np.exp(-z * log_se), rate * np.exp(z * log_se)
+
+
+def fit_glm(design, successes, trials, family='poisson', dispersion='pearson',
+            max_iter=MAX_ITER, tol=TOLERANCE):
+    """
+    Fit one GLM per row of `successes` / `trials` (series x years) on the
+    shared (years x k) `design` by batched IRLS
+    `trials` is the exposure (poisson) or the number of trials (binomial);
+    years without exposure get zero weight, series without any get NaN
+    coefficients. Converged series drop out of later iterations.
+    dispersion='pearson' scales the covariance by max(1, Pearson chi2 / df),
+    None keeps it at 1.
+    """
+    if family not in FAMILIES:
+        raise ValueError(f'family must be one of {FAMILIES}')
+    design = np.asarray(design, dtype=np.float64)
+    successes = np.atleast_2d(np.asarray(successes, dtype=np.float64))
+    trials = np.atleast_2d(np.asarray(trials, dtype=np.float64))
+    if (successes < 0).any() or (family == 'binomial' and (successes > trials).any()):
+        raise ValueError('counts must satisfy 0 <= successes (<= trials for binomial)')
+
+    observed = trials > 0
+    n = np.where(observed, trials, 1.0)
+    # Start from the observed ratios, pulled off 0 (and 1)
+    if family == 'poisson':
+        eta = np.log((successes + 0.5) / (n + 0.5))
+    else:
+        eta = special.logit((successes + 0.5) / (n + 1))
+    coef = np.zeros((len(successes), design.shape[1]))
+    deviance = np.full(len(successes), np.inf)
+    converged = np.zeros(len(successes), dtype=bool)
+    # Series still iterating; those without any exposure are left out
+    active = np.flatnonzero(observed.any(axis=-1))
+
+    iteration = 0
+    while len(active) and iteration < max_iter:
+        iteration += 1
+        ratio, slope, weight = _weights(eta[active], n[active], observed[active], family)
+        working = eta[active] + (successes[active] / n[active] - ratio) / np.maximum(slope, 1e-300)
+        coef[active] = _solve(_information(design, weight), (weight * working) @ design)
+        eta[active] = np.clip(coef[active] @ design.T, -MAX_ETA, MAX_ETA)
+
+        fitted = np.where(observed[active], n[active] * _inverse_link(eta[active], family)[0], 0.0)
+        previous = deviance[active]
+        deviance[active] = _deviance(successes[active], trials[active], fitted, family)
+        done = np.abs(deviance[active] - previous) / (np.abs(deviance[active]) + 0.1) < tol
+        converged[active[done]] = True
+        active = active[~done]
+
+    ratio, _, weight = _weights(eta, n, observed, family)
+    variance = ratio if family == 'poisson' else ratio * (1 - ratio)
+    df_resid = observed.sum(axis=-1) - design.shape[1]
+    scale = np.ones(len(successes))
+    if dispersion == 'pearson':
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pearson = np.where(observed, (successes - n * ratio)**2 / (n * variance), 0.0).sum(axis=-1)
+            scale = np.where(df_resid > 0, np.maximum(1.0, pearson / df_resid), 1.0)
+    cov = np.linalg.pinv(_information(design, weight)) * scale[:, None, None]
+    # Series without any exposure have no estimate
+    empty = ~observed.any(axis=-1)
+    coef[empty], cov[empty] = np.nan, np.nan
+    return GLMFit(family, coef, cov, scale, deviance, df_resid, converged, iteration)
+
+
+def _term_names(degree):
+    return ['Intercept', 'Year'] + [f'Year^{d}' for d in range(2, degree + 1)]
+
+
+@dataclass(frozen=True)
+class TrendFit:
+    """Fitted yearly and cumulative trends (percent) per couple type"""
+    version: str
+    family: str
+    degree: int
+    groups: tuple
+    level: float
+    # One row per year x group: Year, Group, Marriages, Divorces, Ratio
+    # (observed same-year ratio), Fitted, Lower, Upper, Rate (observed
+    # cumulative rate), Cum_Fitted, Cum_Lower, Cum_Upper
+    table: pd.DataFrame = field(repr=False)
+    # One row per group x term: Estimate, SE, P_Value (Wald) and for the
+    # Year term Rate_Ratio with Lower/Upper (per year, at the center year);
+    # plus Dispersion, Deviance, Converged of the group's model
+    coefficients: pd.DataFrame = field(repr=False)
+
+    def group(self, key):
+        """Yearly rows of one group"""
+        return self.table[self.table['Group'] == key].reset_index(drop=True)
+
+
+def fit_trends(analysis, groups=DEFAULT_GROUPS, family='poisson', degree=DEFAULT_DEGREE, level=0.95):
+    """
+    Trend model of the yearly divorces of `groups` (see the module docstring),
+    all groups in one batch
+    """
+    groups = tuple(groups)
+    df = analysis.df
+    table = cohort_table(df, groups=groups)
+    shape = (len(df), len(groups))
+    # (groups x years) batches
+    marriages = table['Marriages'].to_numpy(dtype=np.float64).reshape(shape).T
+    divorces = table['Divorces'].to_numpy(dtype=np.float64).reshape(shape).T
+
+    design = design_matrix(df['Year'], degree)
+    fit = fit_glm(design, divorces, marriages, family)
+    fitted, lower, upper = fit.predict(design, level)
+    cum_fitted, cum_lower, cum_upper = fit.cumulative(design, marriages, level)
+
+    table = table.drop(columns=['CI_Lower', 'CI_Upper']).rename(columns={'Rate': 'Ratio'})
+    table['Rate'] = df[[f'Rate_{g}' for g in groups]].to_numpy().ravel()
+    for column, values in [('Fitted', fitted), ('Lower', lower), ('Upper', upper),
+                           ('Cum_Fitted', cum_fitted), ('Cum_Lower', cum_lower),
+                           ('Cum_Upper', cum_upper)]:
+        table[column] = values.T.ravel() * 100
+
+    terms = _term_names(degree)
+    se = np.sqrt(np.diagonal(fit.cov, axis1=1, axis2=2))
+    z = -special.ndtri((1 - level) / 2)
+    coefficients = pd.DataFrame({
+        'Group': np.repeat(groups, len(terms)),
+        'Term': np.tile(terms, len(groups)),
+        'Estimate': fit.coef.ravel(),
+        'SE': se.ravel(),
+        'P_Value': (2 * special.ndtr(-np.abs(fit.coef / se))).ravel(),
+        'Dispersion': np.repeat(fit.dispersion, len(terms)),
+        'Deviance': np.repeat(fit.deviance, len(terms)),
+        'Converged': np.repeat(fit.converged, len(terms)),
+    })
+    year = coefficients['Term'] == 'Year'
+    estimate, year_se = coefficients.loc[year, 'Estimate'], coefficients.loc[year, 'SE']
+    coefficients.loc[year, 'Rate_Ratio'] = np.exp(estimate)
+    coefficients.loc[year, 'Lower'] = np.exp(estimate - z * year_se)
+    coefficients.loc[year, 'Upper'] = np.exp(estimate + z * year_se)
+    return TrendFit(analysis.version, family, degree, groups, level, table, coefficients)
+
+
+_trends = {}
+
+
+def load_trends(analysis, groups=DEFAULT_GROUPS, family='poisson', degree=DEFAULT_DEGREE, level=0.95):
+    """fit_trends(), memoized per dataset version and settings"""
+    key = (analysis.version, tuple(groups), family, degree, level)
+    if key not in _trends:
+        _trends[key] = fit_trends(analysis, groups, family, degree, level)
+    return _trends[key]
+
+
+def clear(version=None):
+    """Drop memoized trend fits from memory, for one dataset version or all"""
+    for key in list(_trends):
+        if version is None or key[0] == version:
+            del _trends[key]
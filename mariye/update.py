@@ -0,0 +1,163 @@
+"""
+Incremental yearly updates: add a newly published year without a full rebuild
+
+    python -m mariye.update --year 2025 Marriages_Opposite=... Divorces_Opposite=... \
+        Marriages_Male=... Marriages_Female=... Divorces_Male=... Divorces_Female=... \
+        [--source pxweb|bundled|FILE.json] [--out FILE.json] [--verify]
+    python -m mariye.update --verify    # check the current dataset
+
+A dataset that only appends years to an already analysed one is extended from
+the previous state (mariye.core.append_years): the cumulative columns continue
+from the last row, the per-group totals are incremented, and the cached
+yearly-series figures get the new points appended (mariye.figures.extend).
+--verify rebuilds everything from scratch and checks the incremental result
+is identical.
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import fields
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mariye import core, figures
+from mariye.data import dataset_version
+from mariye.pxweb import load_source
+
+
+def append_year(data, year, counts):
+    """New dataset dict: `data` plus one year of counts (column -> count for every COUNT_COLUMNS entry)"""
+    missing = [c for c in core.COUNT_COLUMNS if c not in counts]
+    if missing:
+        raise ValueError(f"missing counts: {', '.join(missing)}")
+    if data['Year'] and int(year) <= max(data['Year']):
+        raise ValueError(f"year {year} is not after {max(data['Year'])}")
+    updated = {column: list(values) for column, values in data.items()}
+    updated['Year'].append(int(year))
+    for column in core.COUNT_COLUMNS:
+        updated[column].append(int(counts[column]))
+    return updated
+
+
+def load_incremental(data):
+    """
+    mariye.core.load_analysis(data), plus carrying the cached figure specs
+    over when the analysis was extended from an earlier memoized version
+    """
+    if dataset_version(data) in core._analyses:
+        return core._analyses[dataset_version(data)]
+    base = core.base_analysis(data)
+    analysis = core.load_analysis(data)
+    if base is not None:
+        figures.extend(base, analysis)
+    return analysis
+
+
+def _same(a, b):
+    if isinstance(a, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(a, b, check_exact=True)
+            return True
+        except AssertionError:
+            return False
+    if isinstance(a, np.ndarray):
+        return np.array_equal(a, b, equal_nan=True)
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, float) and np.isnan(a):
+        return np.isnan(b)
+    return a == b
+
+
+def verify(data, years=1):
+    """
+    Compare extending the first len - `years` years of `data` with a full
+    rebuild: every Analysis field and the yearly-series figure specs must be
+    identical. Returns the names of the fields that differ (empty when OK).
+    """
+    base_data = {column: list(values[:len(values) - years]) for column, values in data.items()}
+    base = core.analyze(base_data)
+    incremental = core.append_years(base, data)
+    full = core.analyze(data)
+
+    mismatches = [f.name for f in fields(core.Analysis)
+                  if not _same(getattr(incremental, f.name), getattr(full, f.name))]
+    for name in figures.YEARLY_SERIES:
+        build = figures.FIGURES[name]
+        extended = figures.extend_spec(name, build(base).to_json(), base, incremental)
+        if json.loads(extended) != json.loads(build(full).to_json()):
+            mismatches.append(name)
+    return mismatches
+
+
+def _parse_counts(items):
+    counts = {}
+    for item in items:
+        column, sep, value = item.partition('=')
+        if not sep or column not in core.COUNT_COLUMNS:
+            raise ValueError(f"expected COLUMN=COUNT with COLUMN one of {', '.join(core.COUNT_COLUMNS)}: {item}")
+        counts[column] = int(value)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m mariye.update',
+        description='Append a year of counts to the dataset, updating the analysis incrementally.'
+    )
+    parser.add_argument('counts', nargs='*', metavar='COLUMN=COUNT',
+                        help=f"counts of the new year: {', '.join(core.COUNT_COLUMNS)}")
+    parser.add_argument('-y', '--year', type=int, help='year to append')
+    parser.add_argument('-s', '--source', default='pxweb',
+                        help="dataset to extend: 'pxweb' (cached table, default), 'bundled' or a JSON file "
+                             "in the mariye.data.DATA layout")
+    parser.add_argument('-o', '--out', type=Path,
+                        help='write the updated dataset as JSON (usable as --source of mariye.report)')
+    parser.add_argument('--verify', action='store_true',
+                        help='check that the incremental result matches a full rebuild')
+    parser.add_argument('--offline', action='store_true', help='never touch the network')
+    args = parser.parse_args(argv)
+
+    data = load_source(args.source, offline=args.offline)
+    if args.year is not None:
+        try:
+            updated = append_year(data, args.year, _parse_counts(args.counts))
+        except ValueError as exc:
+            parser.error(str(exc))
+        core.load_analysis(data)
+    elif args.counts:
+        parser.error('counts given without --year')
+    else:
+        updated = data
+
+    start = time.perf_counter()
+    analysis = load_incremental(updated)
+    elapsed = time.perf_counter() - start
+
+    last = analysis.df.iloc[-1]
+    print(f"dataset {analysis.version}: {analysis.df['Year'].iloc[0]}-{int(last['Year'])}, "
+          f"updated in {elapsed * 1000:.1f} ms")
+    for key in core.GROUPS:
+        group = analysis.groups[key]
+        print(f"  {group.label:28s} {group.divorces:6d}/{group.marriages:<7d} = {group.rate * 100:6.2f}% "
+              f"[{group.ci_lower * 100:.2f}% - {group.ci_upper * 100:.2f}%]")
+
+    if args.out is not None:
+        args.out.write_text(json.dumps(updated, indent=1), encoding='utf-8')
+        print(f'wrote {args.out}')
+
+    if args.verify:
+        mismatches = verify(updated)
+        if mismatches:
+            print(f"verify: incremental result differs from a full rebuild in {', '.join(mismatches)}")
+            return 1
+        print('verify: incremental result matches a full rebuild')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Shared fixtures: a fake PxWeb API serving the bundled counts as json-stat2
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mariye.data import DATA
+
+CONTENT = {
+    'Marriages_Opposite': ('vihit_eri', 'Vihityt, eri sukupuolta olevat'),
+    'Marriages_Male': ('vihit_m', 'Vihityt, miesparit'),
+    'Marriages_Female': ('vihit_n', 'Vihityt, naisparit'),
+    'Divorces_Opposite': ('ero_eri', 'Avioerot, eri sukupuolta olevat'),
+    'Divorces_Male': ('ero_m', 'Avioerot, miesparit'),
+    'Divorces_Female': ('ero_n', 'Avioerot, naisparit'),
+}
+
+
+def json_stat2(data):
+    """json-stat2 dataset (year x content) of a dataset dict like DATA"""
+    return {
+        'id': ['Vuosi', 'Tiedot'],
+        'size': [len(data['Year']), len(CONTENT)],
+        'dimension': {
+            'Vuosi': {'category': {'index': [str(year) for year in data['Year']]}},
+            'Tiedot': {'category': {'index': [code for code, _ in CONTENT.values()],
+                                    'label': dict(CONTENT.values())}},
+        },
+        'value': [data[column][i] for i in range(len(data['Year'])) for column in CONTENT],
+    }
+
+
+class FakePxWeb:
+    """
+    PxWeb stand-in on a local port: answers every table POST with `payload`,
+    honours If-None-Match / If-Modified-Since with 304 and records the
+    request headers. `status` other than 200 makes it fail.
+    """
+
+    def __init__(self):
+        self.payload = json_stat2(DATA)
+        self.etag = '"v1"'
+        self.last_modified = 'Wed, 01 Oct 2025 08:00:00 GMT'
+        self.status = 200
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers['Content-Length']))
+                fake.requests.append(dict(self.headers))
+                if fake.status != 200:
+                    self.send_response(fake.status)
+                    self.end_headers()
+                    return
+                if ((fake.etag and self.headers.get('If-None-Match') == fake.etag)
+                        or (not fake.etag and fake.last_modified
+                            and self.headers.get('If-Modified-Since') == fake.last_modified)):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = fake.body()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if fake.etag:
+                    self.send_header('ETag', fake.etag)
+                if fake.last_modified:
+                    self.send_header('Last-Modified', fake.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/api'
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def body(self):
+        return json.dumps(self.payload).encode('utf-8')
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_pxweb():
+    fake = FakePxWeb()
+    yield fake
+    fake.close()
+
+
+@pytest.fixture
+def unreachable_url():
+    """API root on a local port nothing listens on"""
+    fake = FakePxWeb()
+    url = fake.url
+    fake.close()
+    return url
@@ -0,0 +1,134 @@
+"""
+The built-in HTTP/1.1 server of mariye.api: limits, timeouts and errors
+"""
+
+import asyncio
+import json
+import re
+
+import pytest
+
+from mariye import api
+
+
+async def hello(scope, receive, send):
+    # Minimal ASGI application answering every request with its path
+    body = scope['path'].encode('utf-8')
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-length', str(len(body)).encode('latin-1'))]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def broken(scope, receive, send):
+    if scope['path'] == '/late':
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    raise RuntimeError('route failed')
+
+
+@pytest.fixture(autouse=True)
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(api, 'REQUEST_TIMEOUT', 0.3)
+    monkeypatch.setattr(api, 'IDLE_TIMEOUT', 0.3)
+
+
+def exchange(application, *chunks, pause=0.0):
+    """
+    Send `chunks` (pausing between them) on one connection to the built-in
+    server running `application`; returns everything read until it closes
+    """
+    async def run():
+        server = await asyncio.start_server(
+            lambda reader, writer: api._serve_connection(application, reader, writer), '127.0.0.1', 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            for i, chunk in enumerate(chunks):
+                if i and pause:
+                    await asyncio.sleep(pause)
+                writer.write(chunk)
+                await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+    return asyncio.run(run())
+
+
+def statuses(response):
+    return [int(status) for status in re.findall(rb'HTTP/1\.1 (\d{3}) ', response)]
+
+
+def json_body(response):
+    return json.loads(response.partition(b'\r\n\r\n')[2])
+
+
+def test_keep_alive_serves_requests_until_idle():
+    response = exchange(hello, b'GET /a HTTP/1.1\r\nhost: x\r\n\r\nGET /b HTTP/1.1\r\nhost: x\r\n\r\n')
+
+    assert statuses(response) == [200, 200]
+    assert response.endswith(b'/b')
+
+
+def test_oversized_body_is_rejected():
+    length = api.MAX_BODY + 1
+    response = exchange(hello, f'POST / HTTP/1.1\r\ncontent-length: {length}\r\n\r\n'.encode('latin-1'))
+
+    assert statuses(response) == [413]
+    assert b'connection: close' in response
+    assert 'limited' in json_body(response)['error']
+
+
+@pytest.mark.parametrize('header, status', [(b'content-length: many', 400),
+                                            (b'content-length: -1', 413),
+                                            (b'transfer-encoding: chunked', 411)])
+def test_malformed_body_framing_is_rejected(header, status):
+    response = exchange(hello, b'POST / HTTP/1.1\r\n' + header + b'\r\n\r\n')
+
+    assert statuses(response) == [status]
+
+
+def test_too_many_headers_are_rejected():
+    headers = b''.join(b'x-%d: 1\r\n' % i for i in range(api.MAX_HEADERS + 1))
+    response = exchange(hello, b'GET / HTTP/1.1\r\n' + headers + b'\r\n')
+
+    assert statuses(response) == [431]
+
+
+def test_slow_request_times_out():
+    # Headers trickling in slower than REQUEST_TIMEOUT allows
+    response = exchange(hello, b'GET / HTTP/1.1\r\n', b'host: x\r\n', b'\r\n', pause=0.2)
+
+    assert statuses(response) == [408]
+
+
+def test_idle_connection_is_closed():
+    assert exchange(hello, b'GET', pause=0) == b''
+
+
+def test_failing_route_answers_500():
+    response = exchange(broken, b'GET /early HTTP/1.1\r\n\r\nGET /early HTTP/1.1\r\n\r\n')
+
+    assert statuses(response) == [500]
+    assert json_body(response) == {'error': 'internal server error'}
+
+
+def test_failure_after_response_start_closes_connection():
+    response = exchange(broken, b'GET /late HTTP/1.1\r\n\r\n')
+
+    assert statuses(response) == [200]
+    assert not response.endswith(b'0\r\n\r\n')
+
+
+def test_api_error_in_endpoint_answers_500(monkeypatch):
+    application = api.Api('bundled')
+    monkeypatch.setitem(api.ROUTES, '/v1/summary', lambda analysis: 1 / 0)
+
+    response = exchange(application, b'GET /v1/summary HTTP/1.1\r\n\r\nGET /v1 HTTP/1.1\r\n\r\n')
+
+    assert statuses(response) == [500]
+
+
+def test_api_serves_summary():
+    response = exchange(api.Api('bundled'), b'GET /v1/summary HTTP/1.1\r\nconnection: close\r\n\r\n')
+
+    assert statuses(response) == [200]
+    assert set(json_body(response)) >= {'groups'}
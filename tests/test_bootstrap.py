@@ -0,0 +1,82 @@
+"""
+mariye.bootstrap: reproducible BCa intervals and cells without divorces
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mariye.bootstrap import CHUNK_RESAMPLES, STATISTICS, bootstrap_pair
+from mariye.core import analyze
+from mariye.data import DATA
+
+# Three random streams, so that several threads have work
+RESAMPLES = 3 * CHUNK_RESAMPLES
+
+
+@pytest.fixture(scope='module')
+def analysis():
+    return analyze(DATA)
+
+
+def without_divorces(*columns):
+    return analyze({column: [0] * len(values) if column in columns else list(values)
+                    for column, values in DATA.items()})
+
+
+def test_seeded_intervals_are_reproducible(analysis):
+    first = bootstrap_pair(analysis, resamples=RESAMPLES, seed=11)
+    again = bootstrap_pair(analysis, resamples=RESAMPLES, seed=11)
+    other = bootstrap_pair(analysis, resamples=RESAMPLES, seed=12)
+
+    pd.testing.assert_frame_equal(first.table, again.table)
+    assert not first.table[['BCa_Lower', 'BCa_Upper']].equals(other.table[['BCa_Lower', 'BCa_Upper']])
+
+
+@pytest.mark.parametrize('workers', [2, 3, 8])
+def test_intervals_do_not_depend_on_the_thread_count(analysis, workers):
+    single = bootstrap_pair(analysis, resamples=RESAMPLES, seed=11, workers=1)
+
+    threaded = bootstrap_pair(analysis, resamples=RESAMPLES, seed=11, workers=workers)
+
+    pd.testing.assert_frame_equal(single.table, threaded.table)
+
+
+def test_intervals_contain_the_estimates(analysis):
+    table = bootstrap_pair(analysis, resamples=RESAMPLES).table
+
+    assert list(table.index) == list(STATISTICS)
+    for lower, upper in (('Lower', 'Upper'), ('BCa_Lower', 'BCa_Upper')):
+        assert (table[lower] < table['Estimate']).all()
+        assert (table['Estimate'] < table[upper]).all()
+
+
+def test_group_without_divorces_gets_a_point_interval():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        table = bootstrap_pair(without_divorces('Divorces_Female'), resamples=20_000).table
+
+    for statistic in ('Rate_A', 'Risk_Ratio', 'Odds_Ratio'):
+        assert table.loc[statistic, ['Estimate', 'Lower', 'Upper', 'BCa_Lower', 'BCa_Upper']].eq(0).all()
+    assert table.loc['Cohens_H', 'BCa_Lower'] < table.loc['Cohens_H', 'Estimate'] < table.loc['Cohens_H', 'BCa_Upper']
+
+
+def test_reference_group_without_divorces_gives_infinite_ratios():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        result = bootstrap_pair(without_divorces('Divorces_Male'), resamples=20_000)
+
+    assert result.interval('Risk_Ratio') == (np.inf, np.inf)
+    assert result.interval('Odds_Ratio', 'percentile') == (np.inf, np.inf)
+    assert np.isfinite(result.interval('Difference')).all()
+
+
+def test_no_divorces_at_all_leaves_the_ratios_undefined():
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        table = bootstrap_pair(without_divorces('Divorces_Female', 'Divorces_Male'), resamples=20_000).table
+
+    assert table.loc[['Risk_Ratio', 'Odds_Ratio']].isna().all().all()
+    assert table.loc['Difference', ['Lower', 'Upper', 'BCa_Lower', 'BCa_Upper']].eq(0).all()
@@ -0,0 +1,47 @@
+"""
+mariye.cache.invalidate: st.cache_data entries and the modules' own memos
+"""
+
+import pytest
+
+pytest.importorskip('streamlit')
+
+from mariye import bayes, bootstrap, cache, core, hierarchical, trends
+from mariye.data import DATA, dataset_version
+
+PREVIOUS = {column: values[:-1] for column, values in DATA.items()}
+MEMOS = {core: '_analyses', bayes: '_comparisons', bootstrap: '_results',
+         hierarchical: '_fits', trends: '_trends'}
+
+
+def versions(module):
+    # Dataset versions held by a module's memo (keys are versions or tuples starting with one)
+    return {key if isinstance(key, str) else key[0] for key in getattr(module, MEMOS[module])}
+
+
+@pytest.fixture
+def memoized():
+    cache.invalidate()
+    for data in (PREVIOUS, DATA):
+        analysis = core.load_analysis(data)
+        bayes.load_comparison(analysis, draws=1_000)
+        bootstrap.load_bootstrap(analysis, resamples=1_000)
+        hierarchical.load_fit(analysis)
+        trends.load_trends(analysis)
+    yield
+    cache.invalidate()
+
+
+def test_invalidate_clears_every_module_memo(memoized):
+    assert all(versions(module) == {dataset_version(PREVIOUS), dataset_version(DATA)} for module in MEMOS)
+
+    cache.invalidate()
+
+    assert all(not versions(module) for module in MEMOS)
+
+
+def test_invalidate_one_version_keeps_the_others(memoized):
+    cache.invalidate(DATA)
+
+    assert all(versions(module) == {dataset_version(PREVIOUS)} for module in MEMOS)
+    assert core.load_analysis(PREVIOUS) is core._analyses[dataset_version(PREVIOUS)]
@@ -0,0 +1,35 @@
+"""
+mariye.export: the Excel workbook reads back as the exported table
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+from mariye import export
+from mariye.core import analyze
+from mariye.data import DATA
+
+
+@pytest.fixture
+def analysis():
+    export.clear()
+    yield analyze(DATA)
+    export.clear()
+
+
+def test_excel_is_available():
+    assert 'xlsx' in export.available_formats()
+
+
+@pytest.mark.parametrize('name', ['yearly', 'groups'])
+def test_excel_round_trip(analysis, name):
+    frame = export.TABLES[name].build(analysis)
+
+    payload = export.export_bytes(name, analysis, 'xlsx')
+    read = pd.read_excel(io.BytesIO(payload), sheet_name=name)
+
+    assert payload[:2] == b'PK'
+    assert export.filename(name, 'xlsx').endswith('.xlsx')
+    pd.testing.assert_frame_equal(read, frame.reset_index(drop=True), check_dtype=False, check_categorical=False)
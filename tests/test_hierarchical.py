@@ -0,0 +1,65 @@
+"""
+mariye.hierarchical: per-group priors and shrinkage on synthetic years
+"""
+
+import numpy as np
+import pytest
+
+from mariye.core import analyze
+from mariye.hierarchical import _objective, fit_yearly
+
+YEARS = list(range(2015, 2025))
+
+
+@pytest.fixture(scope='module')
+def synthetic():
+    # Same-sex years share one rate (differences are binomial noise only);
+    # opposite-sex ratios drift from 40% to 70% on large counts
+    rng = np.random.default_rng(57)
+    marriages = {'Male': rng.integers(60, 200, len(YEARS)), 'Female': rng.integers(100, 300, len(YEARS)),
+                 'Opposite': rng.integers(20_000, 25_000, len(YEARS))}
+    rates = {'Male': np.full(len(YEARS), 0.15), 'Female': np.full(len(YEARS), 0.2),
+             'Opposite': np.linspace(0.4, 0.7, len(YEARS))}
+    data = {'Year': YEARS}
+    for key in ('Opposite', 'Male', 'Female'):
+        data[f'Marriages_{key}'] = marriages[key].tolist()
+        data[f'Divorces_{key}'] = rng.binomial(marriages[key], rates[key]).tolist()
+    return analyze(data)
+
+
+def test_homogeneous_groups_are_shrunk_strongly(synthetic):
+    fit = fit_yearly(synthetic)
+
+    for key in ('Male', 'Female'):
+        rows = fit.group(key)
+        assert fit.concentration[key] > 10 * rows['Marriages'].max()
+        assert (rows['Weight'] < 0.1).all()
+        # Pooled estimates: almost flat, far less spread than the raw ratios
+        assert rows['EB_Rate'].std() < 0.1 * rows['Rate'].std()
+        pooled = rows['Divorces'].sum() / rows['Marriages'].sum() * 100
+        np.testing.assert_allclose(rows['EB_Rate'], pooled, atol=0.5)
+
+
+def test_drifting_group_does_not_weaken_the_others(synthetic):
+    fit = fit_yearly(synthetic)
+
+    # The drifting opposite-sex years keep their own ratios
+    opposite = fit.group('Opposite')
+    assert fit.concentration['Opposite'] < 0.1 * opposite['Marriages'].min()
+    np.testing.assert_allclose(opposite['EB_Rate'], opposite['Rate'], atol=0.1)
+    assert fit.concentration['Opposite'] < fit.concentration['Male']
+
+
+def test_objective_gradient_matches_finite_differences(synthetic):
+    table = fit_yearly(synthetic).table
+    shape = (len(YEARS), 3)
+    successes = table['Divorces'].to_numpy(dtype=np.float64).reshape(shape)
+    trials = table['Marriages'].to_numpy(dtype=np.float64).reshape(shape)
+    params = np.array([-1.7, -1.4, 0.2, np.log(300.0), np.log(50.0), np.log(20.0)])
+
+    # Central differences; the log likelihood is large, so the step is not tiny
+    step = 1e-5
+    numeric = [(_objective(params + step * e, successes, trials)[0]
+                - _objective(params - step * e, successes, trials)[0]) / (2 * step) for e in np.eye(len(params))]
+
+    np.testing.assert_allclose(_objective(params, successes, trials)[1], numeric, rtol=1e-5, atol=1e-5)
@@ -0,0 +1,58 @@
+"""
+mariye.power: exact power against brute-force enumeration, minimal sample sizes
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from mariye.power import exact_power, planning_power, power_grid, rejection_region, sample_size
+
+
+def brute_force_rejection(n1, n2, alpha):
+    # Every outcome (x1, x2) tested with scipy's two-sided Fisher test
+    return np.array([[stats.fisher_exact([[x1, n1 - x1], [x2, n2 - x2]])[1] <= alpha
+                      for x2 in range(n2 + 1)] for x1 in range(n1 + 1)])
+
+
+SIZES = [(5, 5), (8, 13), (20, 6), (15, 15)]
+
+
+@pytest.mark.parametrize('n1, n2', SIZES)
+@pytest.mark.parametrize('alpha', [0.05, 0.1])
+def test_rejection_region_matches_fisher_exact(n1, n2, alpha):
+    np.testing.assert_array_equal(rejection_region(n1, n2, alpha), brute_force_rejection(n1, n2, alpha))
+
+
+@pytest.mark.parametrize('n1, n2', SIZES)
+def test_exact_power_matches_enumeration(n1, n2):
+    p1 = np.array([0.05, 0.2, 0.5, 0.7])
+    p2 = np.array([0.1, 0.3, 0.6, 0.95])
+    rejected = brute_force_rejection(n1, n2, 0.05)
+
+    b1 = stats.binom.pmf(np.arange(n1 + 1)[None, :], n1, p1[:, None])
+    b2 = stats.binom.pmf(np.arange(n2 + 1)[None, :], n2, p2[:, None])
+    expected = np.einsum('pi,ij,qj->pq', b1, rejected, b2)
+
+    np.testing.assert_allclose(power_grid(n1, n2, p1, p2), expected, atol=1e-12)
+    np.testing.assert_allclose(exact_power(n1, n2, p1, p2), np.diag(expected), atol=1e-12)
+
+
+@pytest.mark.parametrize('p1, p2, ratio, power', [
+    (0.2, 0.5, 1.0, 0.8),
+    (0.1, 0.3, 1.0, 0.9),
+    (0.6, 0.3, 2.0, 0.8),
+    (0.14, 0.21, 1.0, 0.8),
+])
+def test_sample_size_is_minimal(p1, p2, ratio, power):
+    n = sample_size(p1, p2, ratio, power)
+
+    def achieved(n1):
+        return planning_power(n1, max(1, round(n1 * ratio)), p1, p2)
+
+    assert achieved(n) >= power
+    assert achieved(n - 1) < power
+
+
+def test_sample_size_gives_up_above_max_n():
+    assert sample_size(0.20, 0.21, max_n=500) is None
@@ -0,0 +1,165 @@
+"""
+mariye.pxweb against a fake PxWeb server: fetching, revalidation, the .npy
+cache and the fallbacks
+"""
+
+import hashlib
+import json
+
+import numpy as np
+import pytest
+
+from mariye import pxweb
+from mariye.data import DATA
+
+
+def cache_files(cache_dir):
+    return sorted(path.name for path in cache_dir.iterdir())
+
+
+def meta_of(cache_dir):
+    _, meta_path = pxweb._cache_paths(pxweb.TABLE, None, cache_dir)
+    return json.loads(meta_path.read_text(encoding='utf-8'))
+
+
+def test_first_fetch_writes_content_hash_npy(fake_pxweb, tmp_path):
+    cube, meta = pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    assert len(fake_pxweb.requests) == 1
+    assert 'If-None-Match' not in fake_pxweb.requests[0]
+    assert pxweb.to_dataset(cube, meta) == DATA
+    assert isinstance(cube.values, np.memmap)
+    assert cube.values.dtype == np.uint16
+
+    content_hash = hashlib.sha256(fake_pxweb.body()).hexdigest()
+    data_path, meta_path = pxweb._cache_paths(pxweb.TABLE, None, tmp_path)
+    values_file = f'{data_path.stem}-{content_hash[:12]}.npy'
+    assert cache_files(tmp_path) == sorted([values_file, meta_path.name])
+    stored = meta_of(tmp_path)
+    assert stored['content_hash'] == content_hash
+    assert stored['etag'] == fake_pxweb.etag
+    assert stored['cube']['values'] == values_file
+    assert stored['cube']['missing'] is None
+    assert stored['cube']['shape'] == [len(DATA['Year']), 6]
+
+
+def test_fresh_cache_skips_network(fake_pxweb, tmp_path):
+    pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+    frame, meta = pxweb.load_table(cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    assert len(fake_pxweb.requests) == 1
+    assert pxweb.to_dataset(frame, meta) == DATA
+
+
+def test_etag_revalidation_keeps_cached_copy(fake_pxweb, tmp_path):
+    pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+    files = cache_files(tmp_path)
+    checked_at = meta_of(tmp_path)['checked_at']
+
+    cube, meta = pxweb.load_cube(refresh=True, cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    assert fake_pxweb.requests[-1]['If-None-Match'] == fake_pxweb.etag
+    assert cache_files(tmp_path) == files
+    assert meta_of(tmp_path)['checked_at'] >= checked_at
+    assert pxweb.to_dataset(cube, meta) == DATA
+
+
+def test_expired_cache_revalidates_with_if_modified_since(fake_pxweb, tmp_path):
+    fake_pxweb.etag = None
+    pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    cube, meta = pxweb.load_cube(max_age=0, cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    request = fake_pxweb.requests[-1]
+    assert 'If-None-Match' not in request
+    assert request['If-Modified-Since'] == fake_pxweb.last_modified
+    assert len(fake_pxweb.requests) == 2
+    assert pxweb.to_dataset(cube, meta) == DATA
+
+
+def test_changed_table_replaces_npy_and_old_map_stays_readable(fake_pxweb, tmp_path):
+    old_cube, old_meta = pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+    old_total = int(old_cube.values.sum())
+
+    fake_pxweb.payload['value'][-1] += 1
+    fake_pxweb.payload['value'][0] = None
+    fake_pxweb.etag = '"v2"'
+    cube, meta = pxweb.load_cube(refresh=True, cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    assert meta['content_hash'] == hashlib.sha256(fake_pxweb.body()).hexdigest()
+    stem = f"{pxweb._cache_paths(pxweb.TABLE, None, tmp_path)[0].stem}-{meta['content_hash'][:12]}"
+    assert meta['cube']['values'] == f'{stem}.npy'
+    assert meta['cube']['missing'] == f'{stem}.missing.npy'
+    assert old_meta['cube']['values'] not in cache_files(tmp_path)
+    assert cube.missing[0, 0] and cube.missing.sum() == 1
+    assert cube.values[-1, -1] == DATA['Divorces_Female'][-1] + 1
+    # Unlinked, but the earlier mapping still reads the earlier version
+    assert int(old_cube.values.sum()) == old_total
+
+
+def test_unreachable_server_falls_back_to_stale_cache(fake_pxweb, tmp_path):
+    pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+    fake_pxweb.status = 503
+
+    with pytest.warns(UserWarning, match='Using cached'):
+        cube, meta = pxweb.load_cube(refresh=True, cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    assert pxweb.to_dataset(cube, meta) == DATA
+
+
+def test_offline_uses_cache_without_requests(fake_pxweb, tmp_path):
+    pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    cube, meta = pxweb.load_cube(offline=True, mmap=False, cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    assert len(fake_pxweb.requests) == 1
+    assert not isinstance(cube.values, np.memmap)
+    assert pxweb.to_dataset(cube, meta) == DATA
+
+
+def test_nothing_cached_and_unreachable_raises(unreachable_url, tmp_path):
+    with pytest.raises(pxweb.PxWebError):
+        pxweb.load_cube(cache_dir=tmp_path, api_url=unreachable_url)
+    with pytest.raises(pxweb.PxWebError, match='not cached'):
+        pxweb.load_cube(offline=True, cache_dir=tmp_path)
+
+
+def test_open_cube_reopens_memory_map(fake_pxweb, tmp_path):
+    cube, meta = pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+
+    reopened = pxweb.open_cube(meta, tmp_path)
+
+    assert isinstance(reopened.values, np.memmap)
+    assert str(reopened.values.filename) == str(tmp_path / meta['cube']['values'])
+    assert not reopened.values.flags.writeable
+    assert reopened.dims == cube.dims and reopened.codes == cube.codes
+    np.testing.assert_array_equal(reopened.values, cube.values)
+    copied = pxweb.open_cube(meta, tmp_path, mmap=False)
+    assert not isinstance(copied.values, np.memmap)
+    np.testing.assert_array_equal(copied.values, cube.values)
+
+
+def test_open_cube_rejects_mismatched_metadata(fake_pxweb, tmp_path):
+    _, meta = pxweb.load_cube(cache_dir=tmp_path, api_url=fake_pxweb.url)
+    meta['cube']['shape'] = [1, 6]
+
+    with pytest.raises(pxweb.PxWebError, match='does not match'):
+        pxweb.open_cube(meta, tmp_path)
+
+
+def test_load_dataset_reads_through_cache(fake_pxweb, tmp_path, monkeypatch):
+    monkeypatch.setattr(pxweb, 'API_URL', fake_pxweb.url)
+
+    assert pxweb.load_dataset(cache_dir=tmp_path) == DATA
+    assert pxweb.load_dataset(cache_dir=tmp_path) == DATA
+    assert len(fake_pxweb.requests) == 1
+
+
+def test_load_dataset_falls_back_to_bundled(unreachable_url, tmp_path, monkeypatch):
+    monkeypatch.setattr(pxweb, 'API_URL', unreachable_url)
+
+    with pytest.warns(UserWarning, match='Using bundled data'):
+        data = pxweb.load_dataset(cache_dir=tmp_path)
+
+    assert data is DATA
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,42 @@
+"""
+mariye.regions and the app's "Alueittain" view on an empty regional table
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from mariye import cache
+from mariye.core import COUNT_COLUMNS
+from mariye.data import DATA
+from mariye.regions import breakdown
+
+APP = Path(__file__).resolve().parent.parent / 'app.py'
+
+
+@pytest.fixture
+def empty_regional():
+    return pd.DataFrame({column: pd.Series(dtype='int64')
+                         for column in ('Region', 'Region_Label', 'Year', *COUNT_COLUMNS)})
+
+
+def test_breakdown_of_empty_frame_has_no_years(empty_regional):
+    result = breakdown(empty_regional)
+
+    assert result.years == ()
+    assert result.rates.empty and result.tests.empty
+
+
+def test_regions_tab_explains_empty_table(empty_regional, monkeypatch):
+    testing = pytest.importorskip('streamlit.testing.v1')
+    # Bundled counts instead of the (possibly stale or missing) PxWeb cache: no network access
+    monkeypatch.setattr(cache, '_cached_dataset', lambda: DATA)
+    monkeypatch.setattr(cache, 'load_region_breakdown', lambda: breakdown(empty_regional))
+    app = testing.AppTest.from_file(str(APP), default_timeout=120)
+    app.session_state['statistics_topic'] = '🗺️ Alueittain'
+
+    app.run()
+
+    assert not app.exception
+    assert 'ei ole yhtään riviä' in app.info[-1].value
@@ -0,0 +1,66 @@
+"""
+Input hashes of mariye.report targets and mariye.site pages: they change with
+any mariye module the output depends on, not only the builder itself
+"""
+
+import shutil
+
+import pytest
+
+from mariye import report, site
+
+
+@pytest.fixture
+def package_copy(tmp_path, monkeypatch):
+    """A copy of the mariye sources that the hashes are read from"""
+    copy = tmp_path / 'mariye'
+    shutil.copytree(report.PACKAGE_DIR, copy, ignore=shutil.ignore_patterns('__pycache__'))
+    monkeypatch.setattr(report, 'PACKAGE_DIR', copy)
+    return copy
+
+
+def edit(path, old, new):
+    text = path.read_text(encoding='utf-8')
+    assert old in text
+    path.write_text(text.replace(old, new), encoding='utf-8')
+
+
+def test_module_sources_follow_imports_transitively():
+    # charts imports trends inside functions; trends imports intervals
+    sources = report.module_sources('mariye.charts')
+
+    assert {'mariye.charts', 'mariye.trends', 'mariye.intervals'} <= set(sources)
+    assert 'mariye.api' not in sources
+    assert sources['mariye.trends'] == (report.PACKAGE_DIR / 'trends.py').read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('module, old, new', [
+    ('trends.py', 'DEFAULT_DEGREE = 2', 'DEFAULT_DEGREE = 1'),
+    ('core.py', 'import numpy as np', 'import numpy as np  # edited'),
+])
+def test_report_hash_changes_with_dependencies(package_copy, module, old, new):
+    target = report.TARGETS['article_main_chart']
+    before = report.input_hash(target, 'v1')
+
+    edit(package_copy / module, old, new)
+
+    assert report.input_hash(target, 'v1') != before
+
+
+def test_report_hash_ignores_unrelated_modules(package_copy):
+    target = report.TARGETS['article_main_chart']
+    before = report.input_hash(target, 'v1')
+
+    edit(package_copy / 'api.py', 'import asyncio', 'import asyncio  # edited')
+
+    assert report.input_hash(target, 'v1') == before
+    assert report.input_hash(target, 'v2') != before
+
+
+def test_site_hash_changes_with_dependencies(package_copy):
+    page = site.PAGES['index']
+    before = site.input_hash(page, 'v1')
+
+    edit(package_copy / 'intervals.py', 'import numpy as np', 'import numpy as np  # edited')
+
+    assert site.input_hash(page, 'v1') != before
@@ -0,0 +1,69 @@
+"""
+mariye.significance: batch Fisher tests against scipy and pairwise tests
+between groups
+"""
+
+import numpy as np
+import pytest
+from scipy import stats
+from scipy.stats.contingency import odds_ratio
+
+from mariye.significance import conditional_odds_ratio, fisher_test, pairwise
+
+
+@pytest.fixture(scope='module')
+def tables():
+    # Small and large counts, about a sixth of the cells zero (empty rows and
+    # columns included), plus a few fixed edge cases
+    rng = np.random.default_rng(2017)
+    small = rng.integers(0, 12, size=(400, 2, 2))
+    large = rng.integers(0, 3000, size=(200, 2, 2))
+    batch = np.concatenate([small, large])
+    batch[rng.random(batch.shape) < 0.15] = 0
+    edges = [[[0, 0], [0, 0]], [[0, 5], [0, 7]], [[3, 0], [0, 4]], [[0, 40], [25, 0]], [[1000, 0], [0, 1000]]]
+    return np.concatenate([batch, edges])
+
+
+@pytest.mark.parametrize('alternative', ['two-sided', 'less', 'greater'])
+def test_fisher_test_matches_scipy(tables, alternative):
+    expected = np.array([stats.fisher_exact(table, alternative=alternative) for table in tables])
+
+    sample_odds, p_value = fisher_test(tables, alternative=alternative)
+
+    np.testing.assert_array_equal(sample_odds, expected[:, 0])
+    np.testing.assert_allclose(p_value, expected[:, 1], rtol=1e-9, atol=1e-300)
+
+
+def test_fisher_test_keeps_the_batch_shape(tables):
+    odds, p_value = fisher_test(tables[:12].reshape(3, 4, 2, 2), alternative='less')
+
+    assert odds.shape == p_value.shape == (3, 4)
+    np.testing.assert_array_equal(p_value.ravel(), fisher_test(tables[:12], alternative='less')[1])
+
+
+def test_fisher_test_rejects_unknown_alternative():
+    with pytest.raises(ValueError, match='unknown alternative'):
+        fisher_test([[1, 2], [3, 4]], alternative='two_sided')
+
+
+def test_conditional_odds_ratio_matches_scipy(tables):
+    expected = np.array([odds_ratio(table, kind='conditional').statistic for table in tables])
+
+    result = conditional_odds_ratio(tables)
+
+    np.testing.assert_allclose(result, expected, rtol=1e-8)
+    np.testing.assert_array_equal(fisher_test(tables, conditional=True)[0], result)
+
+
+def test_pairwise_tests_every_pair():
+    result = pairwise([10, 20, 30], [100, 100, 100], ['a', 'b', 'c'])
+
+    assert list(zip(result['Group_A'], result['Group_B'])) == [('a', 'b'), ('a', 'c'), ('b', 'c')]
+    assert list(result['Rate_A']) == [10, 10, 20]
+    assert (result['P_Adjusted'] >= result['P_Value']).all()
+
+
+@pytest.mark.parametrize('labels', [[], ['a']])
+def test_pairwise_needs_two_groups(labels):
+    with pytest.raises(ValueError, match='at least 2 groups'):
+        pairwise([5] * len(labels), [50] * len(labels), labels)
@@ -0,0 +1,142 @@
+"""
+mariye.survival: Kaplan-Meier life tables on synthetic duration-by-cohort tables
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import special
+
+from mariye.survival import duration_arrays, kaplan_meier, life_table
+
+COHORTS = np.arange(2000, 2010)
+LAST_YEAR = 2012
+# Yearly divorce hazard per couple type
+HAZARDS = {'Male': 0.02, 'Female': 0.05}
+
+
+def long_tables(sizes, events):
+    # (cohorts x durations) arrays as long frames, observed cells only
+    rows = [{'Group': key, 'Cohort': c, 'Duration': d, 'Divorces': events[key][i, d]}
+            for key in events for i, c in enumerate(COHORTS) for d in range(LAST_YEAR - c + 1)]
+    marriages = pd.DataFrame([{'Group': key, 'Cohort': c, 'Marriages': sizes[key][i]}
+                              for key in sizes for i, c in enumerate(COHORTS)])
+    return pd.DataFrame(rows), marriages
+
+
+@pytest.fixture(scope='module')
+def expected_counts():
+    # Divorces exactly as a constant hazard implies: S(d) = (1 - h)^(d + 1)
+    durations = np.arange(LAST_YEAR - COHORTS.min() + 1)
+    sizes = {key: np.linspace(500, 1400, len(COHORTS)) for key in HAZARDS}
+    events = {key: sizes[key][:, None] * (1 - h) ** durations * h for key, h in HAZARDS.items()}
+    return long_tables(sizes, events)
+
+
+@pytest.fixture(scope='module')
+def random_counts():
+    rng = np.random.default_rng(1987)
+    durations = LAST_YEAR - COHORTS.min() + 1
+    sizes, events = {}, {}
+    for key, h in HAZARDS.items():
+        sizes[key] = rng.integers(20, 300, len(COHORTS))
+        # Multinomial split of every cohort over the durations (the rest never divorce)
+        p = np.append((1 - h) ** np.arange(durations) * h, 0)
+        p[-1] = 1 - p[:-1].sum()
+        events[key] = np.array([rng.multinomial(n, p)[:-1] for n in sizes[key]])
+    return long_tables(sizes, events)
+
+
+def brute_force(divorces, marriages, level=0.95):
+    # Kaplan-Meier from individual marriages: each divorces at its duration or
+    # is censored after the last observed year
+    durations, divorced = [], []
+    for cohort, size in marriages.set_index('Cohort')['Marriages'].items():
+        rows = divorces[divorces['Cohort'] == cohort]
+        for d, n in zip(rows['Duration'], rows['Divorces']):
+            durations += [d] * int(n)
+            divorced += [True] * int(n)
+        durations += [LAST_YEAR - cohort] * int(size - rows['Divorces'].sum())
+        divorced += [False] * int(size - rows['Divorces'].sum())
+    durations, divorced = np.array(durations), np.array(divorced)
+    survival, greenwood, curve = 1.0, 0.0, []
+    for d in range(durations.max() + 1):
+        at_risk = (durations >= d).sum()
+        events = (divorced & (durations == d)).sum()
+        survival *= 1 - events / at_risk
+        greenwood += events / (at_risk * (at_risk - events))
+        curve.append((survival, greenwood))
+    survival, greenwood = np.array(curve).T
+    z = -special.ndtri((1 - level) / 2)
+    se = np.sqrt(greenwood) / np.abs(np.log(survival))
+    return survival, survival ** np.exp(z * se), survival ** np.exp(-z * se)
+
+
+def test_constant_hazard_gives_geometric_survival(expected_counts):
+    tables = kaplan_meier(*expected_counts)
+
+    assert set(tables) == set(HAZARDS)
+    for key, h in HAZARDS.items():
+        table = tables[key].table
+        np.testing.assert_allclose(table['Survival'], (1 - h) ** (table['Duration'] + 1), rtol=1e-12)
+        np.testing.assert_allclose(table['Hazard'], h, rtol=1e-12)
+        np.testing.assert_allclose(table['Ever_Divorced'], 1 - table['Survival'])
+
+
+def test_cohort_curves_stop_at_censoring(expected_counts):
+    curves = kaplan_meier(*expected_counts)['Female'].cohort_survival
+
+    for cohort, curve in curves.iterrows():
+        seen = curve.index <= LAST_YEAR - cohort
+        np.testing.assert_allclose(curve[seen], 0.95 ** (curve.index[seen] + 1), rtol=1e-12)
+        assert curve[~seen].isna().all()
+
+
+def test_matches_individual_kaplan_meier(random_counts):
+    divorces, marriages = random_counts
+    tables = kaplan_meier(divorces, marriages)
+
+    for key in HAZARDS:
+        survival, lower, upper = brute_force(divorces[divorces['Group'] == key],
+                                             marriages[marriages['Group'] == key])
+        table = tables[key].table
+        np.testing.assert_allclose(table['Survival'], survival, rtol=1e-12)
+        np.testing.assert_allclose(table['CI_Lower'], lower, rtol=1e-10)
+        np.testing.assert_allclose(table['CI_Upper'], upper, rtol=1e-10)
+
+
+def test_greenwood_band_contains_the_curve_and_widens(random_counts):
+    for result in kaplan_meier(*random_counts).values():
+        table = result.table
+        assert ((table['CI_Lower'] <= table['Survival']) & (table['Survival'] <= table['CI_Upper'])).all()
+        width = table['CI_Upper'] - table['CI_Lower']
+        # Fewer cohorts remain at long durations
+        assert width.iloc[-1] > width.iloc[0]
+        s, lower, upper = result.survival_at(3)
+        assert 0 < lower < s < upper < 1
+
+
+def test_calendar_year_input_gives_the_same_table(random_counts):
+    divorces, marriages = random_counts
+    by_year = divorces.assign(Year=divorces['Cohort'] + divorces['Duration']).drop(columns='Cohort')
+
+    by_cohort = kaplan_meier(divorces, marriages)
+    by_calendar = kaplan_meier(by_year, marriages)
+
+    for key in HAZARDS:
+        pd.testing.assert_frame_equal(by_cohort[key].table, by_calendar[key].table)
+
+
+def test_arrays_are_cohorts_by_durations(random_counts):
+    divorces, marriages = random_counts
+    arrays = duration_arrays(divorces[divorces['Group'] == 'Male'], marriages[marriages['Group'] == 'Male'])
+
+    assert arrays.events.shape == arrays.observed.shape == (len(COHORTS), LAST_YEAR - COHORTS.min() + 1)
+    assert arrays.observed[0].all() and arrays.observed[-1].sum() == LAST_YEAR - COHORTS[-1] + 1
+    assert life_table(arrays).table['At_Risk'].iloc[0] == arrays.sizes.sum()
+
+
+def test_more_divorces_than_marriages_is_an_error(random_counts):
+    divorces, marriages = random_counts
+    with pytest.raises(ValueError, match='more divorces than marriages'):
+        kaplan_meier(divorces, marriages.assign(Marriages=1))
@@ -0,0 +1,68 @@
+"""
+mariye.text: number formatting and the Finnish blocks shared by the app and
+the static site
+"""
+
+import pytest
+
+from mariye import site, text
+from mariye.core import analyze
+from mariye.data import DATA
+
+
+@pytest.fixture(scope='module')
+def analysis():
+    return analyze(DATA)
+
+
+def test_number_formatting():
+    assert text.thousands(175045) == '175 045'
+    assert text.thousands(472) == '472'
+    assert text.percent(0.20969) == '21.0%'
+    assert text.percent(0.1362, 0) == '14%'
+    assert text.interval(11.6543, 15.8321, unit='%') == '[11.65% - 15.83%]'
+    assert text.interval(1.2, 1.85) == '[1.20 - 1.85]'
+
+
+@pytest.mark.parametrize('p, shown', [(0.99999, '> 99.99%'), (0.00001, '< 0.01%'), (0.5, '50.00%')])
+def test_probability_is_never_rounded_to_certainty(p, shown):
+    assert text.probability(p) == shown
+
+
+@pytest.mark.parametrize('h, kind', [(0.1, 'info'), (-0.3, 'warning'), (0.9, 'error'), (float('inf'), 'error')])
+def test_effect_note_follows_cohens_thresholds(h, kind):
+    assert text.effect_note(h)[0] == kind
+
+
+def test_blocks_follow_the_dataset(analysis):
+    female = analysis.groups['Female']
+
+    assert f'{female.divorces} eroa / {text.thousands(female.marriages)} avioliittoa' in text.quick_answer(analysis)
+    assert text.span(analysis) == f"{DATA['Year'][0]}-{DATA['Year'][-1]}"
+    assert list(text.summary_table(analysis)['Parityyppi']) == [analysis.groups[k].label
+                                                                 for k in text.SUMMARY_GROUPS]
+
+
+def test_site_pages_show_the_shared_blocks(analysis):
+    index = site.index_page(analysis)
+    statistics = site.statistics_page(analysis)
+
+    for block in (text.important_difference(analysis), text.quick_answer(analysis), text.limitations(analysis)):
+        assert site.markdown(block) in index
+    assert site.code(text.copy_blurb(analysis)) in index
+    assert site.markdown(text.posterior_summary(analysis.groups['Male'])) in statistics
+
+
+def test_blocks_follow_an_appended_year():
+    data = {column: list(values) + [values[-1] + 1 if column == 'Year' else values[-1]]
+            for column, values in DATA.items()}
+    extended = analyze(data)
+    blocks = [text.title(extended), text.comparison_warning(extended), text.simple_chart_caption(extended),
+              *text.orchards(extended), text.orchard_problem(extended), text.misleading_numbers(extended),
+              text.timespan_note(extended), text.quick_answer(extended)]
+
+    last_year = DATA['Year'][-1]
+    assert f'{DATA["Year"][0]}-{last_year + 1}' in text.title(extended)
+    for block in blocks:
+        assert f'-{last_year}' not in block
+    assert text.percent(extended.groups['Opposite'].rate, 0) in text.misleading_title(extended)
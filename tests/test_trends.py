@@ -0,0 +1,81 @@
+"""
+mariye.trends: the batched IRLS fit and its bands
+"""
+
+import numpy as np
+import pytest
+
+from mariye.core import analyze
+from mariye.data import DATA
+from mariye.trends import design_matrix, fit_glm, fit_trends
+
+YEARS = np.arange(2010, 2022)
+
+
+@pytest.fixture(scope='module')
+def counts():
+    # 40 series with their own quadratic trends in the yearly rate
+    rng = np.random.default_rng(121)
+    trials = rng.integers(50, 5000, size=(40, len(YEARS))).astype(np.float64)
+    t = YEARS - YEARS.mean()
+    logit = rng.normal(-2.0, 0.5, (40, 1)) + rng.normal(0, 0.05, (40, 1)) * t + rng.normal(0, 0.01, (40, 1)) * t**2
+    successes = rng.binomial(trials.astype(np.int64), 1 / (1 + np.exp(-logit))).astype(np.float64)
+    return successes, trials
+
+
+@pytest.mark.parametrize('family', ['poisson', 'binomial'])
+def test_coefficients_solve_the_score_equations(counts, family):
+    successes, trials = counts
+    design = design_matrix(YEARS)
+
+    fit = fit_glm(design, successes, trials, family)
+
+    # Canonical links: X'(y - fitted) = 0 at the maximum likelihood estimate
+    ratio = fit.predict(design)[0]
+    score = (successes - trials * ratio) @ design
+    assert fit.converged.all()
+    np.testing.assert_allclose(score / successes.sum(axis=1, keepdims=True), 0, atol=1e-8)
+
+
+@pytest.mark.parametrize('family', ['poisson', 'binomial'])
+def test_batch_matches_single_fits(counts, family):
+    successes, trials = counts
+    design = design_matrix(YEARS)
+
+    batch = fit_glm(design, successes, trials, family)
+
+    for row in (0, 17, 39):
+        single = fit_glm(design, successes[row], trials[row], family)
+        np.testing.assert_allclose(batch.coef[row], single.coef[0], rtol=1e-8)
+        np.testing.assert_allclose(batch.cov[row], single.cov[0], rtol=1e-6)
+
+
+def test_constant_poisson_rate_is_the_pooled_ratio(counts):
+    successes, trials = counts
+
+    fit = fit_glm(design_matrix(YEARS, degree=0), successes, trials, dispersion=None)
+
+    pooled = successes.sum(axis=1) / trials.sum(axis=1)
+    np.testing.assert_allclose(np.exp(fit.coef[:, 0]), pooled, rtol=1e-10)
+    # Fisher information of log(rate) is the total count
+    np.testing.assert_allclose(fit.cov[:, 0, 0], 1 / successes.sum(axis=1), rtol=1e-8)
+
+
+def test_bands_widen_outside_the_data_range():
+    analysis = analyze(DATA)
+    years = np.asarray(DATA['Year'])
+    fit_years = np.arange(years[0] - 5, years[-1] + 6)
+    table = fit_trends(analysis).table
+    marriages = table.pivot(index='Group', columns='Year', values='Marriages').to_numpy(dtype=np.float64)
+    divorces = table.pivot(index='Group', columns='Year', values='Divorces').to_numpy(dtype=np.float64)
+
+    fit = fit_glm(design_matrix(years), divorces, marriages)
+    # Same centering as the fit, evaluated five years either side of the data
+    fitted, lower, upper = fit.predict(design_matrix(fit_years, center=(years[0] + years[-1]) / 2))
+
+    # Log-scale width of the band, growing with the distance from either end of the data
+    width = np.log(upper / lower)
+    first, last = np.flatnonzero(fit_years == years[0])[0], np.flatnonzero(fit_years == years[-1])[0]
+    assert (np.diff(width[:, last:], axis=1) > 0).all()
+    assert (np.diff(width[:, :first + 1], axis=1) < 0).all()
+    assert ((lower < fitted) & (fitted < upper)).all()